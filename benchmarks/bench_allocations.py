@@ -0,0 +1,164 @@
+"""
+Benchmark alokacji w ticku symulacji (ścieżka obiektowa: Enemy.update + SteeringBehaviors).
+
+Dla każdego rozmiaru tłumu mierzy:
+- ms na tick (przebieg bez tracemalloc),
+- szczyt pamięci tymczasowej w ticku (tracemalloc: szczyt - stan na początku ticka),
+- przyrost zaalokowanych bloków po wszystkich tickach (sys.getallocatedblocks),
+- liczbę odśmiecań GC na generację i łączny czas pauz GC (gc.callbacks).
+
+    python -m benchmarks.bench_allocations --counts 500 1000 2000 --ticks 200 --no-lod
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+from config import *
+from player.player_input import RandomInput
+from simulation.world import World
+from .bench_scaling import BASE_DENSITY_COUNT, summarize
+
+DEFAULT_COUNTS = (500, 1000, 2000)
+
+
+class GcMonitor:
+    """Liczy odśmiecania i czas pauz GC przez gc.callbacks."""
+
+    def __init__(self):
+        self.collections = [0, 0, 0]
+        self.pause_ms = 0.0
+        self._start = None
+
+    def __call__(self, phase, info):
+        if phase == "start":
+            self._start = time.perf_counter()
+        elif self._start is not None:
+            self.pause_ms += (time.perf_counter() - self._start) * 1000.0
+            self.collections[info["generation"]] += 1
+            self._start = None
+
+    def install(self):
+        gc.callbacks.append(self)
+
+    def uninstall(self):
+        gc.callbacks.remove(self)
+
+
+def make_world(enemy_count, obstacle_count, seed, lod):
+    scale = max(1.0, enemy_count / BASE_DENSITY_COUNT) ** 0.5
+    width = int(WINDOW_WIDTH * scale)
+    height = int(WINDOW_HEIGHT * scale)
+    world = World(width, height, seed=seed, enemy_count=enemy_count,
+                  obstacle_count=int(round(obstacle_count * scale * scale)))
+    if not lod:
+        # każdy wróg przelicza steering w każdym ticku - najgorszy przypadek dla alokacji
+        world.game_map.ai_lod = None
+    return world
+
+
+def step(world, input_source):
+    world.step(1.0 / TICK_RATE, input_source.poll(world.player, world.game_map))
+    if world.player_dead:
+        world.player.hp = PLAYER_HP
+        world.player_dead = False
+
+
+def run_case(enemy_count, obstacle_count, ticks, warmup, seed, lod):
+    # 1) czas ticka i GC - bez tracemalloc, który sam spowalnia alokacje
+    world = make_world(enemy_count, obstacle_count, seed, lod)
+    input_source = RandomInput(seed)
+    for _ in range(warmup):
+        step(world, input_source)
+
+    monitor = GcMonitor()
+    tick_times = []
+    blocks_before = sys.getallocatedblocks()
+    monitor.install()
+    try:
+        for _ in range(ticks):
+            start = time.perf_counter()
+            step(world, input_source)
+            tick_times.append((time.perf_counter() - start) * 1000.0)
+    finally:
+        monitor.uninstall()
+    blocks_growth = sys.getallocatedblocks() - blocks_before
+
+    # 2) pamięć tymczasowa - ten sam przebieg od nowa, z tracemalloc
+    world = make_world(enemy_count, obstacle_count, seed, lod)
+    input_source = RandomInput(seed)
+    for _ in range(warmup):
+        step(world, input_source)
+
+    transient = []
+    tracemalloc.start()
+    try:
+        for _ in range(ticks):
+            tracemalloc.reset_peak()
+            current, _ = tracemalloc.get_traced_memory()
+            step(world, input_source)
+            _, peak = tracemalloc.get_traced_memory()
+            transient.append((peak - current) / 1024.0)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "enemy_count": enemy_count,
+        "generated_enemies": len(world.game_map.enemies),
+        "lod": lod,
+        "tick": summarize(tick_times),
+        "transient_peak_kb": max(transient),
+        "transient_mean_kb": sum(transient) / len(transient),
+        "allocated_blocks_growth": blocks_growth,
+        "gc_collections": monitor.collections,
+        "gc_pause_ms": monitor.pause_ms,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Alokacje i presja GC w ticku symulacji.")
+    parser.add_argument("--counts", type=int, nargs="+", default=list(DEFAULT_COUNTS))
+    parser.add_argument("--obstacles", type=int, default=OBSTACLE_COUNT,
+                        help="OBSTACLE_COUNT dla mapy wielkości okna (skalowane z mapą)")
+    parser.add_argument("--ticks", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--no-lod", action="store_true", help="wyłącza AILodScheduler")
+    parser.add_argument("--out", default="bench_allocations.json")
+    args = parser.parse_args(argv)
+
+    results = {
+        "meta": {
+            "python": sys.version.split()[0],
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "ticks": args.ticks,
+            "seed": args.seed,
+        },
+        "cases": [],
+    }
+
+    print(f"{'enemies':>8s} {'tick ms':>9s} {'p99 ms':>8s} {'tmp peak KB':>12s} {'tmp mean KB':>12s} "
+          f"{'blocks':>8s} {'gc 0/1/2':>12s} {'gc ms':>7s}")
+    for count in args.counts:
+        case = run_case(count, args.obstacles, args.ticks, args.warmup, args.seed, not args.no_lod)
+        results["cases"].append(case)
+        gc_counts = "/".join(str(c) for c in case["gc_collections"])
+        print(f"{count:8d} {case['tick']['mean_ms']:9.2f} {case['tick']['p99_ms']:8.2f} "
+              f"{case['transient_peak_kb']:12.1f} {case['transient_mean_kb']:12.1f} "
+              f"{case['allocated_blocks_growth']:8d} {gc_counts:>12s} {case['gc_pause_ms']:7.1f}", flush=True)
+
+    with open(args.out, "w") as f:
+        json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
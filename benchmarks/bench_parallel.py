@@ -0,0 +1,134 @@
+"""
+Benchmark równoległego steeringu (ParallelSwarmEngine).
+
+Dla każdego rozmiaru tłumu mierzy ms na tick i ms steeringu przy 0 (SwarmEngine
+w procesie gry), 1, 2, ... procesach roboczych i liczy przyspieszenie względem 0
+(koszt przejścia na procesy) i względem 1 procesu (skalowanie 1 -> N).
+Procesów więcej niż rdzeni nie przyspieszy - wynik pokazuje wtedy sam narzut.
+
+    python -m benchmarks.bench_parallel --counts 2000 5000 --workers 0 1 2 4 --ticks 30
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+from config import *
+from player.player_input import RandomInput
+from simulation.world import World
+from enemy.swarm_engine import SwarmEngine
+from enemy.parallel_steering import ParallelSwarmEngine
+from .bench_scaling import BASE_DENSITY_COUNT, SubsystemTimers, summarize
+
+SUBSYSTEMS = {
+    "steering": [(SwarmEngine, "calculate_steering"), (ParallelSwarmEngine, "calculate_steering")],
+}
+
+DEFAULT_COUNTS = (2000, 5000)
+
+
+def default_workers():
+    cpus = os.cpu_count() or 1
+    workers = [0, 1]
+    while workers[-1] * 2 <= cpus:
+        workers.append(workers[-1] * 2)
+    if workers[-1] != cpus and cpus > 1:
+        workers.append(cpus)
+    return workers
+
+
+def run_case(enemy_count, obstacle_count, workers, ticks, warmup, seed):
+    scale = max(1.0, enemy_count / BASE_DENSITY_COUNT) ** 0.5
+    width = int(WINDOW_WIDTH * scale)
+    height = int(WINDOW_HEIGHT * scale)
+
+    world = World(width, height, seed=seed, enemy_count=enemy_count,
+                  obstacle_count=int(round(obstacle_count * scale * scale)))
+    world.game_map.enable_swarm_engine(seed, workers)
+    input_source = RandomInput(seed)
+
+    timers = SubsystemTimers(SUBSYSTEMS)
+    timers.install()
+    try:
+        for i in range(warmup + ticks):
+            start = time.perf_counter()
+            world.step(1.0 / TICK_RATE, input_source.poll(world.player, world.game_map))
+            timers.end_tick((time.perf_counter() - start) * 1000.0)
+            if i + 1 == warmup:
+                timers.discard()
+            if world.player_dead:
+                world.player.hp = PLAYER_HP
+                world.player_dead = False
+    finally:
+        timers.uninstall()
+        world.game_map.close()
+
+    return {
+        "enemy_count": enemy_count,
+        "generated_enemies": len(world.game_map.enemies),
+        "workers": workers,
+        "tick": summarize(timers.tick_times),
+        "steering": summarize(timers.samples["steering"]),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Skalowanie steeringu z liczbą procesów.")
+    parser.add_argument("--counts", type=int, nargs="+", default=list(DEFAULT_COUNTS))
+    parser.add_argument("--workers", type=int, nargs="+", default=default_workers(),
+                        help="liczby procesów roboczych (0 - bez procesów)")
+    parser.add_argument("--obstacles", type=int, default=OBSTACLE_COUNT,
+                        help="OBSTACLE_COUNT dla mapy wielkości okna (skalowane z mapą)")
+    parser.add_argument("--ticks", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--out", default="bench_parallel.json")
+    args = parser.parse_args(argv)
+
+    results = {
+        "meta": {
+            "python": sys.version.split()[0],
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "ticks": args.ticks,
+            "seed": args.seed,
+        },
+        "cases": [],
+    }
+
+    cpus = os.cpu_count() or 1
+    if max(args.workers) > cpus:
+        print(f"uwaga: {cpus} CPU - procesy ponad tę liczbę dzielą te same rdzenie")
+    for count in args.counts:
+        print(f"\nenemies={count}")
+        print(f"  {'workers':>7s} {'tick ms':>10s} {'steering ms':>12s} {'speedup':>8s} {'vs 1':>7s}")
+        reference = None
+        single = None
+        for workers in args.workers:
+            case = run_case(count, args.obstacles, workers, args.ticks, args.warmup, args.seed)
+            steering = case["steering"]["mean_ms"]
+            if reference is None:
+                reference = steering
+            if workers == 1:
+                single = steering
+            case["speedup"] = reference / steering if steering > 0 else 0.0
+            # skalowanie 1 -> N: sam podział pracy, bez kosztu przejścia na procesy
+            case["scaling"] = single / steering if single is not None and workers >= 1 and steering > 0 else None
+            results["cases"].append(case)
+            scaling = f"{case['scaling']:6.2f}x" if case["scaling"] is not None else f"{'-':>7s}"
+            print(f"  {workers:7d} {case['tick']['mean_ms']:10.2f} {steering:12.2f} {case['speedup']:7.2f}x {scaling}",
+                  flush=True)
+
+    with open(args.out, "w") as f:
+        json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
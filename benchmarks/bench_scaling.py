@@ -0,0 +1,263 @@
+"""
+Benchmark skalowania gorących ścieżek symulacji.
+
+Uruchamia skryptowane scenariusze (ENEMY_COUNT x OBSTACLE_COUNT) bez okna i mierzy
+ms na tick dla każdego podsystemu. Wynik trafia do pliku JSON; z --baseline
+porównuje przebieg z zapisanym wynikiem i zgłasza regresje.
+
+    python -m benchmarks.bench_scaling --counts 35 200 --ticks 60 --out bench.json
+    python -m benchmarks.bench_scaling --baseline bench.json --threshold 0.15
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+from config import *
+from enemy.enemy import Enemy
+from enemy.enemy_group_manager import EnemyGroupSolver
+from enemy.enemy_steering import EnemySteering
+from map.game_map import GameMap
+from player.player import Player
+from player.player_input import RandomInput
+from simulation.world import World
+from ui.world_renderer import WorldRenderer
+
+# podsystem -> metody, które go realizują (obiektowo i w SwarmEngine)
+SUBSYSTEMS = {
+    "find_neighbors": [(Enemy, "find_neighbors")],
+    "EnemyGroupSolver.update": [(EnemyGroupSolver, "update")],
+    "EnemySteering.calculate_steering": [(EnemySteering, "calculate_steering")],
+    "resolve_collisions": [(GameMap, "resolve_collisions")],
+    "Player.shoot": [(Player, "shoot")],
+    "GameMap.draw": [(GameMap, "draw")],
+}
+
+try:
+    from enemy.swarm_engine import SwarmEngine
+    SUBSYSTEMS["find_neighbors"].append((SwarmEngine, "find_neighbors"))
+    SUBSYSTEMS["EnemySteering.calculate_steering"].append((SwarmEngine, "calculate_steering"))
+    SUBSYSTEMS["resolve_collisions"].append((SwarmEngine, "resolve_collisions"))
+    SUBSYSTEMS["EnemyGroupSolver.update"].append((SwarmEngine, "update_groups"))
+except ImportError:
+    pass
+
+DEFAULT_COUNTS = (35, 200, 1000, 5000)
+DEFAULT_OBSTACLES = (7, 20)
+# gęstość wrogów odniesienia: tyle wrogów mieści się w oknie bez skalowania mapy
+BASE_DENSITY_COUNT = 200
+
+
+class SubsystemTimers:
+    """Owija metody podsystemów licznikami czasu; zbiera sumy na tick."""
+    def __init__(self, subsystems=SUBSYSTEMS):
+        self.subsystems = subsystems
+        self.originals = []
+        self.current = {name: [0.0, 0] for name in subsystems}
+        self.samples = {name: [] for name in subsystems}
+        self.calls = {name: [] for name in subsystems}
+        self.tick_times = []
+
+    def _wrap(self, name, func):
+        acc = self.current[name]
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                acc[0] += time.perf_counter() - start
+                acc[1] += 1
+        return timed
+
+    def install(self):
+        for name, targets in self.subsystems.items():
+            for cls, attr in targets:
+                original = cls.__dict__[attr]
+                self.originals.append((cls, attr, original))
+                setattr(cls, attr, self._wrap(name, original))
+
+    def uninstall(self):
+        for cls, attr, original in reversed(self.originals):
+            setattr(cls, attr, original)
+        self.originals = []
+
+    def end_tick(self, tick_time):
+        self.tick_times.append(tick_time)
+        for name, acc in self.current.items():
+            self.samples[name].append(acc[0] * 1000.0)
+            self.calls[name].append(acc[1])
+            acc[0] = 0.0
+            acc[1] = 0
+
+    def discard(self):
+        """Odrzuca zebrane próbki (rozgrzewka)."""
+        for name in self.subsystems:
+            self.samples[name].clear()
+            self.calls[name].clear()
+        self.tick_times.clear()
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * q
+    lo = math.floor(k)
+    hi = math.ceil(k)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def summarize(values):
+    return {
+        "mean_ms": statistics.fmean(values) if values else 0.0,
+        "p99_ms": percentile(values, 0.99),
+    }
+
+
+def run_scenario(enemy_count, obstacle_count, ticks, warmup, seed, swarm_engine=False, draw=True):
+    # mapa rośnie z liczbą wrogów, żeby gęstość tłumu była porównywalna
+    scale = math.sqrt(max(1.0, enemy_count / BASE_DENSITY_COUNT))
+    width = int(WINDOW_WIDTH * scale)
+    height = int(WINDOW_HEIGHT * scale)
+    obstacles = int(round(obstacle_count * scale * scale))
+
+    world = World(width, height, seed=seed, enemy_count=enemy_count, obstacle_count=obstacles)
+    if swarm_engine:
+        world.game_map.enable_swarm_engine(seed)
+    input_source = RandomInput(seed, shoot_chance=1.0)
+    surface = pygame.Surface((width, height)) if draw else None
+    renderer = WorldRenderer(surface) if draw else None
+
+    timers = SubsystemTimers()
+    timers.install()
+    try:
+        for i in range(warmup + ticks):
+            start = time.perf_counter()
+            world.step(1.0 / TICK_RATE, input_source.poll(world.player, world.game_map))
+            if renderer is not None:
+                renderer.draw(world)
+            timers.end_tick((time.perf_counter() - start) * 1000.0)
+            if i + 1 == warmup:
+                timers.discard()
+            if world.player_dead:
+                # gracz nieśmiertelny w benchmarku - liczymy koszt symulacji, nie rozgrywkę
+                world.player.hp = PLAYER_HP
+                world.player_dead = False
+    finally:
+        timers.uninstall()
+
+    return {
+        "name": f"enemies={enemy_count} obstacles={obstacle_count}",
+        "enemy_count": enemy_count,
+        "obstacle_count": obstacle_count,
+        "generated_enemies": len(world.game_map.enemies),
+        "generated_obstacles": len(world.game_map.obstacles),
+        "map_size": [width, height],
+        "ticks": len(timers.tick_times),
+        "swarm_engine": swarm_engine,
+        "tick": summarize(timers.tick_times),
+        "subsystems": {
+            name: dict(summarize(timers.samples[name]),
+                       calls_per_tick=statistics.fmean(timers.calls[name]) if timers.calls[name] else 0.0)
+            for name in SUBSYSTEMS
+        },
+    }
+
+
+def compare(results, baseline, threshold):
+    """Zwraca listę regresji: (scenariusz, podsystem, metryka, baseline, teraz)."""
+    regressions = []
+    old = {s["name"]: s for s in baseline.get("scenarios", [])}
+    for scenario in results["scenarios"]:
+        ref = old.get(scenario["name"])
+        if ref is None:
+            continue
+        pairs = [("tick", scenario["tick"], ref["tick"])]
+        pairs += [(name, data, ref["subsystems"].get(name)) for name, data in scenario["subsystems"].items()]
+        for name, now, before in pairs:
+            if before is None:
+                continue
+            for metric in ("mean_ms", "p99_ms"):
+                # pomijamy szum przy bardzo małych czasach
+                if before[metric] < 0.05:
+                    continue
+                if now[metric] > before[metric] * (1.0 + threshold):
+                    regressions.append((scenario["name"], name, metric, before[metric], now[metric]))
+    return regressions
+
+
+def print_report(results):
+    for scenario in results["scenarios"]:
+        print(f"\n{scenario['name']}  (map {scenario['map_size'][0]}x{scenario['map_size'][1]}, "
+              f"{scenario['generated_enemies']} enemies, {scenario['generated_obstacles']} obstacles)")
+        print(f"  {'tick':36s} mean {scenario['tick']['mean_ms']:9.3f} ms   p99 {scenario['tick']['p99_ms']:9.3f} ms")
+        for name, data in scenario["subsystems"].items():
+            print(f"  {name:36s} mean {data['mean_ms']:9.3f} ms   p99 {data['p99_ms']:9.3f} ms"
+                  f"   calls/tick {data['calls_per_tick']:8.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark skalowania symulacji.")
+    parser.add_argument("--counts", type=int, nargs="+", default=list(DEFAULT_COUNTS))
+    parser.add_argument("--obstacles", type=int, nargs="+", default=list(DEFAULT_OBSTACLES),
+                        help="OBSTACLE_COUNT dla mapy wielkości okna (skalowane z mapą)")
+    parser.add_argument("--ticks", type=int, default=60)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--swarm-engine", action="store_true")
+    parser.add_argument("--no-draw", action="store_true")
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--baseline", default=None, help="plik JSON z poprzedniego przebiegu")
+    parser.add_argument("--threshold", type=float, default=0.2, help="dopuszczalny wzrost czasu (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    # baseline czytamy przed przebiegiem - zapis --out nie może go nadpisać przed porównaniem
+    baseline = None
+    if args.baseline:
+        if os.path.abspath(args.out) == os.path.abspath(args.baseline):
+            parser.error("--out i --baseline wskazują ten sam plik - wynik nadpisałby baseline")
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results = {
+        "meta": {
+            "python": sys.version.split()[0],
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "ticks": args.ticks,
+            "seed": args.seed,
+        },
+        "scenarios": [],
+    }
+    for count in args.counts:
+        for obstacles in args.obstacles:
+            scenario = run_scenario(count, obstacles, args.ticks, args.warmup, args.seed,
+                                    args.swarm_engine, not args.no_draw)
+            results["scenarios"].append(scenario)
+            print(f"{scenario['name']}: {scenario['tick']['mean_ms']:.2f} ms/tick", flush=True)
+
+    with open(args.out, "w") as f:
+        json.dump(results, f, indent=2)
+    print_report(results)
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\nREGRESJE (> {args.threshold:.0%}):")
+            for name, subsystem, metric, before, now in regressions:
+                print(f"  {name} / {subsystem} / {metric}: {before:.3f} -> {now:.3f} ms")
+            return 1
+        print("\nbrak regresji względem baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,58 @@
 WINDOW_WIDTH = 1200
 WINDOW_HEIGHT = 800
-FPS = 60
+FPS = 60                     # limit klatek rysowania
+
+# rozmiar mapy - może być wielokrotnie większy od okna (kamera jedzie za graczem)
+WORLD_WIDTH = WINDOW_WIDTH
+WORLD_HEIGHT = WINDOW_HEIGHT
+
+TICK_RATE = 60               # ticki symulacji na sekundę (stały krok dt = 1 / TICK_RATE)
+MAX_TICKS_PER_FRAME = 5      # limit nadrabiania ticków w jednej klatce
 
 OBSTACLE_COUNT = 7
 OBSTACLE_MIN_R = 65
 OBSTACLE_MAX_R = 100
 
+MAP_GENERATOR = "rejection"  # "poisson" - próbkowanie Bridsona, szybkie i gęste na dużych mapach
+
 ENEMY_COUNT = 35
 ATTACK_THRESHOLD = 9       # minimalna liczba botów do rozpoczęcia ataku
 
-PLAYER_HP = 3
\ No newline at end of file
+PLAYER_HP = 3
+PLAYER_SPAWN = (30, 30)
+
+MAP_WALLS = None             # None | "borders" | "rooms" | plik .json z łamanymi (map.wall_layout)
+ROOM_GRID = (3, 3)           # wiersze, kolumny pokoi dla MAP_WALLS = "rooms"
+ROOM_DOOR_WIDTH = 120        # szerokość przejścia między pokojami
+
+MAP_LAYOUT_PATH = None       # plik MapLayout - gra startuje (i restartuje) na tej mapie zamiast losowej
+
+# poziomy szczegółowości AI: (maks. odległość od gracza, steering co tyle ticków)
+# wrogowie w ataku zawsze liczą co tick
+AI_LOD = False
+AI_LOD_BANDS = ((400, 1), (800, 2), (1600, 4), (float("inf"), 8))
+
+HEADING_SMOOTHING_SAMPLES = 10     # ile ostatnich headingów uśrednia rysowany kierunek wroga
+SPRITE_HEADING_STEPS = 128         # ile kierunków ma atlas sprite'ów wroga i gracza (utils.sprite_atlas)
+
+HIDING_SPOT_MOVE_THRESHOLD = 8.0   # o ile gracz musi się przesunąć, by przeliczyć punkty ukrycia
+
+NAV_GRID_CELL = 32           # komórka siatki przejezdności (pole przepływu i ścieżki A*)
+FLOW_FIELD = False           # grupy atakujące gracza poza zasięgiem wzroku idą wspólnym polem przepływu
+NAVIGATION = False           # eksploratorzy idą do punktów ukrycia ścieżkami A* (map.navigation)
+NAV_PATH_CACHE_SIZE = 512    # ile ścieżek (komórka startu, komórka celu) pamięta Navigator
+
+PRIORITIZED_STEERING = False # zachowania wroga od najważniejszego, aż do wyczerpania max_force (reszta pomijana)
+
+SWARM_ENGINE = False         # wektorowy silnik roju (wymaga numpy)
+SWARM_WORKERS = 0            # procesy liczące steering w SwarmEngine (0 - w procesie gry)
+
+PROFILER_ENABLED = False     # wkompiluj liczniki czasu w gorące ścieżki (Enemy, SwarmEngine, GameMap)
+PROFILER_TOGGLE_KEY = "f3"   # pokazuje/ukrywa nakładkę profilera
+
+DEBUG_OVERLAY = True         # strefy sąsiadów wrogów
+DEBUG_OVERLAY_TOGGLE_KEY = "f2"
+
+REPLAY_RECORD = False              # nagrywaj replay każdej gry (main.py)
+REPLAY_PATH = "replay.wdft"        # plik replaya (keyframe'y w REPLAY_PATH + ".keys")
+REPLAY_KEYFRAME_INTERVAL = 300     # pełny stan świata co tyle ticków (skok w replayu bez symulowania od początku)
@@ -0,0 +1,103 @@
+from config import AI_LOD_BANDS
+from utils.profiler import profiler
+
+try:
+    import numpy as np
+except ImportError:  # schedule_array używa tylko SwarmEngine, który i tak wymaga numpy
+    np = None
+
+
+class AILodScheduler:
+    """
+    Poziomy szczegółowości AI (LOD).
+    Wrogowie blisko gracza i wszyscy w stanie attack liczą steering co tick.
+    Dalsi eksploratorzy liczą go co `interval` ticków (rozłożeni równo na kolejne ticki),
+    a pomiędzy używają ostatniej siły sterującej.
+
+    bands - [(maks. odległość od gracza, interval)], rosnąco po odległości;
+    wróg dalej niż ostatnie pasmo należy do ostatniego pasma.
+    """
+
+    def __init__(self, bands=AI_LOD_BANDS):
+        self.bands = sorted(bands)
+        self.tick = 0
+        self._next_slot = 0
+
+        # statystyki ostatniego ticka dla profilera: ile wrogów w paśmie i ilu z nich liczyło steering
+        self.counts = [0] * len(self.bands)
+        self.updated = [0] * len(self.bands)
+        self.labels = [f"ai_lod <{distance:g}px /{interval}" for distance, interval in self.bands]
+
+    def reset(self):
+        self.tick = 0
+        self._next_slot = 0
+        self.counts = [0] * len(self.bands)
+        self.updated = [0] * len(self.bands)
+
+    def band_of(self, enemy, player_pos):
+        if enemy.state == "attack" or player_pos is None:
+            return 0
+        dist_sq = enemy.pos.distance_squared_to(player_pos)
+        for i, (distance, _) in enumerate(self.bands):
+            if dist_sq <= distance * distance:
+                return i
+        return len(self.bands) - 1
+
+    def schedule(self, enemies, player=None):
+        """Zwraca listę bool (w kolejności enemies): czy wróg liczy steering w tym ticku."""
+        self.tick += 1
+        player_pos = player.pos if player is not None else None
+        counts = [0] * len(self.bands)
+        updated = [0] * len(self.bands)
+
+        result = []
+        for enemy in enemies:
+            # stały slot wroga rozkłada pasmo na kolejne ticki niezależnie od usuwania innych
+            if enemy.lod_slot is None:
+                enemy.lod_slot = self._next_slot
+                self._next_slot += 1
+
+            band = self.band_of(enemy, player_pos)
+            interval = self.bands[band][1]
+            run = interval <= 1 or (enemy.lod_slot + self.tick) % interval == 0
+            counts[band] += 1
+            if run:
+                updated[band] += 1
+            result.append(run)
+
+        self.counts = counts
+        self.updated = updated
+        for label, count, done in zip(self.labels, counts, updated):
+            # liczniki w profilerze: wywołania = liczba wrogów liczących steering w paśmie
+            profiler.add(label, 0.0, done)
+        return result
+
+    def schedule_array(self, dist_sq, attacking, slots):
+        """
+        schedule dla SwarmEngine - na kolumnach zamiast obiektów.
+        dist_sq - kwadraty odległości od gracza (None - brak gracza), attacking - maska atakujących,
+        slots - sloty wierszy (-1 - jeszcze bez slotu; przydzielane w miejscu).
+        Zwraca maskę bool: czy wiersz liczy steering w tym ticku.
+        """
+        self.tick += 1
+        fresh = np.flatnonzero(slots < 0)
+        if len(fresh):
+            slots[fresh] = np.arange(self._next_slot, self._next_slot + len(fresh))
+            self._next_slot += len(fresh)
+
+        last = len(self.bands) - 1
+        if dist_sq is None:
+            band = np.zeros(len(slots), dtype=np.int64)
+        else:
+            limits = np.array([distance * distance for distance, _ in self.bands], dtype=float)
+            band = np.minimum(np.searchsorted(limits, dist_sq, side="left"), last)
+            band[attacking] = 0
+
+        interval = np.array([interval for _, interval in self.bands])[band]
+        run = (interval <= 1) | ((slots + self.tick) % np.maximum(interval, 1) == 0)
+
+        self.counts = np.bincount(band, minlength=last + 1).tolist()
+        self.updated = np.bincount(band[run], minlength=last + 1).tolist()
+        for label, done in zip(self.labels, self.updated):
+            profiler.add(label, 0.0, done)
+        return run
@@ -1,18 +1,33 @@
 import random
 import math
 import pygame
-from utils.collision import circle_collision, resolve_circle_overlap, collision_with_walls
+from utils.collision import circle_collision, resolve_circle_overlap, collision_with_walls, resolve_circle_wall
 from steeringBehaviors.steering_behaviors import SteeringBehaviors
 from utils.smoothing import Smoother
+from utils.profiler import profiled
 from utils.debuging import *
+from utils.sprite_atlas import sprite_atlas
 from .enemy_steering import *
 from .enemy_group_manager import *
 from config import *
 
+# kolory stanów ataku i peek (normalny kolor to Enemy.color)
+LEADER_COLOR = (237, 63, 19)
+FOLLOWER_COLOR = (245, 124, 17)
+PEEKING_COLOR = (242, 167, 202)
+
 
 class Enemy:
+    # stała lista pól - mniej pamięci na wroga i szybszy dostęp do atrybutów w ticku
+    __slots__ = ("pos", "prev_pos", "radius", "mass", "max_speed", "max_force", "color",
+                 "velocity", "heading", "side", "steering", "enemy_steering", "steering_force",
+                 "neighbors", "flocking_radius", "smoother", "smoothed_heading", "peek", "is_peeking",
+                 "visible_to_player", "state", "attack_group_id", "group", "is_group_leader",
+                 "uid", "lod_slot", "attack_offset")
+
     def __init__(self, x, y, radius=15, mass=1.0, max_speed=150, max_force=2000, color=(196, 39, 113), flocking_radius=70.0):
         self.pos = pygame.Vector2(x, y)
+        self.prev_pos = self.pos.copy()  # pozycja z poprzedniego ticka - do interpolacji rysowania
         self.radius = radius
         self.mass = mass
         self.max_speed = max_speed
@@ -29,99 +44,112 @@ class Enemy:
         self.neighbors = []
         self.flocking_radius = flocking_radius
 
-        self.smoother = Smoother(num_samples=10)
+        self.smoother = Smoother(num_samples=HEADING_SMOOTHING_SAMPLES)
         self.smoothed_heading = self.heading.copy()
 
         self.peek = EnemyPeek(self, base_chance=0.12, group_scale=0.6, min_duration=1.0, max_duration=3.0)
         self.is_peeking = False
+        # czy gracz widzi wroga (linia wzroku) - liczone raz na tick przez GameMap
+        self.visible_to_player = False
         # grupowanie/ataki
         self.state = "explore"  # możliwe: "explore" | "attack" | "dead"
         self.attack_group_id = None
         self.group = EnemyGroupManager(self, ATTACK_THRESHOLD)
         self.is_group_leader = False
+        # stały numer wroga na mapie (kolejność spawnu) - nadaje GameMap
+        self.uid = None
+        # slot w AILodScheduler - przydzielany przy pierwszym planowaniu
+        self.lod_slot = None
 
-    def get_triangle_points(self):
-        # Skala trójkąta
-        size = self.radius
-
-        # Przód trójkąta — w kierunku heading
-        tip = self.pos + self.smoothed_heading * size
-
-        side = pygame.Vector2(-self.smoothed_heading.y, self.smoothed_heading.x)
-
-        # Boki trójkąta
-        left = self.pos - self.smoothed_heading * (size * 0.5) + side * (size * 0.6)
-        right = self.pos - self.smoothed_heading * (size * 0.5) - side * (size * 0.6)
-
-        return [tip, left, right]
-
-    def update(self, dt, game_map, player=None):
-        # resetujemy siłę sterującą
-        self.steering_force = pygame.Vector2(0, 0)
-
-        # oznacz sąsiadów
-        self.find_neighbors(game_map.enemies)
-
-        # update stanu grupy
-        self.group.update()
-
-        # sterring
-        self.steering_force = self.enemy_steering.calculate_steering(dt, player, game_map)
+    def reset(self, x, y):
+        """
+        Przywraca stan jak po konstruktorze w punkcie (x, y), bez tworzenia nowych obiektów -
+        GameMap używa tego przy restarcie zamiast budować wrogów od zera.
+        Losuje to samo co konstruktor, więc ten sam seed daje tę samą mapę.
+        """
+        self.pos.update(x, y)
+        self.prev_pos.update(x, y)
+        self.velocity.update(0, 0)
+        self.heading.update(1, 0)
+        self.side.update(-1, 0)
+        self.steering.reset()
+        self.steering_force.update(0, 0)
+        self.neighbors = []
+        self.smoother.reset()
+        self.smoothed_heading.update(self.heading)
 
-        # przyspieszenie: F = ma
-        acceleration = self.steering_force / self.mass
+        self.peek.reset()
+        self.is_peeking = False
+        self.visible_to_player = False
+        self.state = "explore"
+        self.attack_group_id = None
+        self.group.reset()
+        self.is_group_leader = False
+        if hasattr(self, "attack_offset"):
+            del self.attack_offset
+        self.uid = None
+        self.lod_slot = None
+
+    def interpolated_pos(self, alpha):
+        """Pozycja między poprzednim a ostatnim tickiem (alpha 0..1) - tylko do rysowania."""
+        return self.prev_pos.lerp(self.pos, alpha)
+
+    def update(self, dt, game_map, player=None, recompute_steering=True):
+        # sąsiedzi i stan grupy są liczone wcześniej dla całej mapy (GameMap.update_enemies)
+
+        # sterring - przy LOD dalecy wrogowie używają siły z ostatniego przeliczenia
+        # wszystkie wektory są aktualizowane w miejscu - tick wroga nie alokuje
+        if recompute_steering:
+            self.enemy_steering.calculate_steering(dt, player, game_map, self.steering_force)
+        else:
+            self.peek.update(dt)
 
-        # aktualizacja prędkości
-        self.velocity += acceleration * dt
+        # przyspieszenie: F = ma, aktualizacja prędkości
+        force = self.steering_force
+        velocity = self.velocity
+        inv_mass = 1.0 / self.mass
+        velocity.update(velocity.x + force.x * inv_mass * dt, velocity.y + force.y * inv_mass * dt)
 
         # przytnij prędkość do max_speed
-        if self.velocity.length() > self.max_speed:
-            self.velocity.scale_to_length(self.max_speed)
+        if velocity.length() > self.max_speed:
+            velocity.scale_to_length(self.max_speed)
 
         # aktualizacja pozycji
-        self.pos += self.velocity * dt
+        pos = self.pos
+        pos.update(pos.x + velocity.x * dt, pos.y + velocity.y * dt)
 
         # aktualizacja heading i side
-        if self.velocity.length_squared() > 1e-6:
-            self.heading = self.velocity.normalize()
-            self.side = pygame.Vector2(-self.heading.y, self.heading.x)
+        if velocity.length_squared() > 1e-6:
+            heading = self.heading
+            heading.update(velocity)
+            heading.normalize_ip()
+            self.side.update(-heading.y, heading.x)
 
         # smoothing
-        self.smoothed_heading = self.smoother.update(self.heading)
-
-        # Kolizje: przeszkody
-        self.collides_with_obstacles(game_map.obstacles)
-
-        # Kolizje: gracz i ściany
-        if player:
-            self.collides_with_player(player)
+        self.smoother.update_into(self.smoothed_heading, self.heading)
 
-        self.collides_with_walls(game_map.width, game_map.height)
-
-        # Non-Penetration Constraint dla wrogów
-        if game_map.enemies is not None:
-            self.enforce_non_penetration(game_map.enemies)
-
-    def draw(self, screen, enemies):
-        # wybór koloru w zależności od stanu
+    def draw_color(self):
+        """Kolor zależny od stanu (lider, follower, peek, eksploracja)."""
         if self.state == "attack":
             if self.is_group_leader:
-                color_to_draw = (237, 63, 19)  # lider
-            else:
-                color_to_draw = (245, 124, 17)  # followers
-        elif self.is_peeking:
-            color_to_draw = (242, 167, 202)
-        else:
-            color_to_draw = self.color  # normalny kolor
+                return LEADER_COLOR
+            return FOLLOWER_COLOR
+        if self.is_peeking:
+            return PEEKING_COLOR
+        return self.color  # normalny kolor
 
-        points = self.get_triangle_points()
-        pygame.draw.polygon(screen, color_to_draw, [(p.x, p.y) for p in points])
-
-        # debug: półprzezroczysta strefa
-        draw_neighbors_area(screen, self.pos, radius=self.flocking_radius, color=(80, 80, 200), alpha=10)
-
-        # debug: obwódki sąsiadów
-        # draw_neighbors_outline(screen, self.neighbors, outline_color=(0, 255, 0))
+    def sprite_blit(self, alpha=1.0, offset_x=0.0, offset_y=0.0):
+        """
+        (sprite, pozycja na ekranie) dla Surface.blits - trójkąt obrócony do smoothed_heading
+        z atlasu zamiast liczenia wierzchołków. offset - lewy górny róg widoku kamery w świecie.
+        """
+        atlas = sprite_atlas("enemy", self.radius)
+        prev, pos = self.prev_pos, self.pos
+        heading = self.smoothed_heading
+        # interpolated_pos bez tworzenia wektora
+        x = prev.x + (pos.x - prev.x) * alpha - offset_x - atlas.half
+        y = prev.y + (pos.y - prev.y) * alpha - offset_y - atlas.half
+        return atlas.sprite(self.draw_color(), atlas.index(heading.x, heading.y)), (x, y)
 
     def collides_with_obstacles(self, obstacles):
         collided = False
@@ -142,57 +170,35 @@ class Enemy:
     def collides_with_walls(self, map_width, map_height):
         collision_with_walls(self.pos, self.radius, map_width, map_height)
 
-    def enforce_non_penetration(self, agents):
-        """Wymusza brak nakładania się jednostek.
-        nie pozwalamy, aby lider był przesuwany przez followers.
+    def collides_with_wall_segments(self, walls):
+        for wall in walls:
+            resolve_circle_wall(self.pos, self.radius, wall)
+
+    @profiled("find_neighbors")
+    def find_neighbors(self, agents, spatial_hash=None):
+        """Zbiera listę sąsiadów tylko dla tego agenta.
+        Jeśli podano spatial_hash, sprawdzani są tylko agenci z okolicznych komórek.
         """
-        n = len(agents)
-        for i in range(n):
-            a = agents[i]
-            for j in range(i + 1, n):
-                b = agents[j]
-                # pomiń, jeśli to samo
-                if a is b:
-                    continue
-
-                delta = a.pos - b.pos
-                dist_sq = delta.length_squared()
-                min_dist = a.radius + b.radius
-
-                if dist_sq == 0:
-                    # losowy kierunek, by uniknąć podziału przez zero
-                    direction = pygame.Vector2(1, 0).rotate(random.uniform(0, 360))
-                    dist = 1.0
-                else:
-                    dist = math.sqrt(dist_sq)
-                    direction = delta / dist  # od b do a
-
-                overlap = min_dist - dist
-                if overlap > 0:
-                    # jeśli a jest liderem i b nie, przesuwamy tylko b
-                    if getattr(a, "is_group_leader", False) and not getattr(b, "is_group_leader", False):
-                        # przesuwamy b na zewnątrz (od a)
-                        b.pos -= direction * overlap
-                    elif getattr(b, "is_group_leader", False) and not getattr(a, "is_group_leader", False):
-                        # przesuwamy a na zewnątrz (od b)
-                        a.pos += direction * overlap
-                    else:
-                        half = overlap * 0.5
-                        a.pos += direction * half
-                        b.pos -= direction * half
-    def find_neighbors(self, agents):
-        """Zbiera listę sąsiadów tylko dla tego agenta."""
-        self.neighbors = []
+        neighbors = self.neighbors
+        neighbors.clear()
+
+        if spatial_hash is not None:
+            # zasięg musi objąć największy promień innego agenta
+            agents = spatial_hash.query(self.pos, self.flocking_radius + spatial_hash.max_radius)
 
+        x = self.pos.x
+        y = self.pos.y
+        flocking_radius = self.flocking_radius
         for other in agents:
             if other is self:
                 continue
 
-            to = other.pos - self.pos
-            range_check = self.flocking_radius + other.radius
+            dx = other.pos.x - x
+            dy = other.pos.y - y
+            range_check = flocking_radius + other.radius
 
-            if to.length_squared() < range_check ** 2:
-                self.neighbors.append(other)
+            if dx * dx + dy * dy < range_check ** 2:
+                neighbors.append(other)
 
     def melee_atack(self, player):
         player.take_damage(1)
@@ -1,16 +1,16 @@
-import pygame
-import math
-import time
-from collections import deque
+from utils.profiler import profiled
 
 class EnemyGroupManager:
     """
-    Zarządza stanem skupisk wrogów.
-    Odpowiada za:
-    - wykrycie grupy min. X botów i zmiane ich stanu (BFS)
-    - wyznaczenie jednego lidera ataku
-    - zapobieganie efektowi łańcuchowemu
+    Stan grupy jednego wroga.
+    Decyzje podejmuje raz na tick EnemyGroupSolver dla całej mapy,
+    a manager przechowuje wynik dla swojego Enemy:
+    - lider grupy (group_leader)
+    - id i rozmiar skupiska, do którego należy wróg
+    - start cooldownu przed atakiem
     """
+    __slots__ = ("enemy", "min_group_size", "attack_cooldown", "group_leader",
+                 "cluster_id", "cluster_size", "cooldown_start_time")
 
     def __init__(self, enemy, min_group_size=10, attack_cooldown=4.0):
         self.enemy = enemy
@@ -20,96 +20,156 @@ class EnemyGroupManager:
         # aktualny lider grupy
         self.group_leader = None
 
-        # timestamp startu cooldownu
+        # wynik ostatniego przebiegu grupowania
+        self.cluster_id = None
+        self.cluster_size = 1
+
+        # timestamp startu cooldownu (czas symulacji)
         self.cooldown_start_time = None
 
-    def find_full_group(self, include_attack=False):
-        """
-        Zwraca pełną grupę używając BFS.
-        """
-        visited = set()
-        queue = deque([self.enemy])
+    def reset(self):
+        self.group_leader = None
+        self.cluster_id = None
+        self.cluster_size = 1
+        self.cooldown_start_time = None
 
-        visited.add(self.enemy)
 
-        while queue:
-            current = queue.popleft()
-            for nb in current.neighbors:
-                if nb not in visited:
-                    if nb.state == "explore":
-                        visited.add(nb)
-                        queue.append(nb)
-                    elif include_attack and nb.state == "attack" and nb.attack_group_id == self.enemy.attack_group_id:
-                        visited.add(nb)
-                        queue.append(nb)
+class EnemyGroupSolver:
+    """
+    Grupowanie dla całej mapy - jeden przebieg na tick zamiast BFS z każdego wroga.
+    Odpowiada za:
+    - wykrycie skupisk min. X botów (union-find po grafie sąsiadów)
+    - cooldown przed atakiem i zmiane stanu całej grupy na attack
+    - wyznaczenie jednego lidera na grupę (także gdy lider padł)
+    """
 
-        return list(visited)
+    def __init__(self, min_group_size=10, attack_cooldown=4.0):
+        self.min_group_size = min_group_size
+        self.attack_cooldown = attack_cooldown
 
-    def pick_new_leader(self, group):
+        # czas symulacji (suma dt) - niezależny od zegara ściennego
+        self.sim_time = 0.0
+
+    def reset(self):
+        self.sim_time = 0.0
+
+    @staticmethod
+    def find_clusters(enemies):
+        """
+        Union-find po krawędziach sąsiedztwa między wrogami w stanie explore.
+        Zwraca listę skupisk (list wrogów).
         """
-        Wybiera nowego lidera grupy spośród aktywnych członków.
+        index = {e: i for i, e in enumerate(enemies)}
+        parent = list(range(len(enemies)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for i, e in enumerate(enemies):
+            if e.state != "explore":
+                continue
+            for nb in e.neighbors:
+                if nb.state != "explore":
+                    continue
+                j = index.get(nb)
+                if j is None:
+                    continue
+                ri, rj = find(i), find(j)
+                if ri != rj:
+                    parent[rj] = ri
+
+        clusters = {}
+        for i, e in enumerate(enemies):
+            if e.state == "explore":
+                clusters.setdefault(find(i), []).append(e)
+        return list(clusters.values())
+
+    @staticmethod
+    def pick_new_leader(group):
+        """
+        Wybiera lidera grupy spośród aktywnych członków i ustawia flagi członków.
         """
         alive_members = [e for e in group if e.state != "dead"]
         if not alive_members:
-            self.group_leader = None
-            return
+            return None
 
-        # kryterium wyboru lidera (np. najmniejszy id)
-        new_leader = min(alive_members, key=lambda e: id(e))
-        self.group_leader = new_leader
+        # kryterium wyboru lidera (najmniejszy uid) - stabilne między tickami i po wczytaniu replaya
+        new_leader = min(alive_members, key=lambda e: e.uid if e.uid is not None else id(e))
 
-        # flagi wśród członków grupy
         for e in alive_members:
             e.is_group_leader = (e is new_leader)
-            e.attack_group_id = id(new_leader) if e.state == "attack" else None
+            e.group.group_leader = new_leader
             # reset offset followers
             if not e.is_group_leader and hasattr(e, 'attack_offset'):
                 del e.attack_offset  # wymusi losowanie w EnemySteering
+        return new_leader
 
-    def update(self):
+    @profiled("group.update")
+    def update(self, enemies, dt):
         """
-        Podejmuje decyzję czy Enemy ma przejść w stan attack.
-        wybiera nowego lidera, gdy obecny lider padł
-
+        Podejmuje decyzje dla wszystkich skupisk naraz:
+        start/reset cooldownu, przejście w attack i wybór liderów.
+        Wymaga aktualnych Enemy.neighbors.
         """
-        if self.enemy.state == "attack" :
-            if self.group_leader is None or self.group_leader.state == "dead":
-                alive_attackers = [e for e in self.find_full_group(include_attack=True) if e.state == "attack"]
-                if alive_attackers:
-                    self.pick_new_leader(alive_attackers)
-            return
+        self.sim_time += dt
+        now = self.sim_time
+
+        for group in self.find_clusters(enemies):
+            self._update_explore_group(group, now)
 
-        group = [e for e in self.find_full_group() if e.state == "explore"]
+        self._update_attack_groups(enemies)
+
+    def _update_explore_group(self, group, now):
         group_size = len(group)
 
         if group_size < self.min_group_size:
             # grupa jest za mała - reset cooldown, pozostajemy w explore
-            self.cooldown_start_time = None
+            for e in group:
+                e.is_group_leader = False
+                e.group.group_leader = None
+                e.group.cluster_id = None
+                e.group.cluster_size = group_size
+                e.group.cooldown_start_time = None
             return
 
-        # jeśli lider nie istnieje, wybierz lidera
-        if self.group_leader is None or getattr(self.group_leader, 'state', None) == "dead":
-            self.pick_new_leader(group)
-
-        now = time.time()
+        leader = self.pick_new_leader(group)
+        group_id = leader.uid if leader.uid is not None else id(leader)
 
-        # start cooldown
-        if self.cooldown_start_time is None:
-            self.cooldown_start_time = now
-            return  # czas na eksplorację
+        # start cooldown (członkowie, którzy dopiero dołączyli, startują teraz)
+        ready = False
+        for e in group:
+            e.group.cluster_id = group_id
+            e.group.cluster_size = group_size
+            e.attack_group_id = None
+            if e.group.cooldown_start_time is None:
+                e.group.cooldown_start_time = now
+            elif now - e.group.cooldown_start_time >= self.attack_cooldown:
+                ready = True
 
         # czy cooldown minął
-        if now - self.cooldown_start_time >= self.attack_cooldown:
-            # sprawdzamy ponownie, czy grupa jest nadal >= min_group_size
-            group = [e for e in self.find_full_group() if e.state == "explore"]
-            group_size = len(group)
-            if group_size >= self.min_group_size:
-                # atakujemy
-                self.pick_new_leader(group)
-                new_group_id = id(self.group_leader)
-                for e in group:
-                    e.state = "attack"
-                    e.attack_group_id = new_group_id
-                    e.is_group_leader = (e is self.group_leader)
+        if ready:
+            # atakujemy
+            for e in group:
+                e.state = "attack"
+                e.attack_group_id = group_id
                 # reset cooldown
-                self.cooldown_start_time = None
+                e.group.cooldown_start_time = None
+
+    def _update_attack_groups(self, enemies):
+        """Wybiera nowego lidera w grupach ataku, których lider padł."""
+        groups = {}
+        for e in enemies:
+            if e.state == "attack":
+                groups.setdefault(e.attack_group_id, []).append(e)
+
+        for group_id, group in groups.items():
+            leader = group[0].group.group_leader
+            if leader is None or leader.state == "dead" or leader.attack_group_id != group_id:
+                leader = self.pick_new_leader(group)
+            for e in group:
+                e.group.group_leader = leader
+                e.group.cluster_id = group_id
+                e.group.cluster_size = len(group)
@@ -6,6 +6,9 @@ class EnemyPeek:
     """
     Obsługuje logikę krótkiego wychodzenia zza przeszkód (peek) dla Enemy.
     """
+    __slots__ = ("enemy", "base_chance", "group_scale", "min_duration", "max_duration", "check_interval",
+                 "peeking", "peek_timer", "peek_duration", "cooldown", "_check_acc")
+
     def __init__(self, enemy, base_chance = 0.19, group_scale = 0.9, min_duration = 1.0,
                  max_duration = 3.0, check_interval = 0.25):
         self.enemy = enemy
@@ -28,6 +31,14 @@ class EnemyPeek:
         # wewnętrzny licznik
         self._check_acc = 0.0
 
+    def reset(self):
+        """Stan jak po konstruktorze (nowy losowy cooldown)."""
+        self.peeking = False
+        self.peek_timer = 0.0
+        self.peek_duration = 0.0
+        self.cooldown = random.uniform(2.0, 6.0)
+        self._check_acc = 0.0
+
     def update(self, dt):
         """
         Wywoływane co klatkę. Jeśli peeking: odliczamy czas.
@@ -1,10 +1,34 @@
+import math
 import pygame
 import random
+from collections import Counter
 from .enemy_peek import EnemyPeek
+from utils.profiler import profiled
+from config import PRIORITIZED_STEERING
 
 class EnemySteering:
-    def __init__(self, enemy):
+    """
+    Wybór i ważenie zachowań wroga. Siły zachowań trafiają do jednego bufora `_force`,
+    a suma jest liczona na skalarach i zapisywana do `out` (Enemy.steering_force),
+    więc tick wroga nie tworzy tymczasowych wektorów.
+
+    W trybie prioritized (ważona, obcinana suma z priorytetami) zachowania są liczone
+    od najważniejszego, a każde dostaje tylko tyle siły, ile zostało do max_force.
+    Gdy budżet się wyczerpie, pozostałe zachowania (zwykle flocking, wander, w ataku
+    flow_field) nie są w ogóle liczone - ścisk wrogów kosztuje wtedy mniej.
+    """
+    __slots__ = ("enemy", "explore_weights", "attack_weights", "probabilities", "prioritized", "_force")
+
+    # wspólne dla wszystkich wrogów (tylko w trybie prioritized): ile razy zachowanie policzono,
+    # a ile pominięto przez wyczerpany budżet
+    evaluated = Counter()
+    skipped = Counter()
+
+    def __init__(self, enemy, prioritized=PRIORITIZED_STEERING):
         self.enemy = enemy
+        self.prioritized = prioritized
+        # bufor na wynik pojedynczego zachowania
+        self._force = pygame.Vector2()
 
         # wagi zachowań dla trybu eksploracji
         self.explore_weights = {
@@ -25,7 +49,8 @@ class EnemySteering:
             "alignment": 300,
             "cohesion": 0.1,
             "offset_pursuit": 100,
-            "pursuit": 60
+            "pursuit": 60,
+            "flow_field": 60
         }
 
         # prawdopodobieństwa wykonania zachowań
@@ -40,7 +65,11 @@ class EnemySteering:
         }
 
 
-    def calculate_steering(self, dt, player=None, game_map=None):
+    @profiled("calculate_steering")
+    def calculate_steering(self, dt, player=None, game_map=None, out=None):
+        """Siła sterująca na ten tick - zapisywana do `out` (bez `out` - nowy wektor)."""
+        if out is None:
+            out = pygame.Vector2()
         self.enemy.peek.update(dt)
 
         if self.enemy.state == "attack":
@@ -48,105 +77,208 @@ class EnemySteering:
             leader = getattr(self.enemy.group, "group_leader", None)
             if leader is None:
                 # fallback - brak lidera
-                return self.exploration_mode(dt, player, game_map)
-            return self.attack_mode(dt, leader, player, game_map)
+                return self.exploration_mode(dt, player, game_map, out)
+            return self.attack_mode(dt, leader, player, game_map, out)
         else:
-            return self.exploration_mode(dt, player, game_map)
+            return self.exploration_mode(dt, player, game_map, out)
 
-    def wall_avoidance(self, dt, player, game_map):
-        return self.enemy.steering.wall_avoidance(game_map.walls)
+    def wall_avoidance(self, dt, player, game_map, out=None):
+        return self.enemy.steering.wall_avoidance(game_map.walls, out, game_map.wall_index)
 
 
-    def obstacle_avoidance(self, dt, player, game_map):
-        return self.enemy.steering.obstacle_avoidance(game_map.obstacles)
+    def obstacle_avoidance(self, dt, player, game_map, out=None):
+        return self.enemy.steering.obstacle_avoidance(game_map.obstacles, game_map.obstacle_index, out)
 
 
-    def separation(self, dt, player, game_map):
-        return self.enemy.steering.separation(self.enemy.neighbors)
+    def separation(self, dt, player, game_map, out=None):
+        return self.enemy.steering.separation(self.enemy.neighbors, out)
 
 
-    def alignment(self, dt, player, game_map):
-        return self.enemy.steering.alignment()
+    def alignment(self, dt, player, game_map, out=None):
+        return self.enemy.steering.alignment(out)
 
 
-    def cohesion(self, dt, player, game_map):
-        return self.enemy.steering.cohesion(self.enemy.neighbors)
+    def cohesion(self, dt, player, game_map, out=None):
+        return self.enemy.steering.cohesion(self.enemy.neighbors, out)
 
 
-    def wander(self, dt, player, game_map):
-        return self.enemy.steering.wander(dt)
+    def wander(self, dt, player, game_map, out=None):
+        return self.enemy.steering.wander(dt, out)
 
 
-    def hide(self, dt, player, game_map):
+    def hide(self, dt, player, game_map, out=None):
         if player is None:
-            return pygame.Vector2(0, 0)
-        return self.enemy.steering.hide(player, game_map.obstacles)
-
-    def pursuit(self, dt, player, game_map):
-        return self.enemy.steering.pursuit(player)
-
-    def offset_pursuit(self, dt, leader, game_map):
+            if out is None:
+                return pygame.Vector2(0, 0)
+            out.update(0, 0)
+            return out
+        return self.enemy.steering.hide(player, game_map.obstacles, game_map.hiding_spots, out,
+                                        game_map.navigation)
+
+    def pursuit(self, dt, player, game_map, out=None):
+        return self.enemy.steering.pursuit(player, out)
+
+    def flow_field(self, dt, player, game_map, out=None):
+        return self.enemy.steering.flow_field(game_map.flow_field, out)
+
+    def follows_flow_field(self, game_map) -> bool:
+        """Gracz poza zasięgiem wzroku i pole ma drogę z pozycji wroga - zamiast pursuit idziemy polem."""
+        field = game_map.flow_field if game_map is not None else None
+        if field is None or self.enemy.visible_to_player:
+            return False
+        return field.next_point(self.enemy.pos.x, self.enemy.pos.y) is not None
+
+    def offset_pursuit(self, dt, leader, game_map, out=None):
         if not hasattr(self.enemy, 'attack_offset'):
             # losowy offset w lokalnej przestrzeni lidera
             self.enemy.attack_offset = pygame.Vector2(
                 random.uniform(-30, 30),
                 random.uniform(-30, 30)
             )
-        return self.enemy.steering.offset_pursuit(leader, self.enemy.attack_offset)
-
-    def exploration_mode(self, dt, player, game_map):
-        steering_force = pygame.Vector2(0, 0)
-
-        behaviors = ["hide", "separation", "wall_avoidance", "obstacle_avoidance",
-                     "alignment", "cohesion", "wander"]
-
-        for behavior in behaviors:
-            if behavior == "hide" and self.enemy.peek.is_peeking():
+        return self.enemy.steering.offset_pursuit(leader, self.enemy.attack_offset, out)
+
+    @classmethod
+    def skip_ratios(cls) -> dict:
+        """Ułamek wywołań pominiętych przez wyczerpany budżet siły, dla każdego zachowania."""
+        names = cls.evaluated.keys() | cls.skipped.keys()
+        return {name: cls.skipped[name] / (cls.skipped[name] + cls.evaluated[name]) for name in names}
+
+    @classmethod
+    def reset_stats(cls):
+        cls.evaluated.clear()
+        cls.skipped.clear()
+
+    def exploration_mode(self, dt, player, game_map, out=None):
+        if out is None:
+            out = pygame.Vector2()
+        force = self._force
+        weights = self.explore_weights
+        probabilities = self.probabilities
+        peeking = self.enemy.peek.is_peeking()
+        prioritized = self.prioritized
+        max_force = self.enemy.max_force
+        evaluated = self.evaluated
+        skipped = self.skipped
+        force_x = force_y = 0.0
+        spent = False
+
+        for behavior, method in EXPLORE_PRIORITY if prioritized else EXPLORE_BEHAVIORS:
+            if behavior == "hide" and peeking:
+                continue
+            if spent:
+                skipped[behavior] += 1
                 continue
 
-            if random.random() <= self.probabilities.get(behavior, 1.0):
-                force = getattr(self, behavior)(dt, player, game_map) * self.explore_weights.get(behavior, 1.0)
+            if random.random() <= probabilities.get(behavior, 1.0):
+                method(self, dt, player, game_map, force)
+                if prioritized:
+                    evaluated[behavior] += 1
+                weight = weights.get(behavior, 1.0)
+                x = force.x * weight
+                y = force.y * weight
 
-                if self.enemy.peek.is_peeking() and behavior == "wander":
-                    force *= 1.8
+                if peeking and behavior == "wander":
+                    x *= 1.8
+                    y *= 1.8
 
-                steering_force += force
+                if prioritized:
+                    x, y, spent = truncate_to_budget(force_x, force_y, x, y, max_force)
+                force_x += x
+                force_y += y
 
         # ograniczamy siłę do max_force
-        if steering_force.length() > self.enemy.max_force:
-            steering_force.scale_to_length(self.enemy.max_force)
-
-        return steering_force
-
-    def attack_mode(self, dt, leader, player, game_map):
-        steering_force = pygame.Vector2(0, 0)
-
-        # Jeśli to lider - pursuit
+        out.update(force_x, force_y)
+        if out.length() > self.enemy.max_force:
+            out.scale_to_length(self.enemy.max_force)
+
+        return out
+
+    def attack_mode(self, dt, leader, player, game_map, out=None):
+        if out is None:
+            out = pygame.Vector2()
+        force = self._force
+        weights = self.attack_weights
+        prioritized = self.prioritized
+        max_force = self.enemy.max_force
+        evaluated = self.evaluated
+        skipped = self.skipped
+        force_x = force_y = 0.0
+        spent = False
+
+        # Jeśli to lider - pursuit; followers - offset_pursuit + flocking
+        # lider musi iść do gracza i unikać przeszkód/ścian
+        # bez linii wzroku do gracza pursuit utknąłby za przeszkodą - lider idzie wtedy polem przepływu,
+        # a followers dostają je jako dodatkową siłę
+        flow = player is not None and self.follows_flow_field(game_map)
         if self.enemy.is_group_leader:
-            # lider musi iść do gracza i unikać przeszkód/ścian
-            force_pursuit = self.pursuit(dt, player, game_map) if player is not None else pygame.Vector2(0, 0)
-
-            steering_force += force_pursuit * self.attack_weights.get("pursuit", 1.0)
-            steering_force += self.obstacle_avoidance(dt, player, game_map) * self.attack_weights.get(
-                "obstacle_avoidance", 1.0)
-            steering_force += self.wall_avoidance(dt, player, game_map) * self.attack_weights.get(
-                "wall_avoidance", 1.0)
-
+            behaviors = ATTACK_LEADER_PRIORITY if prioritized else ATTACK_LEADER_BEHAVIORS
         else:
-            # followers - offset_pursuit
-            steering_force += self.offset_pursuit(dt, leader, game_map) * self.attack_weights.get("offset_pursuit", 1.0)
-            # separation / alignment / cohesion
-            steering_force += self.separation(dt, leader, game_map) * self.attack_weights.get("separation", 1.0)
-            steering_force += self.alignment(dt, leader, game_map) * self.attack_weights.get("alignment", 1.0)
-            steering_force += self.cohesion(dt, leader, game_map) * self.attack_weights.get("cohesion", 1.0)
-            # avoidance
-            steering_force += self.obstacle_avoidance(dt, player, game_map) * self.attack_weights.get(
-                "obstacle_avoidance", 1.0)
-            steering_force += self.wall_avoidance(dt, player, game_map) * self.attack_weights.get(
-                "wall_avoidance", 1.0)
+            behaviors = ATTACK_FOLLOWER_PRIORITY if prioritized else ATTACK_FOLLOWER_BEHAVIORS
+        for behavior, method, target in behaviors:
+            if behavior == "flow_field" and not flow:
+                continue
+            if behavior == "pursuit" and (player is None or flow):
+                if prioritized:
+                    continue
+                force.update(0, 0)
+            elif spent:
+                skipped[behavior] += 1
+                continue
+            else:
+                # followers liczą separation / alignment / cohesion względem lidera
+                method(self, dt, leader if target == "leader" else player, game_map, force)
+                if prioritized:
+                    evaluated[behavior] += 1
+            weight = weights.get(behavior, 1.0)
+            x = force.x * weight
+            y = force.y * weight
+            if prioritized:
+                x, y, spent = truncate_to_budget(force_x, force_y, x, y, max_force)
+            force_x += x
+            force_y += y
 
         # ograniczamy siłę do max_force
-        if steering_force.length() > self.enemy.max_force:
-            steering_force.scale_to_length(self.enemy.max_force)
-
-        return steering_force
\ No newline at end of file
+        out.update(force_x, force_y)
+        if out.length() > self.enemy.max_force:
+            out.scale_to_length(self.enemy.max_force)
+
+        return out
+
+
+def truncate_to_budget(total_x, total_y, x, y, max_force):
+    """
+    Siła (x, y) przycięta do budżetu, który został po sumie (total_x, total_y).
+    Zwraca (x, y, czy budżet wyczerpany) - po wyczerpaniu kolejne zachowania są pomijane.
+    """
+    remaining = max_force - math.hypot(total_x, total_y)
+    if remaining <= 0.0:
+        return 0.0, 0.0, True
+    magnitude = math.hypot(x, y)
+    if magnitude < remaining:
+        return x, y, False
+    scale = remaining / magnitude
+    return x * scale, y * scale, True
+
+
+# kolejność zachowań ma znaczenie - każde losuje z `random` (powtarzalność przebiegu)
+EXPLORE_BEHAVIORS = tuple((name, getattr(EnemySteering, name)) for name in (
+    "hide", "separation", "wall_avoidance", "obstacle_avoidance", "alignment", "cohesion", "wander"))
+
+# (zachowanie, metoda, drugi argument: "player" albo "leader")
+ATTACK_LEADER_BEHAVIORS = tuple((name, getattr(EnemySteering, name), target) for name, target in (
+    ("pursuit", "player"), ("flow_field", "player"), ("obstacle_avoidance", "player"),
+    ("wall_avoidance", "player")))
+ATTACK_FOLLOWER_BEHAVIORS = tuple((name, getattr(EnemySteering, name), target) for name, target in (
+    ("offset_pursuit", "leader"), ("flow_field", "player"), ("separation", "leader"), ("alignment", "leader"),
+    ("cohesion", "leader"), ("obstacle_avoidance", "player"), ("wall_avoidance", "player")))
+
+# tryb prioritized - od najważniejszego: kolizje, cel zachowania, flocking
+# hide przed separation - inaczej w tłumie separation zjada cały budżet, wrogowie się rozchodzą i nie tworzą grup
+EXPLORE_PRIORITY = tuple((name, getattr(EnemySteering, name)) for name in (
+    "wall_avoidance", "obstacle_avoidance", "hide", "separation", "alignment", "cohesion", "wander"))
+ATTACK_LEADER_PRIORITY = tuple((name, getattr(EnemySteering, name), target) for name, target in (
+    ("wall_avoidance", "player"), ("obstacle_avoidance", "player"), ("pursuit", "player"),
+    ("flow_field", "player")))
+ATTACK_FOLLOWER_PRIORITY = tuple((name, getattr(EnemySteering, name), target) for name, target in (
+    ("wall_avoidance", "player"), ("obstacle_avoidance", "player"), ("separation", "leader"),
+    ("offset_pursuit", "leader"), ("flow_field", "player"), ("alignment", "leader"), ("cohesion", "leader")))
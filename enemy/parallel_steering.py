@@ -0,0 +1,307 @@
+import atexit
+import os
+import traceback
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from types import SimpleNamespace
+from utils.profiler import profiled
+from .swarm_engine import SwarmEngine, SteeringContext, csr_pairs, steer_rows, np
+
+# tablice stanu roju w pamięci współdzielonej: nazwa -> (kształt jednego wiersza, dtype)
+SHARED_FIELDS = {
+    "pos": ((2,), "f8"),
+    "velocity": ((2,), "f8"),
+    "heading": ((2,), "f8"),
+    "side": ((2,), "f8"),
+    "wander_target": ((2,), "f8"),
+    "steering_force": ((2,), "f8"),
+    "radius": ((), "f8"),
+    "flocking_radius": ((), "f8"),
+    "mass": ((), "f8"),
+    "max_speed": ((), "f8"),
+    "max_force": ((), "f8"),
+    "attacking": ((), "?"),
+    "is_leader": ((), "?"),
+    "peeking": ((), "?"),
+    "attack_offset": ((2,), "f8"),
+    "leader_state": ((8,), "f8"),
+    "uid": ((), "i8"),
+    "use_flow": ((), "?"),
+    "flow_target": ((2,), "f8"),
+}
+
+
+class SharedArrays:
+    """
+    Tablice o kształtach `shapes` (nazwa -> (kształt, dtype)) w jednym bloku SharedMemory.
+    Proces główny tworzy blok, procesy robocze podłączają się do niego po nazwie.
+    """
+
+    def __init__(self, shapes, name=None):
+        self.shapes = shapes
+        layout, size = self.layout(shapes)
+        self.shm = shared_memory.SharedMemory(name=name, create=name is None, size=max(size, 1))
+        self.name = self.shm.name
+        self.arrays = {field: np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=offset)
+                       for field, (shape, dtype, offset) in layout.items()}
+
+    @staticmethod
+    def rows(capacity, fields=SHARED_FIELDS):
+        """Kształty tablic po `capacity` wierszy o polach `fields`."""
+        return {field: ((capacity,) + row_shape, dtype) for field, (row_shape, dtype) in fields.items()}
+
+    @staticmethod
+    def layout(shapes):
+        layout = {}
+        offset = 0
+        for field, (shape, dtype) in shapes.items():
+            nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+            layout[field] = (shape, dtype, offset)
+            offset += (nbytes + 7) // 8 * 8  # wyrównanie do 8 bajtów
+        return layout, offset
+
+    def close(self):
+        self.arrays = {}
+        try:
+            self.shm.close()
+        except BufferError:
+            # ktoś jeszcze trzyma widok na blok - zamknie go system przy wyjściu
+            pass
+
+    def unlink(self):
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _worker_main(conn, seed):
+    """
+    Proces roboczy: podłącza się do bloków pamięci współdzielonej ("attach") i na zadanie
+    ("steer", lo, hi, ...) liczy siły sterujące wierszy tick.rows[lo:hi], zapisując je
+    do współdzielonych steering_force i wander_target.
+    """
+    rng = np.random.default_rng(seed)
+    blocks = {}
+    weights = None
+    while True:
+        message = conn.recv()
+        kind = message[0]
+        if kind == "stop":
+            break
+        if kind == "attach":
+            _, block, name, shapes, extra = message
+            if block in blocks:
+                blocks[block].close()
+            blocks[block] = SharedArrays(shapes, name)
+            if block == "context":
+                weights = extra
+            continue
+
+        try:
+            _steer(blocks, weights, message, rng)
+            conn.send(("done",))
+        except Exception:
+            conn.send(("error", traceback.format_exc()))
+
+    for shared in blocks.values():
+        shared.close()
+    conn.close()
+
+
+def _steer(blocks, weights, message, rng):
+    # osobna funkcja - widoki na bloki znikają razem z ramką, więc "attach" może zamknąć stary blok
+    _, lo, hi, n, spot_count, has_player, dt = message
+    if hi == lo:
+        return
+    state = SimpleNamespace(count=n, **blocks["state"].arrays)
+    static = blocks["context"].arrays
+    tick = blocks["tick"].arrays
+
+    rows = tick["rows"][lo:hi]
+    bounds = tick["bounds"][:n + 1]
+    I, J = csr_pairs(tick["neighbors"], bounds, rows)
+    explore_weights, attack_weights, probabilities, cell_size = weights
+    obs_cells = (static["cell_keys"], static["cell_ids"], cell_size) if cell_size is not None else None
+    ctx = SteeringContext(explore_weights, attack_weights, probabilities, static["obs_pos"], static["obs_radius"],
+                          static["walls"], tick["spots"][:spot_count] if has_player else None,
+                          tick["player_state"] if has_player else None, obs_cells)
+    state.steering_force[rows] = steer_rows(state, rows, I, J, np.diff(bounds), ctx, dt, rng)
+
+
+class ParallelSwarmEngine(SwarmEngine):
+    """
+    SwarmEngine, który liczy steering w kilku procesach.
+    Stan roju leży w pamięci współdzielonej; w ramach ticka siła każdego wroga zależy
+    tylko od stanu z poprzedniego ticka, więc procesy robocze liczą rozłączne części
+    wierszy bez synchronizacji. Integracja, grupy i kolizje zostają w procesie głównym.
+
+    Poza stanem roju w pamięci współdzielonej są dwa bloki:
+    context - przeszkody, ściany i ich siatka, przepisywany tylko po zmianie mapy;
+    tick - sąsiedzi z find_neighbors, wiersze do policzenia, punkty ukrycia i gracz,
+    nadpisywany co tick (nowy blok tylko, gdy dane przerosną pojemność).
+    Zadanie dla procesu to sam zakres wierszy - nic nie jest piklowane co tick.
+    """
+
+    def __init__(self, seed=None, workers=None):
+        self._shared = None
+        self._context = None
+        self._context_source = None
+        self._context_weights = None
+        self._tick = None
+        self._retired = []
+        self._conns = []
+        self._processes = []
+        super().__init__(seed)
+
+        workers = workers or os.cpu_count() or 1
+        # ziarna procesów z rng silnika - ten sam seed i liczba procesów dają ten sam przebieg
+        seeds = self.rng.integers(0, 2 ** 63, size=workers)
+        context = mp.get_context()
+        for worker_seed in seeds.tolist():
+            parent_conn, child_conn = context.Pipe()
+            process = context.Process(target=_worker_main, args=(child_conn, worker_seed), daemon=True)
+            process.start()
+            child_conn.close()
+            self._conns.append(parent_conn)
+            self._processes.append(process)
+        self._attach_workers()
+        atexit.register(self.close)
+
+    @property
+    def workers(self):
+        return len(self._conns)
+
+    def _allocate(self, capacity):
+        # kolumny tylko procesu głównego (grupy, peek, LOD) jak w SwarmEngine,
+        # kolumny czytane przez procesy robocze - w pamięci współdzielonej
+        super()._allocate(capacity)
+        shared = SharedArrays(SharedArrays.rows(capacity))
+        for field, array in shared.arrays.items():
+            setattr(self, field, array)
+        self.mass[:] = 1.0
+
+        self._retire(self._shared)
+        self._shared = shared
+        if self._conns:
+            self._attach_workers()
+
+    def _attach_workers(self, block="state", shared=None, extra=None):
+        shared = shared or self._shared
+        for conn in self._conns:
+            conn.send(("attach", block, shared.name, shared.shapes, extra))
+
+    def _retire(self, shared):
+        # proces może jeszcze nie przeczytać "attach" z nowym blokiem - stary jest zwalniany
+        # dopiero po najbliższym zadaniu, na które odpowiedziały wszystkie procesy
+        if shared is not None:
+            self._retired.append(shared)
+
+    def _release_retired(self):
+        for shared in self._retired:
+            shared.unlink()
+            shared.close()
+        self._retired = []
+
+    def _share_context(self, ctx):
+        """Przeszkody, ściany i siatka przeszkód do bloku context - tylko gdy zmieniła się mapa."""
+        source = (ctx.obs_pos, ctx.obs_radius, ctx.walls, ctx.obs_cells)
+        weights = (ctx.explore_weights, ctx.attack_weights, ctx.probabilities)
+        # tablice z pamięci podręcznej silnika - ta sama mapa daje te same obiekty
+        if (self._context is not None and all(a is b for a, b in zip(source, self._context_source))
+                and self._context_weights == weights):
+            return
+        keys, ids, cell_size = ctx.obs_cells if ctx.obs_cells is not None else (
+            np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), None)
+        arrays = {"obs_pos": ctx.obs_pos, "obs_radius": ctx.obs_radius, "walls": ctx.walls,
+                  "cell_keys": keys, "cell_ids": ids}
+        shared = SharedArrays({field: (array.shape, array.dtype.str) for field, array in arrays.items()})
+        for field, array in arrays.items():
+            shared.arrays[field][...] = array
+        self._retire(self._context)
+        self._context = shared
+        self._context_source = source
+        self._context_weights = weights
+        self._attach_workers("context", shared, weights + (cell_size,))
+
+    def _share_tick(self, rows, ctx):
+        """Sąsiedzi, wiersze, punkty ukrycia i gracz do bloku tick. Zwraca liczbę punktów ukrycia."""
+        n = self.count
+        neighbors, bounds = self._pair_rows
+        spots = ctx.spots if ctx.spots is not None else np.empty((0, 2))
+        sizes = {"neighbors": len(neighbors), "bounds": n + 1, "rows": len(rows), "spots": len(spots)}
+        tick = self._tick
+        if tick is None or any(sizes[field] > len(tick.arrays[field]) for field in sizes):
+            # zapas, żeby rosnący tłum nie tworzył bloku co tick
+            shapes = {field: ((max(2 * size, 64),) + ((2,) if field == "spots" else ()),
+                              "f8" if field == "spots" else "i8")
+                      for field, size in sizes.items()}
+            shapes["player_state"] = ((6,), "f8")
+            tick = SharedArrays(shapes)
+            self._retire(self._tick)
+            self._tick = tick
+            self._attach_workers("tick", tick)
+
+        arrays = tick.arrays
+        arrays["neighbors"][:len(neighbors)] = neighbors
+        arrays["bounds"][:n + 1] = bounds
+        arrays["rows"][:len(rows)] = rows
+        arrays["spots"][:len(spots)] = spots
+        if ctx.player_state is not None:
+            arrays["player_state"][:] = ctx.player_state
+        return len(spots)
+
+    @profiled("calculate_steering")
+    def calculate_steering(self, dt, I, J, counts, game_map, player, rows=None):
+        """
+        Dzieli wiersze na rozłączne zakresy i czeka, aż procesy robocze zapiszą swoje siły.
+        Pary sąsiadów są te z find_neighbors (posortowane _pair_rows), procesy ich nie szukają.
+        """
+        ctx = self.prepare_steering(game_map, player)
+        n = self.count
+        if rows is None:
+            rows = np.arange(n)
+        self._share_context(ctx)
+        spot_count = self._share_tick(rows, ctx)
+        has_player = ctx.player_state is not None
+
+        # zadanie dostaje każdy proces (także z pustym zakresem), więc po odpowiedziach
+        # wszystkie przeczytały już "attach" i stare bloki można zwolnić
+        edges = np.linspace(0, len(rows), len(self._conns) + 1).astype(int).tolist()
+        for conn, lo, hi in zip(self._conns, edges[:-1], edges[1:]):
+            conn.send(("steer", lo, hi, n, spot_count, has_player, dt))
+
+        errors = []
+        for conn in self._conns:
+            reply = conn.recv()
+            if reply[0] == "error":
+                errors.append(reply[1])
+        self._release_retired()
+        if errors:
+            raise RuntimeError("błąd w procesie roboczym steeringu:\n" + errors[0])
+        return self.steering_force[rows]
+
+    def close(self):
+        """Zatrzymuje procesy robocze i zwalnia pamięć współdzieloną."""
+        for conn in self._conns:
+            try:
+                conn.send(("stop",))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join(timeout=1.0)
+            if process.is_alive():
+                process.terminate()
+        for conn in self._conns:
+            conn.close()
+        self._conns = []
+        self._processes = []
+
+        if self._shared is not None:
+            for field in SHARED_FIELDS:
+                setattr(self, field, None)
+        for shared in (self._shared, self._context, self._tick):
+            self._retire(shared)
+        self._shared = self._context = self._tick = None
+        self._context_source = self._context_weights = None
+        self._release_retired()
@@ -0,0 +1,1308 @@
+import math
+import random
+import pygame
+from config import HEADING_SMOOTHING_SAMPLES
+from utils import ray_query
+from utils.profiler import profiled
+from utils.smoothing import BatchSmoother
+
+try:
+    import numpy as np
+except ImportError:  # silnik jest opcjonalny - bez numpy gra działa na obiektach Enemy
+    np = None
+
+# maks. liczba elementów tablicy (wrogowie x 3 feelery x ściany) w jednym przebiegu wall_avoidance
+WALL_TEST_BLOCK = 1 << 18
+# minimalna długość detection boxa (jak SteeringBehaviors.min_detection_box_length)
+MIN_DETECTION_BOX_LENGTH = 120.0
+
+
+# ---------------------------------------------------------------------------
+# Kernele - czyste funkcje na tablicach (N, 2). Każda liczy jedno zachowanie
+# dla wszystkich agentów naraz, tak samo jak odpowiednia metoda SteeringBehaviors.
+# ---------------------------------------------------------------------------
+
+def normalize(vecs):
+    """Normalizuje wiersze; zerowe wektory zostają zerowe."""
+    length = np.sqrt(np.einsum("ij,ij->i", vecs, vecs))
+    out = np.zeros_like(vecs)
+    nz = length > 0
+    out[nz] = vecs[nz] / length[nz, None]
+    return out
+
+
+def truncate(vecs, max_length):
+    """Przycina długość wierszy do max_length (skalar lub tablica N)."""
+    length = np.sqrt(np.einsum("ij,ij->i", vecs, vecs))
+    max_length = np.broadcast_to(max_length, length.shape)
+    over = length > max_length
+    if over.any():
+        vecs[over] *= (max_length[over] / length[over])[:, None]
+    return vecs
+
+
+def neighbor_pairs(pos, radius, flocking_radius, rows=None):
+    """
+    Zwraca pary indeksów (I, J): J jest sąsiadem I, gdy
+    |pos[J] - pos[I]| < flocking_radius[I] + radius[J] - jak w Enemy.find_neighbors.
+    Siatka o komórkach wielkości największego zasięgu, bez pętli po agentach.
+    rows - opcjonalny podzbiór agentów I, dla których szukamy sąsiadów.
+    """
+    n = len(pos)
+    empty = np.zeros(0, dtype=np.int64)
+    if n == 0:
+        return empty, empty
+    if rows is not None and len(rows) == 0:
+        return empty, empty
+
+    # komórka mieści cały zasięg - wystarczą sąsiednie komórki (3 x 3)
+    cell_size = max(float(flocking_radius.max() + radius.max()), 1e-6)
+    cells = np.floor(pos / cell_size).astype(np.int64)
+    cx = cells[:, 0] - cells[:, 0].min()
+    cy = cells[:, 1] - cells[:, 1].min() + 1
+    # kolumna ma pusty wiersz na początku i końcu, więc cy +- 1 nie przechodzi do sąsiedniej kolumny
+    width = int(cy.max()) + 2
+    keys = cx * width + cy
+
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    # zapytania w kolejności kluczy - searchsorted jest wtedy kilka razy szybszy
+    rows = order if rows is None else rows[np.argsort(keys[rows], kind="stable")]
+    row_keys = keys[rows]
+
+    parts_i = []
+    parts_j = []
+    for dx in (-1, 0, 1):
+        # trzy komórki (cy - 1 .. cy + 1) kolumny cx + dx to jeden ciągły zakres kluczy
+        query = row_keys + dx * width
+        start = np.searchsorted(sorted_keys, query - 1, side="left")
+        counts = np.searchsorted(sorted_keys, query + 1, side="right") - start
+        total = int(counts.sum())
+        if total == 0:
+            continue
+        offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        parts_i.append(np.repeat(rows, counts))
+        parts_j.append(order[np.repeat(start, counts) + offsets])
+
+    if not parts_i:
+        return empty, empty
+
+    I = np.concatenate(parts_i)
+    J = np.concatenate(parts_j)
+    delta = pos[J] - pos[I]
+    dist_sq = np.einsum("ij,ij->i", delta, delta)
+    reach = flocking_radius[I] + radius[J]
+    mask = (I != J) & (dist_sq < reach * reach)
+    return I[mask], J[mask]
+
+
+def connected_components(n, I, J):
+    """
+    Etykieta spójnej składowej grafu o krawędziach (I, J) dla każdego z n wierzchołków
+    (najmniejszy indeks w składowej) - union-find EnemyGroupSolver.find_clusters na tablicach:
+    podpinanie korzeni pod mniejsze i skracanie ścieżek, aż żadna krawędź nie łączy dwóch korzeni.
+    """
+    parent = np.arange(n)
+    while len(I):
+        ri = parent[I]
+        rj = parent[J]
+        linked = ri != rj
+        if not linked.any():
+            break
+        I, J, ri, rj = I[linked], J[linked], ri[linked], rj[linked]
+        np.minimum.at(parent, np.maximum(ri, rj), np.minimum(ri, rj))
+        # każdy wierzchołek wskazuje prosto korzeń
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+    return parent
+
+
+def group_leaders(keys, uid):
+    """
+    Grupy wierszy o tym samym kluczu: dla każdego wiersza indeks wiersza z najmniejszym uid
+    w jego grupie (lider jak EnemyGroupSolver.pick_new_leader) i rozmiar grupy.
+    """
+    order = np.lexsort((uid, keys))
+    sorted_keys = keys[order]
+    first = np.ones(len(keys), dtype=bool)
+    first[1:] = sorted_keys[1:] != sorted_keys[:-1]
+    starts = np.flatnonzero(first)
+    group = np.cumsum(first) - 1
+    leader = np.empty(len(keys), dtype=np.int64)
+    size = np.empty(len(keys), dtype=np.int64)
+    leader[order] = order[starts][group]
+    size[order] = np.diff(np.append(starts, len(keys)))[group]
+    return leader, size
+
+
+def _sum_by(index, values, n):
+    out = np.empty((n, 2))
+    out[:, 0] = np.bincount(index, weights=values[:, 0], minlength=n)
+    out[:, 1] = np.bincount(index, weights=values[:, 1], minlength=n)
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Kolizje - przepchnięcia dla całego roju naraz (jak utils.collision na obiektach)
+# ---------------------------------------------------------------------------
+
+# komórka siatki statycznych obiektów (przeszkody, ściany) dla kolizji
+STATIC_CELL_SIZE = 64.0
+# przesunięcie kluczy komórek - ujemne współrzędne komórek mieszczą się w kluczu
+_CELL_OFFSET = 1 << 30
+
+
+def _cell_keys(cx, cy):
+    return ((cx + _CELL_OFFSET) << 32) | (cy + _CELL_OFFSET)
+
+
+def static_cells(boxes, cell_size=STATIC_CELL_SIZE):
+    """
+    Siatka statycznych obiektów: obiekt trafia do każdej komórki, którą przecina jego
+    prostokąt (K, 4): min_x, min_y, max_x, max_y. Zwraca (posortowane klucze, indeksy obiektów, cell_size).
+    """
+    boxes = np.asarray(boxes, dtype=float).reshape(-1, 4)
+    lo = np.floor(boxes[:, :2] / cell_size).astype(np.int64)
+    hi = np.floor(boxes[:, 2:] / cell_size).astype(np.int64)
+    spans = hi - lo + 1
+    counts = spans[:, 0] * spans[:, 1]
+    ids = np.repeat(np.arange(len(boxes)), counts)
+    offsets = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+    keys = _cell_keys(lo[ids, 0] + offsets // spans[ids, 1], lo[ids, 1] + offsets % spans[ids, 1])
+    order = np.argsort(keys, kind="stable")
+    return keys[order], ids[order], cell_size
+
+
+def cell_candidates(cells, pos):
+    """Pary (agent I, obiekt K) z tej samej komórki static_cells - kandydaci do dokładnego testu."""
+    keys, ids, cell_size = cells
+    c = np.floor(pos / cell_size).astype(np.int64)
+    query = _cell_keys(c[:, 0], c[:, 1])
+    # zapytania w kolejności kluczy - searchsorted jest wtedy kilka razy szybszy
+    order = np.argsort(query, kind="stable")
+    query = query[order]
+    start = np.searchsorted(keys, query, side="left")
+    counts = np.searchsorted(keys, query, side="right") - start
+    total = int(counts.sum())
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    return np.repeat(order, counts), ids[np.repeat(start, counts) + offsets]
+
+
+def circle_pushes(pos, radius, centers, center_radius):
+    """
+    Przepchnięcia okręgów (pos, radius) z okręgów (centers, center_radius) dla par wierszy -
+    jak resolve_circle_overlap. Zwraca (maska par z kolizją, przepchnięcia tych par).
+    """
+    delta = pos - centers
+    dist_sq = np.einsum("ij,ij->i", delta, delta)
+    reach = radius + center_radius
+    hit = dist_sq < reach * reach
+    delta = delta[hit]
+    dist = np.sqrt(dist_sq[hit])
+    # nakładające się środki - wypychamy wzdłuż x
+    zero = dist == 0
+    delta[zero] = (1.0, 0.0)
+    dist[zero] = 1.0
+    return hit, delta * ((reach[hit] - dist) / dist)[:, None]
+
+
+def segment_pushes(pos, radius, walls):
+    """Przepchnięcia okręgów ze ścian (wiersze walls: start, end, normal) dla par - jak resolve_circle_wall."""
+    start = walls[:, 0:2]
+    ab = walls[:, 2:4] - start
+    length_sq = np.einsum("ij,ij->i", ab, ab)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        u = np.where(length_sq > 0, np.einsum("ij,ij->i", pos - start, ab) / length_sq, 0.0)
+    u = np.clip(u, 0.0, 1.0)
+    delta = pos - (start + ab * u[:, None])
+    dist_sq = np.einsum("ij,ij->i", delta, delta)
+    hit = dist_sq < radius * radius
+    delta = delta[hit]
+    dist = np.sqrt(dist_sq[hit])
+    # środek dokładnie na ścianie - wypychamy wzdłuż normalnej
+    zero = dist == 0
+    delta[zero] = walls[hit][zero, 4:6]
+    dist[zero] = 1.0
+    overlap = radius[hit] - np.where(zero, 0.0, dist)
+    return hit, delta / dist[:, None] * overlap[:, None]
+
+
+def walls_block(starts, end, walls):
+    """
+    Czy odcinek start -> end przecina któryś odcinek ściany (wiersze walls: start, end, normal)
+    - widoczność przez ściany dla całego roju naraz. Zwraca (N,) bool.
+    """
+    blocked = np.zeros(len(starts), dtype=bool)
+    if len(walls) == 0 or len(starts) == 0:
+        return blocked
+    q = walls[:, 0:2]
+    s = walls[:, 2:4] - q
+    block = max(1, WALL_TEST_BLOCK // len(walls))
+    for lo in range(0, len(starts), block):
+        p = starts[lo:lo + block]
+        rx = end[0] - p[:, 0:1]
+        ry = end[1] - p[:, 1:2]
+        denominator = rx * s[:, 1] - ry * s[:, 0]  # (k, W)
+        qp_x = q[:, 0] - p[:, 0:1]
+        qp_y = q[:, 1] - p[:, 1:2]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = (qp_x * s[:, 1] - qp_y * s[:, 0]) / denominator
+            u = (qp_x * ry - qp_y * rx) / denominator
+        hit = (denominator != 0) & (t >= 0) & (t <= 1) & (u >= 0) & (u <= 1)
+        blocked[lo:lo + block] = hit.any(axis=1)
+    return blocked
+
+
+def seek(pos, vel, target, max_speed):
+    desired = normalize(target - pos) * max_speed[:, None]
+    return desired - vel
+
+
+def flee(pos, vel, target, max_speed):
+    desired = normalize(pos - target) * max_speed[:, None]
+    return desired - vel
+
+
+def arrive(pos, vel, target, max_speed, deceleration=2):
+    to_target = target - pos
+    dist = np.sqrt(np.einsum("ij,ij->i", to_target, to_target))
+    force = np.zeros_like(pos)
+    nz = dist > 0
+    if nz.any():
+        deceleration_tweaker = 0.3
+        speed = np.minimum(dist[nz] / (deceleration * deceleration_tweaker), max_speed[nz])
+        desired = to_target[nz] * (speed / dist[nz])[:, None]
+        force[nz] = desired - vel[nz]
+    return force
+
+
+def pursuit(pos, vel, heading, max_speed, ev_pos, ev_vel, ev_heading):
+    to_evader = ev_pos - pos
+    relative_heading = np.einsum("ij,ij->i", heading, ev_heading)
+    ahead = np.einsum("ij,ij->i", to_evader, heading) > 0
+
+    distance = np.sqrt(np.einsum("ij,ij->i", to_evader, to_evader))
+    speed_sum = max_speed + np.sqrt(np.einsum("ij,ij->i", ev_vel, ev_vel))
+    look_ahead = np.divide(distance, speed_sum, out=np.zeros_like(distance), where=speed_sum != 0)
+    future = ev_pos + ev_vel * look_ahead[:, None]
+
+    # evader przed nami i zwrócony do nas - seek do aktualnej pozycji
+    head_on = ahead & (relative_heading < -0.95)
+    future[head_on] = ev_pos[head_on]
+    return seek(pos, vel, future, max_speed)
+
+
+def offset_pursuit(pos, vel, max_speed, leader_pos, leader_vel, leader_heading, leader_side, offset):
+    world_offset = leader_pos + leader_heading * offset[:, 0:1] + leader_side * offset[:, 1:2]
+    to_offset = world_offset - pos
+    look_ahead = (np.sqrt(np.einsum("ij,ij->i", to_offset, to_offset)) /
+                  (max_speed + np.sqrt(np.einsum("ij,ij->i", leader_vel, leader_vel))))
+    future = world_offset + leader_vel * look_ahead[:, None]
+    return arrive(pos, vel, future, max_speed, deceleration=1)
+
+
+def wander(pos, vel, wander_target, max_speed, dt, rng,
+           wander_radius=30.0, wander_distance=40.0, wander_jitter=80.0):
+    """Aktualizuje wander_target w miejscu i zwraca siłę wander."""
+    n = len(pos)
+    jitter = wander_jitter * dt
+    wander_target += rng.uniform(-1.0, 1.0, size=(n, 2)) * jitter
+    wander_target[:] = normalize(wander_target) * wander_radius
+
+    heading = normalize(vel)
+    still = ~heading.any(axis=1)
+    heading[still] = (1.0, 0.0)
+    side = np.stack((-heading[:, 1], heading[:, 0]), axis=1)
+
+    local_x = wander_target[:, 0:1] + wander_distance
+    local_y = wander_target[:, 1:2]
+    to_target = heading * local_x + side * local_y
+    return normalize(to_target) * max_speed[:, None]
+
+
+def separation(pos, all_pos, I, J):
+    """
+    Siła separacji. Dla kerneli flockingu: I - indeksy wierszy w `pos`,
+    J - indeksy ich sąsiadów w `all_pos` (wynik neighbor_pairs).
+    """
+    k = len(pos)
+    if len(I) == 0:
+        return np.zeros((k, 2))
+    to = pos[I] - all_pos[J]
+    dist_sq = np.einsum("ij,ij->i", to, to)
+    nz = dist_sq > 0
+    # to.normalize() / dist == to / dist^2
+    contrib = np.zeros_like(to)
+    contrib[nz] = to[nz] / dist_sq[nz, None]
+    return _sum_by(I, contrib, k)
+
+
+def alignment(heading, all_heading, I, J, counts):
+    k = len(heading)
+    force = np.zeros((k, 2))
+    has = counts > 0
+    if has.any():
+        avg = _sum_by(I, all_heading[J], k)
+        force[has] = avg[has] / counts[has, None] - heading[has]
+    return force
+
+
+def cohesion(pos, vel, max_speed, max_force, all_pos, I, J, counts):
+    k = len(pos)
+    force = np.zeros((k, 2))
+    has = counts > 0
+    if not has.any():
+        return force
+    center = _sum_by(I, all_pos[J], k)
+    center[has] /= counts[has, None]
+    to_center = center - pos
+    ok = has & (np.einsum("ij,ij->i", to_center, to_center) > 1e-6)
+    desired = normalize(to_center[ok]) * max_speed[ok, None]
+    force[ok] = truncate(desired - vel[ok], max_force[ok])
+    return force
+
+
+def obstacle_avoidance(pos, vel, heading, side, radius, max_speed, obs_pos, obs_radius,
+                       min_detection_box_length=MIN_DETECTION_BOX_LENGTH, braking_weight=0.1, cells=None):
+    """
+    cells - static_cells przeszkód z zapasem długości detection boxa (SwarmEngine._avoid_cells);
+    bez nich każdy agent sprawdza każdą przeszkodę.
+    """
+    n = len(pos)
+    force = np.zeros((n, 2))
+    if len(obs_pos) == 0 or n == 0:
+        return force
+
+    speed_ratio = np.sqrt(np.einsum("ij,ij->i", vel, vel)) / max_speed
+    box_length = min_detection_box_length + speed_ratio * min_detection_box_length
+
+    # pary (agent, przeszkoda) do sprawdzenia - jak ObstacleIndex.query_box
+    if cells is not None:
+        I, K = cell_candidates(cells, pos)
+    else:
+        I = np.repeat(np.arange(n), len(obs_pos))
+        K = np.tile(np.arange(len(obs_pos)), n)
+    if not len(I):
+        return force
+
+    # przeszkody w lokalnej przestrzeni agentów
+    d = obs_pos[K] - pos[I]
+    local_x = np.einsum("ij,ij->i", d, heading[I])
+    local_y = np.einsum("ij,ij->i", d, side[I])
+
+    r = obs_radius[K]
+    agent_radius = radius[I]
+    expanded = r + agent_radius
+    # tylko przeszkody przecinające detection box
+    near_x = np.clip(local_x, 0.0, box_length[I])
+    near_y = np.clip(local_y, -agent_radius, agent_radius)
+    in_box = (local_x - near_x) ** 2 + (local_y - near_y) ** 2 < r * r
+    candidate = in_box & (local_x >= 0) & (np.abs(local_y) < expanded)
+    if not candidate.any():
+        return force
+
+    I, K = I[candidate], K[candidate]
+    local_x, local_y, r, expanded = local_x[candidate], local_y[candidate], r[candidate], expanded[candidate]
+    sqrt_part = np.sqrt(expanded ** 2 - local_y ** 2)
+    ip = local_x - sqrt_part
+    ip = np.where(ip <= 0, local_x + sqrt_part, ip)
+
+    # najbliższe przecięcie dla każdego agenta (remis - przeszkoda o mniejszym indeksie)
+    order = np.lexsort((K, ip, I))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = I[order[1:]] != I[order[:-1]]
+    best = order[first]
+
+    rows = I[best]
+    lx = local_x[best]
+    ly = local_y[best]
+    r = r[best]
+    multiplier = 1.0 + (box_length[rows] - lx) / box_length[rows]
+    lateral = (r - ly) * multiplier
+    braking = (r - lx) * braking_weight
+    force[rows] = heading[rows] * braking[:, None] + side[rows] * lateral[:, None]
+    return force
+
+
+def wall_avoidance(pos, heading, walls, feeler_length=500.0):
+    """walls: tablica (W, 6) - start.x, start.y, end.x, end.y, normal.x, normal.y"""
+    n = len(pos)
+    force = np.zeros((n, 2))
+    if len(walls) == 0 or n == 0:
+        return force
+
+    # tablice (N, 3, W) - przy setkach odcinków liczymy blokami wrogów, żeby nie rosła pamięć
+    block = max(1, WALL_TEST_BLOCK // (3 * len(walls)))
+    if n > block:
+        for start in range(0, n, block):
+            force[start:start + block] = wall_avoidance(pos[start:start + block], heading[start:start + block],
+                                                        walls, feeler_length)
+        return force
+
+    h = normalize(heading)
+    h[~h.any(axis=1)] = (1.0, 0.0)
+    cos30, sin30 = math.cos(math.radians(30)), math.sin(math.radians(30))
+    left = np.stack((h[:, 0] * cos30 - h[:, 1] * sin30, h[:, 0] * sin30 + h[:, 1] * cos30), axis=1)
+    right = np.stack((h[:, 0] * cos30 + h[:, 1] * sin30, -h[:, 0] * sin30 + h[:, 1] * cos30), axis=1)
+    feelers = np.stack((pos + h * feeler_length,
+                        pos + left * feeler_length * 0.8,
+                        pos + right * feeler_length * 0.8), axis=1)  # (N, 3, 2)
+
+    q1 = walls[:, 0:2]
+    s = walls[:, 2:4] - q1
+    r = feelers - pos[:, None, :]  # (N, 3, 2)
+    rx, ry = r[..., 0:1], r[..., 1:2]  # (N, 3, 1)
+    denominator = rx * s[:, 1] - ry * s[:, 0]  # (N, 3, W)
+    qp_x = q1[:, 0] - pos[:, 0, None, None]
+    qp_y = q1[:, 1] - pos[:, 1, None, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = (qp_x * s[:, 1] - qp_y * s[:, 0]) / denominator
+        u = (qp_x * ry - qp_y * rx) / denominator
+    valid = (denominator != 0) & (t >= 0) & (t <= 1) & (u >= 0) & (u <= 1)
+
+    # odległość do punktu przecięcia = t * długość feelera
+    dist = np.where(valid, t * np.sqrt(rx ** 2 + ry ** 2), np.inf)
+    flat = dist.reshape(n, -1)
+    best = np.argmin(flat, axis=1)
+    hit = np.isfinite(flat[np.arange(n), best])
+    if not hit.any():
+        return force
+
+    rows = np.nonzero(hit)[0]
+    feeler_idx, wall_idx = np.divmod(best[hit], len(walls))
+    overshoot = (1.0 - t[rows, feeler_idx, wall_idx]) * np.sqrt(
+        rx[rows, feeler_idx, 0] ** 2 + ry[rows, feeler_idx, 0] ** 2)
+    # ściany wewnętrzne są dwustronne - normalna po stronie agenta
+    hit_walls = walls[wall_idx]
+    facing = ((pos[rows, 0] - hit_walls[:, 0]) * hit_walls[:, 4] +
+              (pos[rows, 1] - hit_walls[:, 1]) * hit_walls[:, 5])
+    overshoot = np.where(facing < 0, -overshoot, overshoot)
+    force[rows] = hit_walls[:, 4:6] * overshoot[:, None]
+    return force
+
+
+def hiding_spots(obs_pos, obs_radius, target_pos, distance_from_boundary=50.0):
+    to_obstacle = normalize(obs_pos - target_pos[None, :])
+    return obs_pos + to_obstacle * (obs_radius + distance_from_boundary)[:, None]
+
+
+def hide(pos, vel, max_speed, target_pos, target_vel, obs_pos, obs_radius, distance_from_boundary=50.0,
+         spots=None):
+    """spots: gotowe punkty ukrycia (M, 2), np. z HidingSpotTable - wtedy nie są liczone od nowa."""
+    n = len(pos)
+    if len(obs_pos) == 0:
+        # brak przeszkód - evade
+        to_pursuer = target_pos[None, :] - pos
+        look_ahead = (np.sqrt(np.einsum("ij,ij->i", to_pursuer, to_pursuer)) /
+                      (max_speed + math.hypot(target_vel[0], target_vel[1])))
+        future = target_pos[None, :] + target_vel[None, :] * look_ahead[:, None]
+        return flee(pos, vel, future, max_speed)
+
+    if spots is None:
+        spots = hiding_spots(obs_pos, obs_radius, target_pos, distance_from_boundary)
+    # najbliższy punkt: |p - s|^2 / 2 = |p|^2 / 2 - p.s + |s|^2 / 2, a |p|^2 nie zmienia argmin -
+    # jedno mnożenie macierzy zamiast tablicy różnic (N, M, 2)
+    score = pos @ spots.T
+    np.subtract(0.5 * np.einsum("ij,ij->i", spots, spots), score, out=score)
+    best = np.argmin(score, axis=1)
+    return arrive(pos, vel, spots[best], max_speed, deceleration=1)
+
+
+
+# ---------------------------------------------------------------------------
+# Steering na samych tablicach - bez obiektów Enemy, więc może go liczyć
+# także proces roboczy (enemy.parallel_steering) dla swojego zakresu wierszy.
+# ---------------------------------------------------------------------------
+
+class SteeringContext:
+    """
+    Dane wspólne dla całego ticka: wagi, przeszkody, ściany, punkty ukrycia i gracz.
+    Procesy robocze składają go z widoków na pamięć współdzieloną (enemy.parallel_steering).
+    """
+
+    def __init__(self, explore_weights, attack_weights, probabilities, obs_pos, obs_radius,
+                 walls, spots, player_state, obs_cells=None):
+        self.explore_weights = explore_weights
+        self.attack_weights = attack_weights
+        self.probabilities = probabilities
+        self.obs_pos = obs_pos
+        self.obs_radius = obs_radius
+        self.walls = walls
+        self.spots = spots
+        # (6,): pos, velocity, heading gracza albo None
+        self.player_state = player_state
+        # static_cells przeszkód dla obstacle_avoidance
+        self.obs_cells = obs_cells
+
+
+def pair_subset(n, rows, I, J, counts):
+    """Pary sąsiadów tylko dla wierszy `rows`, przenumerowane na 0..len(rows)-1."""
+    local = np.full(n, -1)
+    local[rows] = np.arange(len(rows))
+    keep = local[I] >= 0
+    return local[I[keep]], J[keep], counts[rows]
+
+
+def csr_pairs(neighbors, bounds, rows):
+    """
+    Pary (I, J) wierszy `rows` z sąsiadów posortowanych po I (neighbors, bounds jak
+    SwarmEngine._pair_rows) - bez przeszukiwania siatki od nowa.
+    """
+    counts = bounds[rows + 1] - bounds[rows]
+    offsets = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+    return np.repeat(rows, counts), neighbors[np.repeat(bounds[rows], counts) + offsets]
+
+
+def steer_rows(state, rows, I, J, counts, ctx, dt, rng):
+    """
+    Ważona suma zachowań dla wierszy `rows` (przycięta do max_force).
+    state - obiekt z tablicami jak SwarmEngine (pos, velocity, ..., attacking, leader_state).
+    Aktualizuje state.wander_target[rows].
+    """
+    attacking = state.attacking[rows]
+    force = np.zeros((len(rows), 2))
+    if (~attacking).any():
+        force[~attacking] = exploration_mode(state, rows[~attacking], I, J, counts, ctx, dt, rng)
+    if attacking.any():
+        force[attacking] = attack_mode(state, rows[attacking], I, J, counts, ctx)
+    return truncate(force, state.max_force[rows])
+
+
+def exploration_mode(state, rows, I, J, counts, ctx, dt, rng):
+    weights = ctx.explore_weights
+    probabilities = ctx.probabilities
+    k = len(rows)
+    n = state.count
+
+    pos = state.pos[rows]
+    vel = state.velocity[rows]
+    heading = state.heading[rows]
+    side = state.side[rows]
+    radius = state.radius[rows]
+    max_speed = state.max_speed[rows]
+    max_force = state.max_force[rows]
+    peeking = state.peeking[rows]
+    obs_pos, obs_radius = ctx.obs_pos, ctx.obs_radius
+    li, lj, lcounts = pair_subset(n, rows, I, J, counts)
+    all_pos = state.pos[:n]
+    all_heading = state.heading[:n]
+
+    total = np.zeros((k, 2))
+
+    def add(name, compute, extra_mask=None):
+        mask = rng.random(k) <= probabilities.get(name, 1.0)
+        if extra_mask is not None:
+            mask &= extra_mask
+        if not mask.any():
+            return
+        total[mask] += compute()[mask] * weights.get(name, 1.0)
+
+    if ctx.player_state is not None:
+        target_pos = ctx.player_state[0:2]
+        target_vel = ctx.player_state[2:4]
+        add("hide", lambda: hide(pos, vel, max_speed, target_pos, target_vel, obs_pos, obs_radius,
+                                 spots=ctx.spots),
+            ~peeking)
+
+    add("separation", lambda: separation(pos, all_pos, li, lj))
+    add("wall_avoidance", lambda: wall_avoidance(pos, heading, ctx.walls))
+    add("obstacle_avoidance", lambda: obstacle_avoidance(pos, vel, heading, side, radius, max_speed,
+                                                         obs_pos, obs_radius, cells=ctx.obs_cells))
+    add("alignment", lambda: alignment(heading, all_heading, li, lj, lcounts))
+    add("cohesion", lambda: cohesion(pos, vel, max_speed, max_force, all_pos, li, lj, lcounts))
+
+    wander_target = state.wander_target[rows]
+    wander_force = wander(pos, vel, wander_target, max_speed, dt, rng)
+    state.wander_target[rows] = wander_target
+    wander_force[peeking] *= 1.8
+    mask = rng.random(k) <= probabilities.get("wander", 1.0)
+    total[mask] += wander_force[mask] * weights.get("wander", 1.0)
+
+    return total
+
+
+def attack_mode(state, rows, I, J, counts, ctx):
+    weights = ctx.attack_weights
+    n = state.count
+
+    pos = state.pos[rows]
+    vel = state.velocity[rows]
+    heading = state.heading[rows]
+    side = state.side[rows]
+    radius = state.radius[rows]
+    max_speed = state.max_speed[rows]
+    max_force = state.max_force[rows]
+    is_leader = state.is_leader[rows]
+
+    total = obstacle_avoidance(pos, vel, heading, side, radius, max_speed, ctx.obs_pos, ctx.obs_radius,
+                               cells=ctx.obs_cells) * weights.get("obstacle_avoidance", 1.0)
+    total += wall_avoidance(pos, heading, ctx.walls) * weights.get("wall_avoidance", 1.0)
+
+    # bez linii wzroku do gracza - seek do następnego punktu pola przepływu zamiast pursuit
+    use_flow = state.use_flow[rows]
+    if use_flow.any():
+        fl = np.nonzero(use_flow)[0]
+        total[fl] += seek(pos[fl], vel[fl], state.flow_target[rows[fl]], max_speed[fl]) \
+            * weights.get("flow_field", 1.0)
+
+    # lider - pursuit gracza
+    pursuing = is_leader & ~use_flow
+    if pursuing.any() and ctx.player_state is not None:
+        lr = np.nonzero(pursuing)[0]
+        m = len(lr)
+        ev_pos = np.broadcast_to(ctx.player_state[0:2], (m, 2))
+        ev_vel = np.broadcast_to(ctx.player_state[2:4], (m, 2))
+        ev_heading = np.broadcast_to(ctx.player_state[4:6], (m, 2))
+        total[lr] += pursuit(pos[lr], vel[lr], heading[lr], max_speed[lr], ev_pos, ev_vel, ev_heading) \
+            * weights.get("pursuit", 1.0)
+
+    # followers - offset pursuit + flocking
+    if (~is_leader).any():
+        fr = np.nonzero(~is_leader)[0]
+        f_rows = rows[fr]
+        leader = state.leader_state[f_rows]
+        offset = state.attack_offset[f_rows]
+        li, lj, lcounts = pair_subset(n, f_rows, I, J, counts)
+        all_pos = state.pos[:n]
+        all_heading = state.heading[:n]
+
+        total[fr] += offset_pursuit(pos[fr], vel[fr], max_speed[fr], leader[:, 0:2], leader[:, 2:4],
+                                    leader[:, 4:6], leader[:, 6:8], offset) * weights.get("offset_pursuit", 1.0)
+        total[fr] += separation(pos[fr], all_pos, li, lj) * weights.get("separation", 1.0)
+        total[fr] += alignment(heading[fr], all_heading, li, lj, lcounts) * weights.get("alignment", 1.0)
+        total[fr] += cohesion(pos[fr], vel[fr], max_speed[fr], max_force[fr],
+                              all_pos, li, lj, lcounts) * weights.get("cohesion", 1.0)
+    return total
+
+# ---------------------------------------------------------------------------
+# Silnik
+# ---------------------------------------------------------------------------
+
+# kolumny z trwałym stanem wroga - przepisywane przy usuwaniu wierszy (sync);
+# reszta tablic jest wypełniana od nowa w każdym ticku
+ROW_FIELDS = ("pos", "prev_pos", "velocity", "heading", "side", "wander_target", "steering_force",
+              "smoothed_heading", "radius", "flocking_radius", "mass", "max_speed", "max_force", "uid",
+              "attacking", "is_leader", "group_id", "leader_row", "cluster_size", "cooldown_start",
+              "peeking", "peek_timer", "peek_duration", "peek_cooldown", "peek_check",
+              "visible", "has_offset", "attack_offset", "lod_slot")
+
+
+def _none_to(value, missing):
+    return missing if value is None else value
+
+
+class SwarmEngine:
+    """
+    Wektorowy silnik roju (structure-of-arrays).
+    Trzyma pozycje, prędkości, headingi, stan grup, peek i LOD wszystkich wrogów
+    w ciągłych tablicach numpy i liczy cały tick roju naraz.
+
+    Między tickami właścicielem stanu roju są tablice - obiekty Enemy są tylko widokami,
+    do których silnik przepisuje stan na żądanie (write_back): wiersze rysowane w tej klatce
+    albo wszystkie przed replayem, pickle i statystykami. Z obiektów czyta tylko przy
+    nowej liście wrogów (load).
+    """
+
+    def __init__(self, seed=None):
+        if np is None:
+            raise ImportError("SwarmEngine wymaga pakietu numpy")
+        self.rng = np.random.default_rng(seed if seed is not None else random.getrandbits(64))
+        self.capacity = 0
+        self.count = 0
+        # czy tablice odpowiadają obiektom - False wymusza pełny load (nowa gra, nowi wrogowie)
+        self.synced = False
+        # czy obiekty Enemy są starsze niż tablice (po kroku, przed pełnym write_back)
+        self.stale = False
+        self._source = None
+        # sąsiedzi z ostatniego kroku: J posortowane po I i granice wierszy (Enemy.neighbors)
+        self._pair_rows = None
+        self._pair_pos = None
+        self.peek_params = None
+        self.steering_ref = None
+        self._obstacle_cache = None
+        self._obstacle_cells = None
+        self._avoid_cells = None
+        self._wall_cells = None
+        self._wall_cache = None
+        self._hiding_cache = None
+        # wygładzanie headingów całego roju - wiersz to Enemy.uid (stały, gdy wrogowie giną)
+        self.smoother = BatchSmoother(HEADING_SMOOTHING_SAMPLES)
+        self._allocate(64)
+
+    def _allocate(self, capacity):
+        self.capacity = capacity
+        self.pos = np.zeros((capacity, 2))
+        self.prev_pos = np.zeros((capacity, 2))
+        self.velocity = np.zeros((capacity, 2))
+        self.heading = np.zeros((capacity, 2))
+        self.side = np.zeros((capacity, 2))
+        self.wander_target = np.zeros((capacity, 2))
+        self.steering_force = np.zeros((capacity, 2))
+        self.smoothed_heading = np.zeros((capacity, 2))
+        self.radius = np.zeros(capacity)
+        self.flocking_radius = np.zeros(capacity)
+        self.mass = np.ones(capacity)
+        self.max_speed = np.zeros(capacity)
+        self.max_force = np.zeros(capacity)
+        self.uid = np.zeros(capacity, dtype=np.int64)
+        # grupy (EnemyGroupSolver): id skupiska / grupy ataku (-1 - brak), wiersz lidera (-1 - brak),
+        # start cooldownu przed atakiem (nan - brak)
+        self.attacking = np.zeros(capacity, dtype=bool)
+        self.is_leader = np.zeros(capacity, dtype=bool)
+        self.group_id = np.full(capacity, -1, dtype=np.int64)
+        self.leader_row = np.full(capacity, -1, dtype=np.int64)
+        self.cluster_size = np.ones(capacity, dtype=np.int64)
+        self.cooldown_start = np.full(capacity, np.nan)
+        # EnemyPeek
+        self.peeking = np.zeros(capacity, dtype=bool)
+        self.peek_timer = np.zeros(capacity)
+        self.peek_duration = np.zeros(capacity)
+        self.peek_cooldown = np.zeros(capacity)
+        self.peek_check = np.zeros(capacity)
+        # linia wzroku gracza, offset followera w grupie ataku, slot AILodScheduler (-1 - brak)
+        self.visible = np.zeros(capacity, dtype=bool)
+        self.has_offset = np.zeros(capacity, dtype=bool)
+        self.attack_offset = np.zeros((capacity, 2))
+        self.lod_slot = np.full(capacity, -1, dtype=np.int64)
+        # dane jednego ticka dla kerneli steeringu (prepare_steering)
+        self.leader_state = np.zeros((capacity, 8))  # pos, velocity, heading, side lidera
+        # atakujący poza zasięgiem wzroku gracza i ich następny punkt z GameMap.flow_field
+        self.use_flow = np.zeros(capacity, dtype=bool)
+        self.flow_target = np.zeros((capacity, 2))
+
+    def load(self, enemies):
+        """Kopiuje stan obiektów Enemy do tablic."""
+        n = len(enemies)
+        if n > self.capacity:
+            self._allocate(max(n, self.capacity * 2))
+        self.count = n
+        self.stale = False
+        self._pair_rows = None
+        if n == 0:
+            return
+        self.pos[:n] = [(e.pos.x, e.pos.y) for e in enemies]
+        self.prev_pos[:n] = [(e.prev_pos.x, e.prev_pos.y) for e in enemies]
+        self.velocity[:n] = [(e.velocity.x, e.velocity.y) for e in enemies]
+        self.heading[:n] = [(e.heading.x, e.heading.y) for e in enemies]
+        self.side[:n] = [(e.side.x, e.side.y) for e in enemies]
+        self.wander_target[:n] = [(e.steering.wander_target.x, e.steering.wander_target.y) for e in enemies]
+        # ostatnia siła - przy LOD część wrogów jej nie przelicza
+        self.steering_force[:n] = [(e.steering_force.x, e.steering_force.y) for e in enemies]
+        self.smoothed_heading[:n] = [(e.smoothed_heading.x, e.smoothed_heading.y) for e in enemies]
+        self.radius[:n] = [e.radius for e in enemies]
+        self.flocking_radius[:n] = [e.flocking_radius for e in enemies]
+        self.mass[:n] = [e.mass for e in enemies]
+        self.max_speed[:n] = [e.max_speed for e in enemies]
+        self.max_force[:n] = [e.max_force for e in enemies]
+        self.uid[:n] = [e.uid for e in enemies]
+
+        row = {e: i for i, e in enumerate(enemies)}
+        self.attacking[:n] = [e.state == "attack" for e in enemies]
+        self.is_leader[:n] = [e.is_group_leader for e in enemies]
+        self.group_id[:n] = [_none_to(e.attack_group_id if e.state == "attack" else e.group.cluster_id, -1)
+                             for e in enemies]
+        self.leader_row[:n] = [row.get(e.group.group_leader, -1) for e in enemies]
+        self.cluster_size[:n] = [e.group.cluster_size for e in enemies]
+        self.cooldown_start[:n] = [_none_to(e.group.cooldown_start_time, np.nan) for e in enemies]
+
+        self.peeking[:n] = [e.peek.peeking for e in enemies]
+        self.peek_timer[:n] = [e.peek.peek_timer for e in enemies]
+        self.peek_duration[:n] = [e.peek.peek_duration for e in enemies]
+        self.peek_cooldown[:n] = [e.peek.cooldown for e in enemies]
+        self.peek_check[:n] = [e.peek._check_acc for e in enemies]
+
+        self.visible[:n] = [e.visible_to_player for e in enemies]
+        self.has_offset[:n] = [hasattr(e, "attack_offset") for e in enemies]
+        self.attack_offset[:n] = [(e.attack_offset.x, e.attack_offset.y) if hasattr(e, "attack_offset")
+                                  else (0.0, 0.0) for e in enemies]
+        self.lod_slot[:n] = [_none_to(e.lod_slot, -1) for e in enemies]
+
+        # parametry peek i wagi zachowań są wspólne dla całego roju
+        peek = enemies[0].peek
+        self.peek_params = (peek.base_chance, peek.group_scale, peek.min_duration, peek.max_duration,
+                            peek.check_interval)
+        self.steering_ref = enemies[0].enemy_steering
+
+    def sync(self, enemies):
+        """
+        Dopasowuje tablice do listy wrogów. Gdy lista się nie zmieniła, nic nie kopiuje;
+        po śmierci wrogów usuwa ich wiersze, a z obiektów czyta tylko po reset() albo nowej liście.
+        """
+        n = len(enemies)
+        if self.synced and enemies is self._source:
+            if n == self.count:
+                return
+            old = self.uid[:self.count]
+            uid = np.fromiter((e.uid for e in enemies), dtype=np.int64, count=n)
+            keep = np.isin(old, uid)
+            if int(keep.sum()) == n and np.array_equal(old[keep], uid):
+                self._compact(keep)
+                return
+        self.load(enemies)
+        self._source = enemies
+        self.synced = True
+
+    def _compact(self, keep):
+        """Usuwa wiersze spoza maski keep i przenumerowuje wiersze liderów."""
+        remap = np.where(keep, np.cumsum(keep) - 1, -1)
+        n = int(keep.sum())
+        for field in ROW_FIELDS:
+            column = getattr(self, field)
+            column[:n] = column[:self.count][keep]
+        self.count = n
+        leader_row = self.leader_row[:n]
+        known = leader_row >= 0
+        leader_row[known] = remap[leader_row[known]]
+        self._pair_rows = None
+
+    def remove_row(self, index):
+        """Usuwa wiersz wroga, którego GameMap usunął z listy (strzał)."""
+        keep = np.ones(self.count, dtype=bool)
+        keep[index] = False
+        self._compact(keep)
+
+    def reset(self):
+        """Nowa gra na tej samej mapie - zapomina historię headingów i czyta wrogów od nowa."""
+        self.smoother.reset()
+        self.synced = False
+        self.stale = False
+        self._source = None
+
+    def write_back(self, enemies, rows=None):
+        """
+        Przepisuje stan wierszy do obiektów Enemy - tylko dla tych, które ktoś czyta
+        (rows: np. wrogowie rysowani w tej klatce). rows=None - wszystkie wiersze,
+        pomijane, gdy obiekty są już aktualne.
+        """
+        n = self.count
+        if rows is None:
+            if not self.stale:
+                return
+            self.stale = False
+            rows = np.arange(n)
+            targets = enemies
+        else:
+            rows = np.asarray(rows, dtype=np.int64)
+            targets = [enemies[i] for i in rows.tolist()]
+        if not len(rows):
+            return
+
+        # kolumny jako listy floatów (tolist na 1D jest dużo tańszy niż na (n, 2))
+        columns = [array[rows, k].tolist()
+                   for array in (self.pos, self.prev_pos, self.velocity, self.heading, self.side,
+                                 self.wander_target, self.steering_force, self.smoothed_heading)
+                   for k in (0, 1)]
+        for e, px, py, qx, qy, vx, vy, hx, hy, sx, sy, wx, wy, fx, fy, mx, my in zip(targets, *columns):
+            e.pos.update(px, py)
+            e.prev_pos.update(qx, qy)
+            e.velocity.update(vx, vy)
+            e.heading.update(hx, hy)
+            e.side.update(sx, sy)
+            e.steering.wander_target.update(wx, wy)
+            e.steering_force.update(fx, fy)
+            e.smoothed_heading.update(mx, my)
+
+        state = [array[rows].tolist()
+                 for array in (self.attacking, self.is_leader, self.group_id, self.leader_row, self.cluster_size,
+                               self.cooldown_start, self.peeking, self.peek_timer, self.peek_duration,
+                               self.peek_cooldown, self.peek_check, self.visible, self.has_offset,
+                               self.attack_offset[:, 0], self.attack_offset[:, 1], self.lod_slot)]
+        for e, attacking, leader, gid, lrow, size, start, peeking, timer, duration, cooldown, check, \
+                visible, has_offset, ox, oy, slot in zip(targets, *state):
+            e.state = "attack" if attacking else "explore"
+            e.is_group_leader = leader
+            e.attack_group_id = gid if attacking and gid >= 0 else None
+            group = e.group
+            group.group_leader = enemies[lrow] if lrow >= 0 else None
+            group.cluster_id = gid if gid >= 0 else None
+            group.cluster_size = size
+            group.cooldown_start_time = None if start != start else start
+            peek = e.peek
+            peek.peeking = peeking
+            peek.peek_timer = timer
+            peek.peek_duration = duration
+            peek.cooldown = cooldown
+            peek._check_acc = check
+            e.is_peeking = peeking
+            e.visible_to_player = visible
+            if has_offset:
+                if hasattr(e, "attack_offset"):
+                    e.attack_offset.update(ox, oy)
+                else:
+                    e.attack_offset = pygame.Vector2(ox, oy)
+            elif hasattr(e, "attack_offset"):
+                del e.attack_offset
+            e.lod_slot = slot if slot >= 0 else None
+
+        if self._pair_rows is not None:
+            neighbors, bounds = self._pair_rows
+            for e, lo, hi in zip(targets, bounds[rows].tolist(), bounds[rows + 1].tolist()):
+                e.neighbors = [enemies[j] for j in neighbors[lo:hi].tolist()]
+
+    @profiled("find_neighbors")
+    def find_neighbors(self):
+        """Szuka sąsiadów dla całego roju; zapamiętuje pary do write_back (Enemy.neighbors)."""
+        n = self.count
+        pos = self.pos[:n]
+        I, J = neighbor_pairs(pos, self.radius[:n], self.flocking_radius[:n])
+        counts = np.bincount(I, minlength=n)
+        bounds = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(counts, out=bounds[1:])
+        self._pair_rows = (J[np.argsort(I, kind="stable")], bounds)
+        # pozycje, dla których liczono pary - resolve_collisions sprawdza, czy może ich użyć
+        self._pair_pos = pos.copy()
+        return I, J, counts
+
+    def step(self, dt, game_map, player=None):
+        """Jeden krok roju: sąsiedzi, grupy, peek, steering, integracja, kolizje."""
+        self.sync(game_map.enemies)
+        n = self.count
+        if n == 0:
+            return
+
+        I, J, counts = self.find_neighbors()
+        self.update_groups(dt, game_map.group_solver, I, J)
+        self.update_peek(dt, counts)
+
+        # przy LOD liczymy tylko zaplanowane wiersze, reszta zostaje z ostatnią siłą
+        if game_map.ai_lod is not None:
+            dist_sq = None
+            if player is not None:
+                delta = self.pos[:n] - (player.pos.x, player.pos.y)
+                dist_sq = np.einsum("ij,ij->i", delta, delta)
+            rows = np.flatnonzero(game_map.ai_lod.schedule_array(dist_sq, self.attacking[:n], self.lod_slot[:n]))
+        else:
+            rows = np.arange(n)
+        if len(rows):
+            self.steering_force[rows] = self.calculate_steering(dt, I, J, counts, game_map, player, rows)
+        self.integrate(dt)
+        self.resolve_collisions(game_map, player, I, J)
+        self.smoothed_heading[:n] = self.smoother.update(self.uid[:n], self.heading[:n])
+        self.stale = True
+
+    def store_previous_positions(self):
+        """prev_pos = pos dla całego roju (interpolacja rysowania)."""
+        n = self.count
+        self.prev_pos[:n] = self.pos[:n]
+
+    @profiled("group.update")
+    def update_groups(self, dt, solver, I, J):
+        """
+        EnemyGroupSolver.update na tablicach: skupiska eksploratorów (składowe grafu sąsiadów),
+        cooldown przed atakiem, przejście w attack i liderzy grup (najmniejszy uid).
+        """
+        solver.sim_time += dt
+        now = solver.sim_time
+        n = self.count
+        attacking = self.attacking[:n]
+        is_leader = self.is_leader[:n]
+        group_id = self.group_id[:n]
+        leader_row = self.leader_row[:n]
+        cluster_size = self.cluster_size[:n]
+        cooldown = self.cooldown_start[:n]
+        uid = self.uid[:n]
+        was_leader = is_leader.copy()
+
+        explore = np.flatnonzero(~attacking)
+        if len(explore):
+            link = ~attacking[I] & ~attacking[J]
+            labels = connected_components(n, I[link], J[link])[explore]
+            lead, size = group_leaders(labels, uid[explore])
+            lead = explore[lead]
+            cluster_size[explore] = size
+            # nowi eksploratorzy losują offset dopiero po wejściu w atak
+            self.has_offset[explore] = False
+
+            # za małe skupiska - reset cooldownu, zostają w explore
+            small = explore[size < solver.min_group_size]
+            is_leader[small] = False
+            group_id[small] = -1
+            leader_row[small] = -1
+            cooldown[small] = np.nan
+
+            big = size >= solver.min_group_size
+            members = explore[big]
+            lead = lead[big]
+            if len(members):
+                is_leader[members] = members == lead
+                group_id[members] = uid[lead]
+                leader_row[members] = lead
+                # członkowie, którzy dopiero dołączyli, startują teraz; grupa atakuje,
+                # gdy u któregoś członka minął cooldown
+                start = cooldown[members]
+                fresh = np.isnan(start)
+                ready = ~fresh & (now - start >= solver.attack_cooldown)
+                cooldown[members[fresh]] = now
+                attack = members[np.isin(lead, lead[ready])]
+                attacking[attack] = True
+                cooldown[attack] = np.nan
+
+        fighters = np.flatnonzero(attacking)
+        if len(fighters):
+            lead, size = group_leaders(group_id[fighters], uid[fighters])
+            lead = fighters[lead]
+            cluster_size[fighters] = size
+            leader_row[fighters] = lead
+            is_leader[fighters] = fighters == lead
+            # lider padł - followers nowego lidera losują nowe offsety
+            promoted = fighters[(fighters == lead) & ~was_leader[fighters]]
+            if len(promoted):
+                self.has_offset[fighters[np.isin(lead, promoted)]] = False
+
+    def update_peek(self, dt, counts):
+        """EnemyPeek.update dla całego roju; counts - liczba sąsiadów wiersza."""
+        n = self.count
+        base_chance, group_scale, min_duration, max_duration, check_interval = self.peek_params
+        peeking = self.peeking[:n]
+        timer = self.peek_timer[:n]
+        duration = self.peek_duration[:n]
+        cooldown = self.peek_cooldown[:n]
+        check = self.peek_check[:n]
+
+        # trwający peek - odliczanie do końca, potem losowy cooldown
+        active = np.flatnonzero(peeking)
+        timer[active] += dt
+        done = active[timer[active] >= duration[active]]
+        peeking[done] = False
+        timer[done] = 0.0
+        duration[done] = 0.0
+        cooldown[done] = self.rng.uniform(4.0, 12.0, len(done))
+
+        idle = np.flatnonzero(~peeking)
+        idle = idle[~np.isin(idle, done)]
+        cooldown[idle] = np.maximum(cooldown[idle] - dt, 0.0)
+        check[idle] += dt
+        due = idle[check[idle] >= check_interval]
+        check[due] = 0.0
+        due = due[cooldown[due] <= 0]
+        if not len(due):
+            return
+
+        # szansa maleje wykładniczo wraz ze wzrostem grupy
+        chance = base_chance * np.exp(-group_scale * counts[due])
+        start = due[self.rng.random(len(due)) < chance]
+        peeking[start] = True
+        timer[start] = 0.0
+        duration[start] = self.rng.uniform(min_duration, max_duration, len(start))
+        # lekko przemieszczamy wander_target
+        self.wander_target[start] += self.rng.uniform(-5.0, 5.0, (len(start), 2))
+
+    @profiled("resolve_collisions")
+    def resolve_collisions(self, game_map, player, I, J):
+        """
+        Kolizje całego roju na tablicach, w kolejności GameMap.resolve_collisions: przeszkody,
+        gracz, granice mapy, ściany, a na końcu pary wrogów (lider grupy się nie przesuwa).
+        Przepchnięcia z kilku kontaktów naraz są sumowane zamiast stosowane po kolei.
+        I, J - pary sąsiadów z find_neighbors (przed ruchem).
+        """
+        n = self.count
+        pos = self.pos[:n]
+        radius = self.radius[:n]
+        pad = float(radius.max())
+
+        obs_pos, obs_radius = self._obstacle_arrays(game_map)
+        if len(obs_radius):
+            Ic, K = cell_candidates(self._static_cells("_obstacle_cells", game_map.obstacle_index, pad,
+                                                       lambda: np.hstack((obs_pos - obs_radius[:, None],
+                                                                          obs_pos + obs_radius[:, None]))), pos)
+            hit, push = circle_pushes(pos[Ic], radius[Ic], obs_pos[K], obs_radius[K])
+            pos += _sum_by(Ic[hit], push, n)
+
+        if player is not None:
+            hit, push = circle_pushes(pos, radius, np.array((player.pos.x, player.pos.y)), player.radius)
+            pos[hit] += push
+            for _ in range(int(hit.sum())):
+                player.take_damage(1)
+
+        # granice mapy - jak collision_with_walls
+        for axis, size in ((0, game_map.width), (1, game_map.height)):
+            coord = pos[:, axis]
+            coord[:] = np.where(coord - radius < 0, radius, np.where(coord + radius > size, size - radius, coord))
+
+        walls = self._wall_array(game_map)
+        if len(walls):
+            Ic, K = cell_candidates(self._static_cells("_wall_cells", game_map.wall_index, pad, lambda: np.stack((
+                np.minimum(walls[:, 0], walls[:, 2]), np.minimum(walls[:, 1], walls[:, 3]),
+                np.maximum(walls[:, 0], walls[:, 2]), np.maximum(walls[:, 1], walls[:, 3])), axis=1)), pos)
+            hit, push = segment_pushes(pos[Ic], radius[Ic], walls[K])
+            pos += _sum_by(Ic[hit], push, n)
+
+        # pary wrogów (Non-Penetration Constraint) - jak separate_agents.
+        # Pary sąsiadów sprzed ruchu zawierają wszystkie kolizje, jeśli nikt nie przesunął się
+        # o więcej niż połowę zapasu flocking_radius - radius; inaczej szukamy par od nowa
+        moved = pos - self._pair_pos
+        shift = float(np.sqrt(np.einsum("ij,ij->i", moved, moved).max()))
+        if 2.0 * shift > float((self.flocking_radius[:n] - radius).min()):
+            I, J = neighbor_pairs(pos, radius, radius)
+        first = I < J
+        I, J = I[first], J[first]
+        hit, push = circle_pushes(pos[I], radius[I], pos[J], radius[J])
+        I, J = I[hit], J[hit]
+        if len(I):
+            # wspólny środek - losowy kierunek, by uniknąć podziału przez zero
+            same = np.all(pos[I] == pos[J], axis=1)
+            if same.any():
+                angle = self.rng.uniform(0.0, 2.0 * math.pi, int(same.sum()))
+                push[same] = np.stack((np.cos(angle), np.sin(angle)), axis=1) * (
+                    radius[I[same]] + radius[J[same]] - 1.0)[:, None]
+            fixed = self.is_leader[:n]
+            a_fixed, b_fixed = fixed[I], fixed[J]
+            share_a = np.where(a_fixed & ~b_fixed, 0.0, np.where(b_fixed & ~a_fixed, 1.0, 0.5))
+            share_b = np.where(b_fixed & ~a_fixed, 0.0, np.where(a_fixed & ~b_fixed, 1.0, 0.5))
+            pos += _sum_by(I, push * share_a[:, None], n) - _sum_by(J, push * share_b[:, None], n)
+
+    def _static_cells(self, attr, index, pad, boxes):
+        # siatka przeszkód / ścian jest statyczna - budowana raz na indeks (i zapas promienia wroga)
+        cache = getattr(self, attr)
+        if cache is None or cache[0] is not index or cache[1] != pad:
+            box = boxes()
+            box[:, :2] -= pad
+            box[:, 2:] += pad
+            cache = (index, pad, static_cells(box))
+            setattr(self, attr, cache)
+        return cache[2]
+
+    def rows_in_rect(self, min_x, min_y, max_x, max_y):
+        """Wiersze wrogów z pozycją w prostokącie (przycinanie rysowania do widoku kamery)."""
+        pos = self.pos[:self.count]
+        inside = (pos[:, 0] >= min_x) & (pos[:, 0] <= max_x) & (pos[:, 1] >= min_y) & (pos[:, 1] <= max_y)
+        return np.flatnonzero(inside)
+
+    def closest_row(self, x, y):
+        """Wiersz wroga najbliższego punktowi (x, y)."""
+        delta = self.pos[:self.count] - (x, y)
+        return int(np.argmin(np.einsum("ij,ij->i", delta, delta)))
+
+    def with_neighbors(self, rows):
+        """Wiersze rows i ich sąsiedzi z ostatniego kroku (obrysy sąsiadów w warstwie debug)."""
+        if self._pair_rows is None or not len(rows):
+            return rows
+        _, J = csr_pairs(*self._pair_rows, rows)
+        return np.union1d(rows, J)
+
+    def update_visibility(self, game_map, player):
+        """Linia wzroku gracz -> wróg dla całego roju (przeszkody i ściany), jak GameMap.update_visibility."""
+        n = self.count
+        if n == 0:
+            return
+        pos = self.pos[:n]
+        target = (player.pos.x, player.pos.y)
+        obs_pos, obs_radius = self._obstacle_arrays(game_map)
+        visible = ray_query.line_of_sight_many(pos, target, obs_pos, obs_radius)
+        walls = self._wall_array(game_map)
+        if len(walls):
+            rows = np.flatnonzero(visible)
+            visible[rows] = ~walls_block(pos[rows], target, walls)
+        self.visible[:n] = visible
+
+    @profiled("calculate_steering")
+    def calculate_steering(self, dt, I, J, counts, game_map, player, rows=None):
+        """
+        Ważona suma zachowań - wektorowy odpowiednik EnemySteering.calculate_steering.
+        rows - wiersze do przeliczenia (domyślnie wszystkie); wynik w ich kolejności.
+        """
+        ctx = self.prepare_steering(game_map, player)
+        if rows is None:
+            rows = np.arange(self.count)
+        return steer_rows(self, rows, I, J, counts, ctx, dt, self.rng)
+
+    def prepare_steering(self, game_map, player):
+        """
+        Dane ticka, których kernele nie mają w kolumnach (offsety i stan liderów, pole przepływu)
+        i SteeringContext.
+        """
+        n = self.count
+        followers = np.flatnonzero(self.attacking[:n] & ~self.is_leader[:n])
+        if len(followers):
+            # losowy offset w lokalnej przestrzeni lidera
+            fresh = followers[~self.has_offset[followers]]
+            self.attack_offset[fresh] = self.rng.uniform(-30.0, 30.0, (len(fresh), 2))
+            self.has_offset[fresh] = True
+            lead = self.leader_row[followers]
+            state = self.leader_state
+            state[followers, 0:2] = self.pos[lead]
+            state[followers, 2:4] = self.velocity[lead]
+            state[followers, 4:6] = self.heading[lead]
+            state[followers, 6:8] = self.side[lead]
+
+        self._sample_flow_field(game_map, player)
+
+        ref = self.steering_ref
+        obs_pos, obs_radius = self._obstacle_arrays(game_map)
+        obs_cells = None
+        if len(obs_radius):
+            # detection box sięga najwyżej 2 x minimalna długość (pełna prędkość) i promień wroga w bok
+            pad = 2.0 * MIN_DETECTION_BOX_LENGTH + float(self.radius[:n].max()) + 1.0
+            obs_cells = self._static_cells("_avoid_cells", game_map.obstacle_index, pad,
+                                           lambda: np.hstack((obs_pos - obs_radius[:, None],
+                                                              obs_pos + obs_radius[:, None])))
+        player_state = None
+        if player is not None:
+            player_state = np.array((player.pos.x, player.pos.y, player.velocity.x, player.velocity.y,
+                                     player.heading.x, player.heading.y), dtype=float)
+        return SteeringContext(ref.explore_weights, ref.attack_weights, ref.probabilities,
+                               obs_pos, obs_radius, self._wall_array(game_map),
+                               self._hiding_spot_array(game_map) if player is not None else None, player_state,
+                               obs_cells)
+
+    def _sample_flow_field(self, game_map, player):
+        """Następne punkty pola przepływu dla atakujących, którzy nie widzą gracza (jak follows_flow_field)."""
+        n = self.count
+        self.use_flow[:n] = False
+        field = game_map.flow_field
+        if field is None or player is None:
+            return
+        rows = np.flatnonzero(self.attacking[:n] & ~self.visible[:n])
+        if not len(rows):
+            return
+        points, valid = field.sample_many(self.pos[rows])
+        self.flow_target[rows] = points
+        self.use_flow[rows] = valid
+
+    def _obstacle_arrays(self, game_map):
+        # przeszkody są statyczne - tablice liczone raz na indeks, nie co tick
+        index = game_map.obstacle_index
+        if self._obstacle_cache is None or self._obstacle_cache[0] is not index:
+            obs_pos = np.array([(o.pos.x, o.pos.y) for o in index], dtype=float).reshape(-1, 2)
+            obs_radius = np.array([o.radius for o in index], dtype=float)
+            self._obstacle_cache = (index, obs_pos, obs_radius)
+        return self._obstacle_cache[1], self._obstacle_cache[2]
+
+    def _hiding_spot_array(self, game_map):
+        # kopia punktów z HidingSpotTable - odświeżana tylko po ich przeliczeniu
+        table = game_map.hiding_spots
+        if self._hiding_cache is None or self._hiding_cache[0] != table.version:
+            spots = np.array([(p.x, p.y) for p in table.spots], dtype=float).reshape(-1, 2)
+            self._hiding_cache = (table.version, spots)
+        return self._hiding_cache[1]
+
+    def _wall_array(self, game_map):
+        # ściany zmieniają się tylko z set_walls (nowy WallIndex)
+        index = game_map.wall_index
+        if self._wall_cache is None or self._wall_cache[0] is not index:
+            walls = np.array([(w.start.x, w.start.y, w.end.x, w.end.y, w.normal.x, w.normal.y)
+                              for w in game_map.walls], dtype=float).reshape(-1, 6)
+            self._wall_cache = (index, walls)
+        return self._wall_cache[1]
+
+    def close(self):
+        """Nic do zwolnienia - ParallelSwarmEngine zatrzymuje tu procesy robocze."""
+        pass
+
+    @profiled("integrate")
+    def integrate(self, dt):
+        """F = ma, przycięcie prędkości, ruch i aktualizacja heading/side."""
+        n = self.count
+        vel = self.velocity[:n]
+        vel += self.steering_force[:n] / self.mass[:n, None] * dt
+        truncate(vel, self.max_speed[:n])
+        self.pos[:n] += vel * dt
+
+        moving = np.einsum("ij,ij->i", vel, vel) > 1e-6
+        if moving.any():
+            heading = normalize(vel[moving])
+            self.heading[:n][moving] = heading
+            self.side[:n][moving] = np.stack((-heading[:, 1], heading[:, 0]), axis=1)
@@ -1,10 +1,23 @@
 import pygame
 from config import *
-from map.game_map import GameMap
-from player.player import Player
-from enemy.enemy import Enemy
+from simulation.world import World
+from simulation.fixed_step import FixedStepScheduler
+from simulation.replay import ReplayRecorder
+from map.map_layout import MapLayout
+from player.player_input import KeyboardMouseInput
 from ui.game_over_ui import GameOverUI
 from ui.health_ui import HealthUI
+from ui.world_renderer import WorldRenderer
+from ui.profiler_ui import ProfilerUI
+from utils.profiler import profiler
+
+
+def start_recording(world, scheduler):
+    if not REPLAY_RECORD:
+        return None
+    recorder = ReplayRecorder(REPLAY_PATH, world, dt=scheduler.dt)
+    world.add_observer(recorder)
+    return recorder
 
 
 def main():
@@ -13,71 +26,70 @@ def main():
     pygame.display.set_caption("Walking Dead From Temu")
     clock = pygame.time.Clock()
 
-    player = Player(30, 30)
-    player_dead = False
-    health_ui = HealthUI(player.hp)
+    layout = MapLayout.load(MAP_LAYOUT_PATH) if MAP_LAYOUT_PATH else None
+    world = World(WORLD_WIDTH, WORLD_HEIGHT, layout=layout)
+    scheduler = FixedStepScheduler(TICK_RATE, MAX_TICKS_PER_FRAME)
+    recorder = start_recording(world, scheduler)
+    renderer = WorldRenderer(screen)
+    # celowanie myszą przelicza ekran na świat tą samą kamerą, którą rysujemy
+    player_input = KeyboardMouseInput(renderer.camera)
+    health_ui = HealthUI(world.player.hp)
     game_over_ui = GameOverUI(WINDOW_WIDTH, WINDOW_HEIGHT)
-
-    # create map
-    game_map = GameMap(WINDOW_WIDTH, WINDOW_HEIGHT)
-    game_map.generate_obstacles(
-        count=OBSTACLE_COUNT,
-        min_radius=OBSTACLE_MIN_R,
-        max_radius=OBSTACLE_MAX_R,
-        safe_zone_center = player.pos,
-        safe_zone_size = 200
-    )
-
-    game_map.generate_enemies(
-        count=ENEMY_COUNT,
-        enemy_radius=player.radius,
-        safe_zone_center= player.pos,
-        safe_zone_size=500
-    )
+    profiler_ui = ProfilerUI(profiler, budget_ms=1000 / FPS)
+    profiler_toggle_key = pygame.key.key_code(PROFILER_TOGGLE_KEY)
+    debug_toggle_key = pygame.key.key_code(DEBUG_OVERLAY_TOGGLE_KEY)
 
     running = True
-    player_dead = False
-    game_over_ui = GameOverUI(WINDOW_WIDTH, WINDOW_HEIGHT)
 
     while running:
-        dt = clock.tick(FPS) / 1000  # seconds
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            if not player_dead:
-                if player:
-                    player.handle_shoot_event(event)
-            else:
-                # GAME OVER
-                if game_over_ui.is_restart_clicked(event):
-                    return main()
-
-        # draw
-        screen.fill((30, 30, 30))  # background
+        frame_time = clock.tick(FPS) / 1000  # seconds
+        profiler.begin_frame()
 
-        if not player_dead:
-            if player:
-                player.update(dt, game_map, screen)
-                if player.hp <= 0:
-                    player_dead = True
-                    player = None
+        with profiler.section("events"):
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                if event.type == pygame.KEYDOWN and event.key == profiler_toggle_key:
+                    profiler.set_enabled(not profiler.enabled)
+                if event.type == pygame.KEYDOWN and event.key == debug_toggle_key:
+                    world.game_map.debug_overlay.toggle()
+                if not world.player_dead:
+                    player_input.handle_event(event)
+                else:
+                    # GAME OVER
+                    if game_over_ui.is_restart_clicked(event):
+                        # restart w miejscu - te same obiekty, UI i procesy silnika roju
+                        if recorder is not None:
+                            recorder.close()
+                            world.observers.remove(recorder)
+                        world.reset(layout=layout)
+                        scheduler.reset()
+                        recorder = start_recording(world, scheduler)
 
-            if player:
-                for enemy in game_map.enemies:
-                    enemy.update(dt, game_map, player)
+        # symulacja stałym krokiem, niezależnie od czasu klatki
+        ticks = scheduler.advance(frame_time)
+        if ticks:
+            tick_input = player_input.poll(world.player, world.game_map)
+            for _ in range(ticks):
+                world.step(scheduler.dt, tick_input)
 
-        if player:
-            player.draw(screen)
-
-        game_map.draw(screen)
-        if not player_dead:
-            health_ui.draw(screen, player.hp)
-        else:
-            game_over_ui.draw(screen)
-        pygame.display.flip()
+        # draw
+        with profiler.section("draw"):
+            renderer.draw(world, scheduler.alpha)
+        with profiler.section("ui"):
+            if not world.player_dead:
+                health_ui.draw(screen, world.player.hp)
+            else:
+                game_over_ui.draw(screen)
+            profiler_ui.draw(screen)
+        with profiler.section("flip"):
+            pygame.display.flip()
+        profiler.end_frame()
 
+    if recorder is not None:
+        recorder.close()
+    world.game_map.close()
     pygame.quit()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,6 +1,8 @@
 import pygame
 
 class CircleObstacle:
+    __slots__ = ("pos", "radius")
+
     def __init__(self, x: float, y: float, radius: float):
         self.pos = pygame.Vector2(x, y)
         self.radius = radius
@@ -0,0 +1,157 @@
+import heapq
+import math
+
+try:
+    import numpy as np
+except ImportError:  # sample_many jest opcjonalny - next_point działa bez numpy
+    np = None
+
+
+class FlowField:
+    """
+    Wspólne pole przepływu do celu (gracza) dla wszystkich grup atakujących.
+    Dijkstra od komórki celu po siatce przejezdności (NavGrid) daje komórce następną
+    komórkę na najkrótszej drodze omijającej przeszkody i ściany.
+    Pole jest liczone leniwie: update tylko zapamiętuje cel, a Dijkstra rusza dopiero przy
+    pierwszym next_point/sample_many i zatrzymuje się, gdy pytane komórki mają ostateczną
+    odległość - bez atakujących poza zasięgiem wzroku gracza nic nie jest liczone.
+    Odpowiedzi są pamiętane do zmiany komórki celu, więc kolejne zapytania kosztują O(1).
+    """
+
+    def __init__(self):
+        self.grid = None
+        self.target_x = 0.0
+        self.target_y = 0.0
+        self.target_cell = None
+        # rośnie przy każdej zmianie celu (nowe pole)
+        self.version = 0
+        # ile razy Dijkstra ruszyła od nowego celu
+        self.recomputes = 0
+        # stan przerwanego Dijkstry dla bieżącego celu (None - jeszcze nie ruszył)
+        self._dist = None
+        self._settled = None
+        self._heap = None
+        # komórka -> następny punkt (środek sąsiedniej komórki) albo None - brak drogi do celu
+        self._next = {}
+
+    def reset(self):
+        """Wymusza nowe pole przy następnym update (np. po restarcie mapy)."""
+        self.grid = None
+        self.target_cell = None
+        self._dist = None
+        self._next = {}
+
+    @property
+    def ready(self) -> bool:
+        return self.target_cell is not None
+
+    def update(self, target_pos, grid) -> bool:
+        """
+        Ustawia cel. Jeśli cel zmienił komórkę albo zmieniła się siatka (mapa), porzuca stare pole
+        (nowe powstanie przy pierwszym zapytaniu) i zwraca True.
+        """
+        self.target_x = target_pos.x
+        self.target_y = target_pos.y
+        cell = grid.key(target_pos.x, target_pos.y)
+        if grid is self.grid and cell == self.target_cell:
+            return False
+        self.grid = grid
+        self.target_cell = cell
+        self._dist = None
+        self._next = {}
+        self.version += 1
+        return True
+
+    def _settle(self, cells):
+        """Dijkstra od komórki celu, aż wszystkie `cells` mają ostateczną odległość (albo brak drogi)."""
+        if self._dist is None:
+            self.recomputes += 1
+            self._dist = [math.inf] * len(self.grid)
+            self._settled = bytearray(len(self.grid))
+            self._dist[self.target_cell] = 0.0
+            self._heap = [(0.0, self.target_cell)]
+        settled = self._settled
+        waiting = {c for c in cells if not settled[c]}
+        heap = self._heap
+        if not waiting or not heap:
+            return
+        dist = self._dist
+        adjacency = self.grid.adjacency
+        heappop, heappush = heapq.heappop, heapq.heappush
+        while heap:
+            d, index = heappop(heap)
+            if settled[index]:
+                continue
+            settled[index] = 1
+            # z zablokowanej komórki celu (gracz przy przeszkodzie) pole i tak się rozchodzi
+            for n, cost in adjacency[index]:
+                nd = d + cost
+                if nd < dist[n]:
+                    dist[n] = nd
+                    heappush(heap, (nd, n))
+            waiting.discard(index)
+            if not waiting:
+                break
+
+    def _resolve(self, index):
+        """Następny punkt komórki: sąsiad bliżej celu (ich odległości są już ostateczne)."""
+        grid = self.grid
+        best_n = None
+        if grid.blocked[index]:
+            # agent wepchnięty w zablokowaną komórkę wychodzi do najbliższej celu wolnej sąsiedniej
+            exits = list(grid.exits(index))
+            blocked = grid.blocked
+            self._settle(n for n, _ in exits if not blocked[n])
+            dist = self._dist
+            best = math.inf
+            for n, cost in exits:
+                if dist[n] + cost < best:
+                    best = dist[n] + cost
+                    best_n = n
+        else:
+            # po ustaleniu komórki wszyscy sąsiedzi bliżej celu też są już ustaleni
+            self._settle((index,))
+            dist = self._dist
+            best = dist[index]
+            for n, _ in grid.adjacency[index]:
+                if dist[n] < best:
+                    best = dist[n]
+                    best_n = n
+        point = grid.center(best_n) if best_n is not None else None
+        self._next[index] = point
+        return point
+
+    def _cell_point(self, index):
+        if index == self.target_cell:
+            return self.target_x, self.target_y
+        if index in self._next:
+            return self._next[index]
+        return self._resolve(index)
+
+    def next_point(self, x: float, y: float):
+        """Następny punkt drogi do celu z pozycji (x, y) - (x, y) albo None, jeśli drogi nie ma."""
+        if self.target_cell is None:
+            return None
+        return self._cell_point(self.grid.key(x, y))
+
+    def sample_many(self, positions):
+        """
+        Wektorowy next_point dla tablicy pozycji (k, 2).
+        Zwraca (punkty (k, 2), maska agentów, które mają drogę do celu).
+        """
+        if np is None:
+            raise ImportError("FlowField.sample_many wymaga pakietu numpy")
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        if self.target_cell is None:
+            return np.zeros_like(positions), np.zeros(len(positions), dtype=bool)
+        grid = self.grid
+        cx = np.clip(np.floor_divide(positions[:, 0], grid.cell_size).astype(np.int64), 0, grid.cols - 1)
+        cy = np.clip(np.floor_divide(positions[:, 1], grid.cell_size).astype(np.int64), 0, grid.rows - 1)
+        # jedno zapytanie na komórkę - Dijkstra zatrzymuje się po ostatniej z nich
+        cells, inverse = np.unique(cy * grid.cols + cx, return_inverse=True)
+        cells = cells.tolist()
+        self._settle(c for c in cells if not grid.blocked[c])
+        found = [self._cell_point(c) for c in cells]
+        valid = np.fromiter((p is not None for p in found), dtype=bool, count=len(found))
+        points = np.array([p if p is not None else (0.0, 0.0) for p in found], dtype=float).reshape(-1, 2)
+        return points[inverse], valid[inverse]
@@ -1,8 +1,42 @@
+import math
 import random
+import warnings
 import pygame
 from enemy.enemy import Enemy
+from enemy.enemy_group_manager import EnemyGroupSolver
+from enemy.enemy_steering import EnemySteering
+from config import ATTACK_THRESHOLD
 from .circle_obstacle import CircleObstacle
 from .wall import Wall
+from .wall_index import WallIndex
+from .wall_layout import border_walls
+from .obstacle_index import ObstacleIndex
+from .hiding_spots import HidingSpotTable
+from .flow_field import FlowField
+from .navigation import NavGrid, Navigator
+from .poisson_disc import poisson_disc, MapDensityWarning
+from utils.spatial_hash import SpatialHash
+from utils import ray_query
+from utils.collision import separate_agents
+from utils.profiler import profiled
+from utils.debuging import DebugOverlay
+from config import DEBUG_OVERLAY, AI_LOD, FLOW_FIELD, NAVIGATION, NAV_GRID_CELL, NAV_PATH_CACHE_SIZE
+from enemy.ai_lod import AILodScheduler
+
+def in_safe_zone(x, y, radius, center, size) -> bool:
+    """Czy koło (x, y, radius) wchodzi w kwadratową strefę startową (center, size)."""
+    if center is None or size <= 0:
+        return False
+    half = size / 2
+    return (center.x - half - radius < x < center.x + half + radius and
+            center.y - half - radius < y < center.y + half + radius)
+
+
+def report_shortfall(what, placed, requested):
+    if placed < requested:
+        warnings.warn(f"mapa {what}: {placed} z {requested} - żądana gęstość się nie mieści",
+                      MapDensityWarning, stacklevel=3)
+
 
 class GameMap:
     def __init__(self, width: int, height: int):
@@ -11,21 +45,55 @@ class GameMap:
         self.obstacles: list[CircleObstacle] = []
         self.enemies: list[Enemy] = []
         self.walls: list[Wall] = []
-
+        # punkty startowe wrogów (do zapisu układu mapy) i pula obiektów Enemy do ponownego użycia
+        self.enemy_spawns: list[tuple[float, float]] = []
+        self.enemy_radius = 15
+        self._enemy_pool: list[Enemy] = []
+        # statyczny indeks przeszkód - przebudowywany tylko po zmianie listy obstacles
+        self.obstacle_index = ObstacleIndex(self.obstacles)
+        self.obstacle_circles = ray_query.circle_arrays(self.obstacles)
+        # indeks odcinków ścian - feelery wall_avoidance i kolizje sprawdzają tylko pobliskie ściany
+        self.wall_index = WallIndex(self.walls)
+        # punkty ukrycia przed graczem - wspólne dla wszystkich wrogów
+        self.hiding_spots = HidingSpotTable()
+        # siatka przejezdności - budowana po wygenerowaniu mapy (update_navigation),
+        # z kluczami: obiekty indeksów (co tick) i geometria mapy (po restarcie)
+        self.nav_grid = None
+        self._nav_source = ()
+        self._nav_geometry = None
+        # pole przepływu do gracza - jedno dla wszystkich grup atakujących (None - sam pursuit)
+        self.flow_field = FlowField() if FLOW_FIELD else None
+        # ścieżki A* z pamięcią podręczną (None - hide idzie do punktu ukrycia wprost)
+        self.navigation = Navigator(NAV_PATH_CACHE_SIZE) if NAVIGATION else None
+        # siatka do szukania sąsiadów, komórki wielkości flocking_radius
+        self.enemy_grid = SpatialHash(cell_size=70.0)
+        # grupowanie wrogów - jeden przebieg na tick
+        self.group_solver = EnemyGroupSolver(ATTACK_THRESHOLD)
+        # warstwa debug (strefy sąsiadów) - przełączana w trakcie gry
+        self.debug_overlay = DebugOverlay(enabled=DEBUG_OVERLAY)
+        # LOD AI - dalecy eksploratorzy liczą steering rzadziej (None - wszyscy co tick)
+        self.ai_lod = AILodScheduler() if AI_LOD else None
+        # opcjonalny wektorowy silnik roju (enemy.swarm_engine)
+        self.swarm_engine = None
+        # środki i promienie wrogów dla promieni bez silnika roju - liczone raz na tick
+        self._enemy_circle_cache = None
 
     def generate_walls(self):
         """Tworzy ściany przy krawędziach mapy"""
-        tl = pygame.Vector2(0, 0)
-        tr = pygame.Vector2(self.width, 0)
-        br = pygame.Vector2(self.width, self.height)
-        bl = pygame.Vector2(0, self.height)
-
-        self.walls = [
-            Wall(tl, tr),  # góra
-            Wall(tr, br),  # prawa
-            Wall(br, bl),  # dół
-            Wall(bl, tl)  # lewa
-        ]
+        self.set_walls(border_walls(self.width, self.height))
+
+    def set_walls(self, walls):
+        """Ustawia ściany mapy (dowolne odcinki: pokoje, korytarze) i buduje ich indeks."""
+        self.walls = list(walls)
+        self.rebuild_wall_index()
+
+    def rebuild_wall_index(self):
+        """Buduje indeks ścian od nowa - wywołać po każdej zmianie self.walls."""
+        self.wall_index = WallIndex(self.walls)
+
+    def near_wall(self, x, y, radius) -> bool:
+        """Czy koło (x, y, radius) dotyka którejś ściany."""
+        return bool(self.wall_index) and bool(self.wall_index.query_radius(pygame.Vector2(x, y), radius))
 
     def generate_obstacles(
         self,
@@ -36,9 +104,22 @@ class GameMap:
         safe_zone_center: pygame.Vector2 = None,
         safe_zone_size = 0,
         min_distance_between_obstacles: int = 70,
-        min_distance_from_walls: int = 100
-
+        min_distance_from_walls: int = 100,
+        method: str = "rejection"
     ):
+        """
+        Dokłada do `count` przeszkód. method:
+        - "rejection" - losowanie i odrzucanie (max_attempts prób),
+        - "poisson" - próbkowanie Bridsona na siatce, liniowe w liczbie przeszkód (duże mapy).
+        Jeśli żądana gęstość się nie mieści, ostrzega MapDensityWarning. Zwraca liczbę przeszkód.
+        """
+        if method == "poisson":
+            self._generate_obstacles_poisson(count, min_radius, max_radius, safe_zone_center, safe_zone_size,
+                                             min_distance_between_obstacles, min_distance_from_walls)
+            return len(self.obstacles)
+        if method != "rejection":
+            raise ValueError(f"nieznana metoda generowania: {method}")
+
         attempts = 0
 
         while len(self.obstacles) < count and attempts < max_attempts:
@@ -51,11 +132,12 @@ class GameMap:
             pos = pygame.Vector2(x, y)
 
             # sprawdzenie safe zone
-            if safe_zone_center is not None and safe_zone_size > 0:
-                half = safe_zone_size / 2
-                if (safe_zone_center.x - half - radius < pos.x < safe_zone_center.x + half + radius and
-                    safe_zone_center.y - half - radius < pos.y < safe_zone_center.y + half + radius):
-                    continue  # kolizja ze strefą startową - generuj nowy
+            if in_safe_zone(x, y, radius, safe_zone_center, safe_zone_size):
+                continue  # kolizja ze strefą startową - generuj nowy
+
+            # odstęp od ścian wewnętrznych, żeby przeszkoda nie zatkała korytarza
+            if self.near_wall(x, y, radius + min_distance_between_obstacles):
+                continue
 
             new_circle = CircleObstacle(x, y, radius)
 
@@ -73,16 +155,68 @@ class GameMap:
 
             self.obstacles.append(new_circle)
 
+        self.rebuild_obstacle_index()
+        report_shortfall("przeszkód", len(self.obstacles), count)
+        return len(self.obstacles)
+
+    def _generate_obstacles_poisson(self, count, min_radius, max_radius, safe_zone_center, safe_zone_size,
+                                    min_distance_between_obstacles, min_distance_from_walls):
+        existing = self.obstacle_index
+
+        def accept(x, y, r):
+            if in_safe_zone(x, y, r, safe_zone_center, safe_zone_size):
+                return False
+            if self.near_wall(x, y, r + min_distance_between_obstacles):
+                return False
+            # odstęp od przeszkód, które były już na mapie
+            return not existing.query_radius(pygame.Vector2(x, y), r + min_distance_between_obstacles)
+
+        margin = min_distance_from_walls
+        candidates = poisson_disc((margin, margin, self.width - margin, self.height - margin),
+                                  min_distance_between_obstacles, (min_radius, max_radius), accept)
+        # zbiór Bridsona wypełnia całą mapę - losowy podzbiór jest rozłożony równomiernie
+        needed = max(count - len(self.obstacles), 0)
+        if len(candidates) > needed:
+            candidates = random.sample(candidates, needed)
+        self.obstacles.extend(CircleObstacle(x, y, r) for x, y, r in candidates)
+
+        self.rebuild_obstacle_index()
+        report_shortfall("przeszkód", len(self.obstacles), count)
+
+    def rebuild_obstacle_index(self):
+        """Buduje indeks przeszkód od nowa - wywołać po każdej zmianie self.obstacles."""
+        self.obstacle_index = ObstacleIndex(self.obstacles)
+        # te same przeszkody jako tablice dla zapytań wsadowych (ray_query)
+        self.obstacle_circles = ray_query.circle_arrays(self.obstacles)
+
     def generate_enemies(
             self,
             count: int,
             enemy_radius: int,
             safe_zone_center: pygame.Vector2 = None,
             safe_zone_size=0,
-            max_attempts=2000
+            max_attempts=2000,
+            method: str = "rejection",
+            min_distance_between_enemies=None
     ):
-        attempts = 0
+        """
+        Rozstawia `count` wrogów poza przeszkodami i strefą startową. method jak w generate_obstacles;
+        przy "poisson" spawny są odległe o min_distance_between_enemies (brzeg-brzeg,
+        domyślnie dobrane do gęstości). Zwraca liczbę wrogów.
+        """
         self.enemies = []
+        self.enemy_spawns = []
+        self.enemy_radius = enemy_radius
+        if method == "poisson":
+            spawns = self._poisson_spawns(count, enemy_radius, safe_zone_center, safe_zone_size,
+                                          min_distance_between_enemies)
+            self.spawn_enemies(spawns, enemy_radius)
+            report_shortfall("wrogów", len(self.enemies), count)
+            return len(self.enemies)
+        if method != "rejection":
+            raise ValueError(f"nieznana metoda generowania: {method}")
+
+        attempts = 0
 
         while len(self.enemies) < count and attempts < max_attempts:
             attempts += 1
@@ -92,24 +226,420 @@ class GameMap:
             pos = pygame.Vector2(x, y)
 
             # sprawdzenie safe zone
-            if safe_zone_center is not None and safe_zone_size > 0:
-                half = safe_zone_size / 2
-                if (safe_zone_center.x - half - enemy_radius < pos.x < safe_zone_center.x + half + enemy_radius and
-                        safe_zone_center.y - half - enemy_radius < pos.y < safe_zone_center.y + half + enemy_radius):
-                    continue  # kolizja ze strefą startową - generuj nowy
-
-            # kolizja z przeszkodami
-            new_enemy = Enemy(x, y, enemy_radius)
-            if new_enemy.collides_with_obstacles(self.obstacles):
+            if in_safe_zone(x, y, enemy_radius, safe_zone_center, safe_zone_size):
+                continue  # kolizja ze strefą startową - generuj nowy
+
+            if self.near_wall(x, y, enemy_radius):
+                continue
+
+            # kolizja z przeszkodami (kandydat z puli - odrzucony zostaje na następną próbę)
+            new_enemy = self._pooled_enemy(len(self.enemies), x, y, enemy_radius)
+            if new_enemy.collides_with_obstacles(self.obstacle_index.query_radius(pos, enemy_radius)):
                 continue
 
+            new_enemy.uid = len(self.enemies)
             self.enemies.append(new_enemy)
+            self.enemy_spawns.append((x, y))
+
+        self._rebuild_enemy_grid()
+        report_shortfall("wrogów", len(self.enemies), count)
+        return len(self.enemies)
+
+    def _poisson_spawns(self, count, enemy_radius, safe_zone_center, safe_zone_size, spacing):
+        """Punkty startowe wrogów z próbkowania Bridsona (bez nakładania na przeszkody)."""
+        if count <= 0:
+            return []
+
+        def accept(x, y, r):
+            if in_safe_zone(x, y, r, safe_zone_center, safe_zone_size):
+                return False
+            if self.near_wall(x, y, r):
+                return False
+            return not self.obstacle_index.query_radius(pygame.Vector2(x, y), r)
+
+        bounds = (0, 0, self.width, self.height)
+        if spacing is None:
+            # odstęp, przy którym pełny zbiór ma ~1.3x count punktów (gęstość Bridsona ~ 0.7 / d^2);
+            # zbyt rzadki zbiór -> zagęszczamy aż do stykających się wrogów
+            free_area = self.width * self.height - sum(math.pi * o.radius ** 2 for o in self.obstacles)
+            d = math.sqrt(max(free_area, 1.0) * 0.7 / (1.3 * count))
+            spacing = max(d - 2 * enemy_radius, 0.0)
+            while True:
+                spawns = poisson_disc(bounds, spacing, (enemy_radius, enemy_radius), accept)
+                if len(spawns) >= count or spacing <= 0.0:
+                    break
+                spacing = spacing * 0.6 if spacing > 1.0 else 0.0
+        else:
+            spawns = poisson_disc(bounds, spacing, (enemy_radius, enemy_radius), accept)
+
+        if len(spawns) > count:
+            spawns = random.sample(spawns, count)
+        return [(x, y) for x, y, _ in spawns]
+
+    def spawn_enemies(self, spawns, enemy_radius: int):
+        """Ustawia wrogów w podanych punktach (np. z MapLayout), używając obiektów z puli."""
+        self.enemy_spawns = [tuple(p) for p in spawns]
+        self.enemy_radius = enemy_radius
+        self.enemies = []
+        for i, (x, y) in enumerate(self.enemy_spawns):
+            enemy = self._pooled_enemy(i, x, y, enemy_radius)
+            enemy.uid = i
+            self.enemies.append(enemy)
+        self._rebuild_enemy_grid()
+
+    def _pooled_enemy(self, index, x, y, radius):
+        """
+        Wróg nr `index` z puli, zresetowany do (x, y). Pula trzyma wszystkich kiedykolwiek
+        utworzonych wrogów (także zastrzelonych), więc restart nie alokuje nowych obiektów.
+        """
+        if index < len(self._enemy_pool):
+            enemy = self._enemy_pool[index]
+            enemy.reset(x, y)
+            enemy.radius = radius
+        else:
+            enemy = Enemy(x, y, radius)
+            self._enemy_pool.append(enemy)
+        return enemy
+
+    def _rebuild_enemy_grid(self):
+        if self.enemies:
+            self.enemy_grid = SpatialHash(cell_size=max(e.flocking_radius for e in self.enemies))
+        self.update_spatial_hash()
+
+    def apply_layout(self, layout):
+        """Odtwarza zapisany układ (przeszkody, ściany, wrogowie) bez losowania."""
+        self.width = layout.width
+        self.height = layout.height
+        self.obstacles = [CircleObstacle(x, y, r) for x, y, r in layout.obstacles]
+        self.set_walls(Wall(pygame.Vector2(x1, y1), pygame.Vector2(x2, y2)) for x1, y1, x2, y2 in layout.walls)
+        self.rebuild_obstacle_index()
+        self.spawn_enemies(layout.enemy_spawns, layout.enemy_radius)
+
+    def clear(self):
+        """Usuwa przeszkody, ściany i wrogów przed wygenerowaniem nowej mapy (pula wrogów zostaje)."""
+        self.obstacles = []
+        self.enemies = []
+        self.enemy_spawns = []
+        self.set_walls([])
+        self.rebuild_obstacle_index()
+
+    def update_navigation(self):
+        """
+        Przebudowuje siatkę przejezdności, jeśli zmieniły się przeszkody, ściany albo wymiary mapy.
+        Bez pola przepływu i nawigacji siatka nie jest potrzebna (zwraca None).
+        """
+        if self.flow_field is None and self.navigation is None:
+            return None
+        # szybka ścieżka co tick: te same obiekty indeksów (nie mają __eq__) i wymiary
+        source = (self.width, self.height, self.enemy_radius)
+        if (self.nav_grid is not None and self._nav_source[0] is self.obstacle_index
+                and self._nav_source[1] is self.wall_index
+                and self._nav_source[2:] == source):
+            return self.nav_grid
+        # nowe indeksy (restart, apply_layout) - ten sam układ mapy daje tę samą siatkę
+        geometry = self.nav_geometry()
+        if self.nav_grid is None or geometry != self._nav_geometry:
+            self.nav_grid = NavGrid(self.width, self.height, self.obstacle_index, self.wall_index,
+                                    NAV_GRID_CELL, self.enemy_radius)
+            self._nav_geometry = geometry
+            if self.navigation is not None:
+                self.navigation.set_grid(self.nav_grid)
+        else:
+            self.nav_grid.wall_index = self.wall_index
+        self._nav_source = (self.obstacle_index, self.wall_index) + source
+        return self.nav_grid
+
+    def nav_geometry(self):
+        """Geometria, od której zależy siatka przejezdności: wymiary, promień wroga, przeszkody i ściany."""
+        return (self.width, self.height, self.enemy_radius,
+                tuple((o.pos.x, o.pos.y, o.radius) for o in self.obstacles),
+                tuple((w.start.x, w.start.y, w.end.x, w.end.y) for w in self.walls))
+
+    def reset_state(self):
+        """Zeruje stan symulacji zależny od przebiegu gry (czas grup, LOD, punkty ukrycia)."""
+        self._enemy_circle_cache = None
+        self.group_solver.reset()
+        # statystyki pomijania zachowań (PRIORITIZED_STEERING) liczone od początku gry
+        EnemySteering.reset_stats()
+        self.hiding_spots.reset()
+        if self.flow_field is not None:
+            self.flow_field.reset()
+        # nowa mapa jest już wygenerowana - siatka nawigacji powstaje przed pierwszym tickiem
+        self.update_navigation()
+        if self.swarm_engine is not None:
+            self.swarm_engine.reset()
+        if self.ai_lod is not None:
+            self.ai_lod.reset()
+
+    def update_spatial_hash(self):
+        """Przebudowuje siatkę wrogów - raz na klatkę, przed update wrogów."""
+        self.enemy_grid.rebuild(self.enemies)
+
+    def enable_swarm_engine(self, seed=None, workers=0):
+        """
+        Przełącza update wrogów na wektorowy SwarmEngine (numpy).
+        workers > 0 - steering liczony w tylu procesach (ParallelSwarmEngine).
+        """
+        self.close()
+        if workers:
+            from enemy.parallel_steering import ParallelSwarmEngine
+            self.swarm_engine = ParallelSwarmEngine(seed, workers)
+        else:
+            from enemy.swarm_engine import SwarmEngine
+            self.swarm_engine = SwarmEngine(seed)
+
+    def close(self):
+        """Zwalnia zasoby silnika roju (procesy robocze, pamięć współdzielona)."""
+        if self.swarm_engine is not None:
+            self.swarm_engine.close()
+            self.swarm_engine = None
+
+    def update_enemies(self, dt: float, player=None):
+        """Krok świata dla wrogów: ruch wszystkich, potem jeden przebieg kolizji."""
+        if player is not None:
+            self.hiding_spots.update(player.pos, self.obstacle_index)
+            if self.flow_field is not None:
+                # tylko cel - pole liczy się przy pierwszym zapytaniu atakującego, który nie widzi gracza
+                self.flow_field.update(player.pos, self.update_navigation())
+
+        if self.swarm_engine is not None:
+            # silnik liczy ruch i kolizje całego roju na tablicach
+            self.swarm_engine.step(dt, self, player)
+        else:
+            # sąsiedzi dla wszystkich, potem jeden przebieg grupowania
+            self.update_spatial_hash()
+            for enemy in self.enemies:
+                enemy.find_neighbors(self.enemies, self.enemy_grid)
+            self.group_solver.update(self.enemies, dt)
+
+            if self.ai_lod is not None:
+                schedule = self.ai_lod.schedule(self.enemies, player)
+                for enemy, recompute in zip(self.enemies, schedule):
+                    enemy.update(dt, self, player, recompute)
+            else:
+                for enemy in self.enemies:
+                    enemy.update(dt, self, player)
+            self.resolve_collisions(player)
+        self._enemy_circle_cache = None
+        if player is not None:
+            self.update_visibility(player)
+
+    def cast_ray(self, origin, direction, max_dist=math.inf, include_enemies=True):
+        """
+        Pierwsze trafienie promienia origin + direction * t: ściana, przeszkoda albo wróg.
+        Zwraca (obiekt, t, indeks wroga w self.enemies albo None) albo (None, None, None).
+        """
+        # ściana zatrzymuje promień - dalej nie szukamy przeszkód ani wrogów
+        wall, t_wall = self.wall_index.raycast(origin, direction, max_dist) if self.wall_index else (None, None)
+        if wall is not None:
+            max_dist = t_wall
+        hit, t = self.obstacle_index.raycast(origin, direction, max_dist)
+        if hit is None and wall is not None:
+            hit, t = wall, t_wall
+        if include_enemies and self.enemies:
+            centers, radii = self._enemy_circles()
+            # wróg liczy się tylko, jeśli jest bliżej niż przeszkoda
+            i, t_enemy = ray_query.cast(origin, direction, centers, radii, max_dist if t is None else t)
+            if i is not None:
+                return self.enemies[i], t_enemy, i
+        return hit, t, None
+
+    def cast_rays(self, origins, directions, max_dist=math.inf, include_enemies=True):
+        """
+        Wiele promieni naraz (np. śrut), ściany zatrzymują je jak w cast_ray.
+        `origins` może być jednym punktem wspólnym dla wszystkich.
+        Zwraca listę (obiekt, t) w kolejności promieni, (None, None) dla pudła.
+        """
+        if len(origins) == 2 and not hasattr(origins[0], "__len__"):
+            origins = [origins]
+        obs_i, obs_t = ray_query.cast_many(origins, directions, *self.obstacle_circles, max_dist)
+        if include_enemies and self.enemies:
+            centers, radii = self._enemy_circles()
+            enemy_i, enemy_t = ray_query.cast_many(origins, directions, centers, radii, max_dist)
+        else:
+            enemy_i, enemy_t = [-1] * len(obs_i), [math.inf] * len(obs_i)
+
+        hits = []
+        for k, (oi, ot, ei, et) in enumerate(zip(obs_i, obs_t, enemy_i, enemy_t)):
+            wall, wt = self._wall_hit(origins[0] if len(origins) == 1 else origins[k], directions[k], max_dist)
+            if ei >= 0 and et <= ot and et <= wt:
+                hits.append((self.enemies[ei], float(et)))
+            elif oi >= 0 and ot <= wt:
+                hits.append((self.obstacles[oi], float(ot)))
+            elif wall is not None:
+                hits.append((wall, wt))
+            else:
+                hits.append((None, None))
+        return hits
+
+    def _enemy_circles(self):
+        """Środki i promienie wrogów dla ray_query - z tablic silnika roju albo raz na tick z obiektów."""
+        engine = self.synced_engine()
+        if engine is not None:
+            return engine.pos[:engine.count], engine.radius[:engine.count]
+        if self._enemy_circle_cache is None:
+            self._enemy_circle_cache = ray_query.circle_arrays(self.enemies)
+        return self._enemy_circle_cache
+
+    def remove_enemy(self, index):
+        """Usuwa zastrzelonego wroga nr index z listy (i jego wiersz z silnika roju)."""
+        engine = self.synced_engine()
+        enemy = self.enemies.pop(index)
+        enemy.state = "dead"
+        enemy.is_group_leader = False
+        if engine is not None:
+            engine.remove_row(index)
+        self._enemy_circle_cache = None
+        return enemy
+
+    def closest_enemy(self, point):
+        """Najbliższy wróg do punktu (albo None)."""
+        if not self.enemies:
+            return None
+        engine = self.synced_engine()
+        if engine is None:
+            return min(self.enemies, key=lambda e: e.pos.distance_squared_to(point))
+        row = engine.closest_row(point.x, point.y)
+        engine.write_back(self.enemies, [row])
+        return self.enemies[row]
+
+    def _wall_hit(self, origin, direction, max_dist):
+        """(ściana, t) pierwszej ściany na promieniu albo (None, inf)."""
+        if not self.wall_index:
+            return None, math.inf
+        wall, t = self.wall_index.raycast(pygame.Vector2(origin[0], origin[1]),
+                                          pygame.Vector2(direction[0], direction[1]), max_dist)
+        return (None, math.inf) if wall is None else (wall, t)
+
+    def line_of_sight(self, a, b) -> bool:
+        """Czy odcinek a-b nie jest zasłonięty przez przeszkody ani ściany."""
+        if not ray_query.line_of_sight(a, b, *self.obstacle_circles):
+            return False
+        return not self.wall_index or self.wall_index.raycast(a, b - a, 1.0)[0] is None
+
+    def line_of_sight_many(self, starts, end):
+        """Widoczność punktu `end` z wielu punktów naraz - tablica bool w kolejności `starts`."""
+        visible = ray_query.line_of_sight_many(starts, end, *self.obstacle_circles)
+        if self.wall_index:
+            # ściany sprawdzamy tylko dla punktów, których nie zasłania już żadna przeszkoda
+            for i, start in enumerate(starts):
+                if visible[i] and self.wall_index.raycast(start, end - start, 1.0)[0] is not None:
+                    visible[i] = False
+        return visible
+
+    @profiled("GameMap.update_visibility")
+    def update_visibility(self, player):
+        """Ustawia Enemy.visible_to_player dla wszystkich wrogów jednym zapytaniem wsadowym."""
+        if not self.enemies:
+            return
+        engine = self.synced_engine()
+        if engine is not None:
+            # wynik zostaje w kolumnie silnika (Enemy.visible_to_player przez write_back)
+            engine.update_visibility(self, player)
+            return
+        visible = self.line_of_sight_many([e.pos for e in self.enemies], player.pos)
+        for enemy, is_visible in zip(self.enemies, visible):
+            enemy.visible_to_player = bool(is_visible)
+
+    @profiled("resolve_collisions")
+    def resolve_collisions(self, player=None):
+        """
+        Rozwiązuje kolizje raz na klatkę, po ruchu wszystkich wrogów:
+        przeszkody, gracz, granice mapy i ściany, a potem pary wrogów znalezione przez siatkę.
+        """
+        obstacle_index = self.obstacle_index
+        wall_index = self.wall_index if self.wall_index else None
+        for enemy in self.enemies:
+            enemy.collides_with_obstacles(obstacle_index.query_radius(enemy.pos, enemy.radius))
+            if player:
+                enemy.collides_with_player(player)
+            enemy.collides_with_walls(self.width, self.height)
+            if wall_index is not None:
+                enemy.collides_with_wall_segments(wall_index.query_radius(enemy.pos, enemy.radius))
+
+        # broadphase - tylko pary z sąsiednich komórek
+        self.enemy_grid.rebuild(self.enemies)
+        for a, b in self.enemy_grid.query_pairs(2 * self.enemy_grid.max_radius):
+            separate_agents(a, b)
+
+    @profiled("GameMap.draw")
+    def draw(self, surface: pygame.Surface, alpha: float = 1.0, camera=None):
+        """
+        Draw obstacles, walls and enemies that meet the view (alpha - interpolacja między tickami).
+        Widoczne obiekty dają zapytania indeksów o prostokąt widoku, więc koszt zależy od tego,
+        co widać, a nie od wielkości mapy. camera (ui.camera.Camera) - bez niej widok to cały surface.
+        """
+        if camera is not None:
+            offset = camera.offset
+            min_x, min_y, max_x, max_y = camera.view_rect()
+        else:
+            offset = pygame.Vector2(0, 0)
+            min_x, min_y = 0, 0
+            max_x, max_y = surface.get_size()
+        ox, oy = offset.x, offset.y
+
+        for obs in self.obstacle_index.query_rect(min_x, min_y, max_x, max_y):
+            pygame.draw.circle(surface, (120, 120, 120), (obs.pos.x - ox, obs.pos.y - oy), obs.radius)
+        # linia ma 3 px grubości
+        for wall in self.wall_index.query_rect(min_x - 2, min_y - 2, max_x + 2, max_y + 2):
+            pygame.draw.line(surface, (200, 200, 200), (wall.start.x - ox, wall.start.y - oy),
+                             (wall.end.x - ox, wall.end.y - oy), 3)
+        visible = self.enemies_in_rect(min_x, min_y, max_x, max_y)
+        # wszyscy wrogowie jednym wywołaniem blits - klatki z atlasu obróconych trójkątów
+        surface.blits([enemy.sprite_blit(alpha, ox, oy) for enemy in visible], doreturn=False)
+        self.debug_overlay.draw(surface, visible, alpha, offset)
+
+    def enemies_in_rect(self, min_x, min_y, max_x, max_y):
+        """Wrogowie, których rysunek (z warstwą debug) może wejść w prostokąt - z siatki wrogów."""
+        # trójkąt wroga i pozycja interpolowana z poprzedniego ticka mieszczą się w promieniu + zapas,
+        # strefa sąsiadów w warstwie debug - w komórce siatki (największy flocking_radius)
+        pad = self.enemy_grid.max_radius + 8.0
+        if self.debug_overlay.enabled:
+            pad = max(pad, self.enemy_grid.cell_size)
+        min_x -= pad
+        min_y -= pad
+        max_x += pad
+        max_y += pad
+        engine = self.synced_engine()
+        if engine is not None:
+            # z silnikiem roju siatka wrogów nie jest przebudowywana - pozycje są w jego tablicach,
+            # a obiekty dostają stan tylko dla rysowanych wierszy (i ich sąsiadów z warstwy debug)
+            rows = engine.rows_in_rect(min_x, min_y, max_x, max_y)
+            engine.write_back(self.enemies, engine.with_neighbors(rows) if self.debug_overlay.enabled else rows)
+            enemies = self.enemies
+            return [enemies[i] for i in rows.tolist()]
+        visible = []
+        for enemy in self.enemy_grid.query_rect(min_x, min_y, max_x, max_y):
+            # siatka jest przebudowywana w ticku - zastrzeleni w nim wrogowie mogą w niej jeszcze być
+            if enemy.state != "dead" and min_x <= enemy.pos.x <= max_x and min_y <= enemy.pos.y <= max_y:
+                visible.append(enemy)
+        return visible
+
+    def synced_engine(self):
+        """
+        Silnik roju, jeśli to on trzyma stan wrogów (po pierwszym kroku), inaczej None.
+        Dopasowuje jego wiersze do listy wrogów (np. po strzale), więc wiersz i == self.enemies[i].
+        """
+        engine = self.swarm_engine
+        if engine is None or not engine.synced:
+            return None
+        engine.sync(self.enemies)
+        return engine
+
+    def sync_enemy_objects(self):
+        """
+        Przepisuje stan silnika roju do wszystkich obiektów Enemy - przed odczytem całej listy
+        (replay, pickle, statystyki). Bez silnika obiekty są zawsze aktualne.
+        """
+        engine = self.synced_engine()
+        if engine is not None:
+            engine.write_back(self.enemies)
 
-    def draw(self, surface: pygame.Surface):
-        """Draw all obstacles, walls and enemies"""
-        for obs in self.obstacles:
-            pygame.draw.circle(surface, (120, 120, 120), obs.pos, obs.radius)
-        for wall in self.walls:
-            pygame.draw.line(surface, (200, 200, 200), wall.from_pos(), wall.to_pos(), 3)
+    def store_previous_positions(self):
+        """Zapamiętuje pozycje wrogów sprzed ticka (interpolacja rysowania)."""
+        engine = self.synced_engine()
+        if engine is not None:
+            engine.store_previous_positions()
+            return
         for enemy in self.enemies:
-            enemy.draw(surface, self.enemies)
\ No newline at end of file
+            enemy.prev_pos.update(enemy.pos)
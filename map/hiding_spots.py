@@ -0,0 +1,101 @@
+import math
+import pygame
+from config import HIDING_SPOT_MOVE_THRESHOLD
+
+
+class HidingSpotTable:
+    """
+    Wspólna tablica punktów ukrycia przed celem (graczem).
+    Punkt ukrycia zależy tylko od pozycji celu i przeszkody, nie od wroga,
+    więc liczymy je raz na tick dla całej mapy, a nie dla każdego wroga osobno.
+    Przeliczenie następuje dopiero, gdy cel przesunie się o więcej niż move_threshold.
+    """
+
+    def __init__(self, distance_from_boundary: float = 50.0, move_threshold: float = HIDING_SPOT_MOVE_THRESHOLD):
+        self.distance_from_boundary = distance_from_boundary
+        self.move_threshold = move_threshold
+
+        self.spots: list[pygame.Vector2] = []
+        self.target_pos = None
+        self.obstacle_index = None
+        # rośnie przy każdym przeliczeniu - SwarmEngine po nim odświeża swoją kopię
+        self.version = 0
+
+        # siatka punktów do szukania najbliższego
+        self.cell_size = 1.0
+        self.cells: dict[tuple[int, int], list[pygame.Vector2]] = {}
+        self.min_cell = (0, 0)
+        self.max_cell = (-1, -1)
+
+    def reset(self):
+        """Wymusza przeliczenie przy następnym update (np. po restarcie mapy)."""
+        self.target_pos = None
+        self.obstacle_index = None
+
+    def update(self, target_pos, obstacle_index):
+        """Przelicza punkty, jeśli zmieniły się przeszkody albo cel odszedł za daleko."""
+        if (self.obstacle_index is obstacle_index and self.target_pos is not None and
+                self.target_pos.distance_squared_to(target_pos) <= self.move_threshold ** 2):
+            return False
+
+        self.target_pos = pygame.Vector2(target_pos)
+        self.obstacle_index = obstacle_index
+        self.spots = [self.hiding_position(obs.pos, obs.radius, self.target_pos) for obs in obstacle_index]
+        self._build_grid(obstacle_index)
+        self.version += 1
+        return True
+
+    def hiding_position(self, obstacle_pos, obstacle_radius, target_pos):
+        to_obstacle = (obstacle_pos - target_pos).normalize()
+        return obstacle_pos + to_obstacle * (obstacle_radius + self.distance_from_boundary)
+
+    def _build_grid(self, obstacle_index):
+        self.cells = {}
+        if not self.spots:
+            self.min_cell, self.max_cell = (0, 0), (-1, -1)
+            return
+        # punkty leżą przy przeszkodach, więc komórka jak w indeksie przeszkód
+        self.cell_size = obstacle_index.cell_size
+        for spot in self.spots:
+            self.cells.setdefault(self._key(spot.x, spot.y), []).append(spot)
+        xs = [k[0] for k in self.cells]
+        ys = [k[1] for k in self.cells]
+        self.min_cell = (min(xs), min(ys))
+        self.max_cell = (max(xs), max(ys))
+
+    def _key(self, x, y):
+        return int(math.floor(x / self.cell_size)), int(math.floor(y / self.cell_size))
+
+    def nearest(self, pos):
+        """
+        Najbliższy punkt ukrycia - przeszukuje pierścienie komórek wokół pos,
+        aż żaden dalszy pierścień nie może zawierać bliższego punktu.
+        """
+        if not self.spots:
+            return None
+
+        cx, cy = self._key(pos.x, pos.y)
+        # ile pierścieni trzeba, żeby na pewno objąć całą siatkę
+        max_ring = max(abs(cx - self.min_cell[0]), abs(cx - self.max_cell[0]),
+                       abs(cy - self.min_cell[1]), abs(cy - self.max_cell[1]))
+
+        best = None
+        best_dist_sq = math.inf
+        cells = self.cells
+        for ring in range(max_ring + 1):
+            for x in range(cx - ring, cx + ring + 1):
+                # tylko obwód pierścienia (środek sprawdzony wcześniej)
+                step = 1 if x in (cx - ring, cx + ring) else 2 * ring
+                for y in range(cy - ring, cy + ring + 1, max(step, 1)):
+                    bucket = cells.get((x, y))
+                    if not bucket:
+                        continue
+                    for spot in bucket:
+                        dist_sq = pos.distance_squared_to(spot)
+                        if dist_sq < best_dist_sq:
+                            best_dist_sq = dist_sq
+                            best = spot
+            # punkty z dalszych pierścieni są co najmniej ring * cell_size od pos
+            if best is not None and best_dist_sq <= (ring * self.cell_size) ** 2:
+                break
+        return best
@@ -0,0 +1,84 @@
+import struct
+
+MAGIC = b"WDFTMAP\0"
+VERSION = 2
+# magic, wersja, szerokość, wysokość, seed, spawn gracza (x, y), promień wroga,
+# liczba przeszkód, ścian i spawnów wrogów
+_HEADER = struct.Struct("<8sHIIQddHIII")
+# współrzędne w float64 - wczytany układ jest identyczny z wygenerowanym
+_OBSTACLE = struct.Struct("<3d")  # x, y, promień
+_WALL = struct.Struct("<4d")  # start x, y, koniec x, y
+_SPAWN = struct.Struct("<2d")  # x, y
+
+
+class MapLayout:
+    """
+    Wygenerowany układ mapy: przeszkody, ściany, punkty startowe wrogów i gracza oraz seed.
+    Zapisany w małym pliku binarnym pozwala wczytać znaną mapę od razu,
+    bez losowania przeszkód i wrogów od nowa (GameMap.apply_layout).
+    """
+
+    def __init__(self, width, height, seed=0, obstacles=(), walls=(), enemy_spawns=(),
+                 player_spawn=(30, 30), enemy_radius=15):
+        self.width = width
+        self.height = height
+        self.seed = seed
+        self.obstacles = [tuple(o) for o in obstacles]  # (x, y, promień)
+        self.walls = [tuple(w) for w in walls]  # (x1, y1, x2, y2)
+        self.enemy_spawns = [tuple(p) for p in enemy_spawns]  # (x, y)
+        self.player_spawn = tuple(player_spawn)
+        self.enemy_radius = enemy_radius
+
+    @classmethod
+    def from_map(cls, game_map, seed=0, player_spawn=(30, 30)):
+        """Układ aktualnej mapy - wrogowie z punktów spawnu, nie z bieżących pozycji."""
+        return cls(
+            game_map.width,
+            game_map.height,
+            seed,
+            obstacles=[(o.pos.x, o.pos.y, o.radius) for o in game_map.obstacles],
+            walls=[(w.start.x, w.start.y, w.end.x, w.end.y) for w in game_map.walls],
+            enemy_spawns=game_map.enemy_spawns,
+            player_spawn=player_spawn,
+            enemy_radius=game_map.enemy_radius,
+        )
+
+    def __eq__(self, other):
+        return isinstance(other, MapLayout) and self.__dict__ == other.__dict__
+
+    def to_bytes(self):
+        parts = [_HEADER.pack(MAGIC, VERSION, self.width, self.height, self.seed,
+                              self.player_spawn[0], self.player_spawn[1], self.enemy_radius,
+                              len(self.obstacles), len(self.walls), len(self.enemy_spawns))]
+        parts.extend(_OBSTACLE.pack(*o) for o in self.obstacles)
+        parts.extend(_WALL.pack(*w) for w in self.walls)
+        parts.extend(_SPAWN.pack(*p) for p in self.enemy_spawns)
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        (magic, version, width, height, seed, player_x, player_y, enemy_radius,
+         obstacle_count, wall_count, spawn_count) = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("to nie jest plik układu mapy")
+        if version != VERSION:
+            raise ValueError(f"nieobsługiwana wersja układu mapy {version}")
+
+        offset = _HEADER.size
+        obstacles = list(_OBSTACLE.iter_unpack(data[offset:offset + obstacle_count * _OBSTACLE.size]))
+        offset += obstacle_count * _OBSTACLE.size
+        walls = list(_WALL.iter_unpack(data[offset:offset + wall_count * _WALL.size]))
+        offset += wall_count * _WALL.size
+        spawns = list(_SPAWN.iter_unpack(data[offset:offset + spawn_count * _SPAWN.size]))
+        if len(spawns) != spawn_count:
+            raise ValueError("plik układu mapy jest niekompletny")
+        return cls(width, height, seed, obstacles, walls, spawns, (player_x, player_y), enemy_radius)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
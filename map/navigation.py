@@ -0,0 +1,281 @@
+import heapq
+import math
+from collections import OrderedDict
+import pygame
+
+SQRT2 = math.sqrt(2.0)
+# 8 sąsiadów komórki: (dx, dy, koszt)
+NEIGHBORS = ((1, 0, 1.0), (-1, 0, 1.0), (0, 1, 1.0), (0, -1, 1.0),
+             (1, 1, SQRT2), (1, -1, SQRT2), (-1, 1, SQRT2), (-1, -1, SQRT2))
+
+
+class NavGrid:
+    """
+    Siatka przejezdności mapy budowana raz po wygenerowaniu przeszkód i ścian.
+    Komórka jest zablokowana, jeśli agent o promieniu clearance nie zmieści się w jej środku.
+    Wspólna dla pola przepływu (FlowField) i szukania ścieżek (Navigator).
+    """
+
+    def __init__(self, width, height, obstacle_index, wall_index, cell_size: float = 32.0, clearance: float = 15.0):
+        self.cell_size = float(cell_size)
+        self.clearance = float(clearance)
+        self.cols = max(1, int(math.ceil(width / self.cell_size)))
+        self.rows = max(1, int(math.ceil(height / self.cell_size)))
+        self.wall_index = wall_index
+
+        # ściana między dwoma środkami komórek jest bliżej niż pół komórki od jednego z nich,
+        # więc ten promień (plus zakaz ścinania narożników) nie przepuszcza dróg przez ścianę
+        wall_radius = max(self.clearance, self.cell_size * 0.5)
+        center = _Point()
+        blocked = []
+        for index in range(self.cols * self.rows):
+            center.x, center.y = self.center(index)
+            blocked.append(bool(obstacle_index.query_radius(center, self.clearance)) or
+                           (bool(wall_index) and bool(wall_index.query_radius(center, wall_radius))))
+        self.blocked = blocked
+        self.adjacency = [self._edges(index) for index in range(self.cols * self.rows)]
+
+    def __len__(self):
+        return self.cols * self.rows
+
+    def key(self, x: float, y: float) -> int:
+        """Indeks komórki dla punktu - punkty poza mapą trafiają do skrajnych komórek."""
+        cx = min(max(int(x // self.cell_size), 0), self.cols - 1)
+        cy = min(max(int(y // self.cell_size), 0), self.rows - 1)
+        return cy * self.cols + cx
+
+    def center(self, index: int) -> tuple[float, float]:
+        cy, cx = divmod(index, self.cols)
+        return (cx + 0.5) * self.cell_size, (cy + 0.5) * self.cell_size
+
+    def _edges(self, index):
+        """Wolni sąsiedzi komórki (indeks, koszt) - po skosie tylko, gdy oba boczne pola są wolne."""
+        cols, rows = self.cols, self.rows
+        blocked = self.blocked
+        cy, cx = divmod(index, cols)
+        edges = []
+        for dx, dy, cost in NEIGHBORS:
+            nx = cx + dx
+            ny = cy + dy
+            if not (0 <= nx < cols and 0 <= ny < rows):
+                continue
+            n = ny * cols + nx
+            if blocked[n]:
+                continue
+            if dx and dy and (blocked[cy * cols + nx] or blocked[ny * cols + cx]):
+                continue
+            edges.append((n, cost))
+        return tuple(edges)
+
+    def exits(self, index):
+        """Wszyscy sąsiedzi komórki (indeks, koszt) - wyjście z komórki zablokowanej (agent wepchnięty w przeszkodę)."""
+        cols, rows = self.cols, self.rows
+        cy, cx = divmod(index, cols)
+        for dx, dy, cost in NEIGHBORS:
+            nx, ny = cx + dx, cy + dy
+            if 0 <= nx < cols and 0 <= ny < rows:
+                yield ny * cols + nx, cost
+
+    def line_clear(self, ax, ay, bx, by) -> bool:
+        """Czy odcinek a-b przechodzi tylko przez wolne komórki i nie przecina ściany (DDA po komórkach)."""
+        cs = self.cell_size
+        blocked = self.blocked
+        cols = self.cols
+        cx, cy = int(ax // cs), int(ay // cs)
+        end_x, end_y = int(bx // cs), int(by // cs)
+        dx, dy = bx - ax, by - ay
+        step_x = 1 if dx > 0 else -1
+        step_y = 1 if dy > 0 else -1
+        t_max_x = ((cx + (step_x > 0)) * cs - ax) / dx if dx else math.inf
+        t_max_y = ((cy + (step_y > 0)) * cs - ay) / dy if dy else math.inf
+        t_delta_x = cs / abs(dx) if dx else math.inf
+        t_delta_y = cs / abs(dy) if dy else math.inf
+        while True:
+            if not (0 <= cx < cols and 0 <= cy < self.rows) or blocked[cy * cols + cx]:
+                return False
+            if cx == end_x and cy == end_y:
+                break
+            if t_max_x < t_max_y:
+                if t_max_x > 1.0:
+                    break
+                cx += step_x
+                t_max_x += t_delta_x
+            else:
+                if t_max_y > 1.0:
+                    break
+                cy += step_y
+                t_max_y += t_delta_y
+        if self.wall_index:
+            hit, _ = self.wall_index.raycast(_Point(ax, ay), _Point(dx, dy), 1.0)
+            return hit is None
+        return True
+
+
+class NavPath(list):
+    """
+    Lista waypointów (Vector2) dla SteeringBehaviors.follow_path.
+    goal - bieżący cel trasy, checked_goal - cel, dla którego trasę wyznaczono albo naprawiono.
+    """
+
+    def __init__(self, waypoints=(), goal=None, closed=False):
+        super().__init__(waypoints)
+        self.goal = goal
+        self.checked_goal = pygame.Vector2(goal) if goal is not None else None
+        self.closed = closed
+
+
+class Navigator:
+    """
+    Ścieżki A* po NavGrid z pamięcią podręczną LRU.
+    Klucz to (komórka startu, komórka celu), więc wrogowie startujący z tej samej okolicy
+    do tego samego punktu ukrycia dzielą jedno wyszukiwanie. Gdy cel przesuwa się
+    tylko trochę, replan() naprawia istniejącą ścieżkę zamiast szukać jej od nowa.
+    """
+
+    def __init__(self, cache_size: int = 512, replan_distance: float = 64.0):
+        self.grid = None
+        self.cache_size = cache_size
+        # o ile może przesunąć się cel, żeby wystarczyła naprawa końca ścieżki
+        self.replan_distance = replan_distance
+        self.cache: OrderedDict = OrderedDict()
+        # statystyki (benchmarki, debug)
+        self.searches = 0
+        self.cache_hits = 0
+        self.repairs = 0
+
+    def set_grid(self, grid):
+        """Nowa siatka (nowa mapa) - ścieżki ze starej mapy są nieważne."""
+        self.grid = grid
+        self.cache.clear()
+
+    def find_path(self, start, goal) -> NavPath | None:
+        """Ścieżka z `start` do `goal` (waypointy bez punktu startu, ostatni to goal) albo None, jeśli jej nie ma."""
+        grid = self.grid
+        if grid is None:
+            return NavPath([pygame.Vector2(goal)], pygame.Vector2(goal))
+        key = (grid.key(start.x, start.y), grid.key(goal.x, goal.y))
+        cells = self.cache.get(key)
+        if cells is not None:
+            self.cache.move_to_end(key)
+            self.cache_hits += 1
+        else:
+            cells = self._search(*key)
+            self.cache[key] = cells
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        if cells is False:
+            return None
+        return self._waypoints(cells, start, goal)
+
+    def replan(self, path, start, goal) -> NavPath | None:
+        """
+        Ścieżka do przesuniętego celu. Jeśli cel przesunął się o mniej niż replan_distance,
+        zostawiamy ścieżkę do ostatniego waypointu, z którego widać nowy cel, i dokładamy cel.
+        """
+        if not path or path.goal is None or self.grid is None:
+            return self.find_path(start, goal)
+        if path.checked_goal.distance_squared_to(goal) <= (self.grid.cell_size * 0.5) ** 2:
+            # cel nie odszedł o pół komórki od miejsca, dla którego sprawdzono trasę - przesuwamy tylko koniec
+            path[-1].update(goal)
+            path.goal.update(goal)
+            return path
+        moved_sq = path.goal.distance_squared_to(goal)
+        if moved_sq <= self.replan_distance ** 2:
+            line_clear = self.grid.line_clear
+            gx, gy = goal.x, goal.y
+            for i in range(len(path) - 1, -1, -1):
+                point = path[i - 1] if i > 0 else start
+                if line_clear(point.x, point.y, gx, gy):
+                    self.repairs += 1
+                    return NavPath(path[:i] + [pygame.Vector2(goal)], pygame.Vector2(goal))
+        return self.find_path(start, goal)
+
+    def patrol_route(self, points) -> NavPath | None:
+        """Zamknięta trasa przez kolejne punkty (ostatni łączy się z pierwszym) - None, jeśli któregoś nie da się osiągnąć."""
+        points = [pygame.Vector2(p) for p in points]
+        route = NavPath(closed=True)
+        for a, b in zip(points, points[1:] + points[:1]):
+            leg = self.find_path(a, b)
+            if leg is None:
+                return None
+            route.extend(leg)
+        return route
+
+    def _search(self, start, goal):
+        """A* po komórkach (heurystyka oktylna). Zwraca krotkę komórek od startu do celu albo False."""
+        self.searches += 1
+        grid = self.grid
+        if start == goal:
+            return (start,)
+        adjacency = grid.adjacency
+        blocked = grid.blocked
+        cols = grid.cols
+        gx, gy = goal % cols, goal // cols
+
+        def heuristic(index):
+            dx = abs(index % cols - gx)
+            dy = abs(index // cols - gy)
+            return max(dx, dy) + (SQRT2 - 1.0) * min(dx, dy)
+
+        # cel w zablokowanej komórce (punkt przy ścianie) osiągamy z jej wolnego sąsiada
+        if blocked[goal]:
+            targets = {n for n, _ in grid.exits(goal) if not blocked[n]}
+        else:
+            targets = {goal}
+
+        cost = {start: 0.0}
+        parent = {start: None}
+        heap = [(heuristic(start), 0.0, start)]
+        heappop, heappush = heapq.heappop, heapq.heappush
+        while heap:
+            _, g, index = heappop(heap)
+            if index in targets:
+                break
+            if g > cost[index]:
+                continue
+            # z zablokowanej komórki (start przy przeszkodzie) wychodzimy do wolnego sąsiada
+            edges = grid.exits(index) if blocked[index] else adjacency[index]
+            for n, step in edges:
+                if blocked[n]:
+                    continue
+                ng = g + step
+                if ng < cost.get(n, math.inf):
+                    cost[n] = ng
+                    parent[n] = index
+                    heappush(heap, (ng + heuristic(n), ng, n))
+        else:
+            return False
+
+        cells = [goal] if index != goal else []
+        while index is not None:
+            cells.append(index)
+            index = parent[index]
+        cells.reverse()
+        return tuple(cells)
+
+    def _waypoints(self, cells, start, goal) -> NavPath:
+        """
+        Wygładzanie ścieżki (string pulling): idziemy od punktu zaczepienia wzdłuż komórek,
+        dopóki widać je w linii prostej; ostatnia widoczna staje się waypointem.
+        """
+        grid = self.grid
+        points = [grid.center(c) for c in cells[1:-1]] + [(goal.x, goal.y)]
+        waypoints = []
+        ax, ay = start.x, start.y
+        previous = None
+        for point in points:
+            if previous is not None and not grid.line_clear(ax, ay, point[0], point[1]):
+                ax, ay = previous
+                waypoints.append(pygame.Vector2(previous))
+            previous = point
+        waypoints.append(pygame.Vector2(goal))
+        return NavPath(waypoints, pygame.Vector2(goal))
+
+
+class _Point:
+    """Punkt z polami x, y dla zapytań indeksów (bez tworzenia Vector2 dla każdej komórki)."""
+    __slots__ = ("x", "y")
+
+    def __init__(self, x=0.0, y=0.0):
+        self.x = x
+        self.y = y
@@ -0,0 +1,196 @@
+import math
+from utils.geometry import ray_circle_intersection
+from .circle_obstacle import CircleObstacle
+
+
+class ObstacleIndex:
+    """
+    Niezmienny indeks przeszkód (kubełki siatki) budowany raz po wygenerowaniu mapy.
+    Przeszkody się nie ruszają, więc zapytania agentów przeglądają tylko kilka
+    komórek zamiast całej listy game_map.obstacles.
+    """
+
+    def __init__(self, obstacles: list[CircleObstacle], cell_size: float = None):
+        self.obstacles = tuple(obstacles)
+        self.max_radius = max((o.radius for o in self.obstacles), default=0.0)
+        # komórka ~ średnica największej przeszkody: każda przeszkoda trafia do max 4 komórek
+        self.cell_size = float(cell_size or max(2.0 * self.max_radius, 32.0))
+        self.cells: dict[tuple[int, int], list[CircleObstacle]] = {}
+
+        self.min_x = self.min_y = math.inf
+        self.max_x = self.max_y = -math.inf
+        for obs in self.obstacles:
+            self.min_x = min(self.min_x, obs.pos.x - obs.radius)
+            self.min_y = min(self.min_y, obs.pos.y - obs.radius)
+            self.max_x = max(self.max_x, obs.pos.x + obs.radius)
+            self.max_y = max(self.max_y, obs.pos.y + obs.radius)
+            for key in self._cells_in_rect(obs.pos.x - obs.radius, obs.pos.y - obs.radius,
+                                           obs.pos.x + obs.radius, obs.pos.y + obs.radius):
+                self.cells.setdefault(key, []).append(obs)
+
+
+    def __len__(self):
+        return len(self.obstacles)
+
+    def __iter__(self):
+        return iter(self.obstacles)
+
+    def _cell(self, v: float) -> int:
+        return int(math.floor(v / self.cell_size))
+
+    def _cells_in_rect(self, min_x, min_y, max_x, max_y):
+        for cx in range(self._cell(min_x), self._cell(max_x) + 1):
+            for cy in range(self._cell(min_y), self._cell(max_y) + 1):
+                yield cx, cy
+
+    def _candidates(self, min_x, min_y, max_x, max_y):
+        if not self.cells:
+            return []
+        # przycinamy prostokąt do obszaru, w którym w ogóle są przeszkody
+        min_x = max(min_x, self.min_x)
+        min_y = max(min_y, self.min_y)
+        max_x = min(max_x, self.max_x)
+        max_y = min(max_y, self.max_y)
+        if min_x > max_x or min_y > max_y:
+            return []
+
+        seen = set()
+        result = []
+        cells = self.cells
+        for key in self._cells_in_rect(min_x, min_y, max_x, max_y):
+            bucket = cells.get(key)
+            if not bucket:
+                continue
+            for obs in bucket:
+                if id(obs) not in seen:
+                    seen.add(id(obs))
+                    result.append(obs)
+        return result
+
+    def query_radius(self, pos, radius: float) -> list[CircleObstacle]:
+        """Przeszkody, których okrąg przecina koło (pos, radius)."""
+        result = []
+        for obs in self._candidates(pos.x - radius, pos.y - radius, pos.x + radius, pos.y + radius):
+            reach = obs.radius + radius
+            dx = obs.pos.x - pos.x
+            dy = obs.pos.y - pos.y
+            if dx * dx + dy * dy < reach * reach:
+                result.append(obs)
+        return result
+
+    def query_rect(self, min_x, min_y, max_x, max_y) -> list[CircleObstacle]:
+        """Przeszkody, których okrąg przecina prostokąt (np. widok kamery)."""
+        result = []
+        for obs in self._candidates(min_x, min_y, max_x, max_y):
+            nx = min(max(obs.pos.x, min_x), max_x)
+            ny = min(max(obs.pos.y, min_y), max_y)
+            dx = obs.pos.x - nx
+            dy = obs.pos.y - ny
+            if dx * dx + dy * dy <= obs.radius * obs.radius:
+                result.append(obs)
+        return result
+
+    def query_box(self, pos, heading, side, length: float, half_width: float) -> list[CircleObstacle]:
+        """
+        Przeszkody przecinające zorientowany prostokąt (detection box):
+        w lokalnej przestrzeni agenta x w [0, length], y w [-half_width, half_width].
+        """
+        hx, hy = heading.x, heading.y
+        sx, sy = side.x, side.y
+        corners_x = (pos.x + sx * half_width, pos.x - sx * half_width,
+                     pos.x + hx * length + sx * half_width, pos.x + hx * length - sx * half_width)
+        corners_y = (pos.y + sy * half_width, pos.y - sy * half_width,
+                     pos.y + hy * length + sy * half_width, pos.y + hy * length - sy * half_width)
+
+        result = []
+        for obs in self._candidates(min(corners_x), min(corners_y), max(corners_x), max(corners_y)):
+            dx = obs.pos.x - pos.x
+            dy = obs.pos.y - pos.y
+            local_x = dx * hx + dy * hy
+            local_y = dx * sx + dy * sy
+            # najbliższy punkt boxa do środka przeszkody
+            nx = min(max(local_x, 0.0), length)
+            ny = min(max(local_y, -half_width), half_width)
+            if (local_x - nx) ** 2 + (local_y - ny) ** 2 < obs.radius * obs.radius:
+                result.append(obs)
+        return result
+
+    def raycast(self, origin, direction, max_dist: float = math.inf):
+        """
+        Pierwsze trafienie promienia (origin + direction * t, t > 0) w przeszkodę.
+        Przechodzi po komórkach wzdłuż promienia (DDA) i kończy, gdy trafienie jest pewne.
+        Zwraca (przeszkoda, t) albo (None, None).
+        """
+        if not self.cells:
+            return None, None
+
+        ox, oy = origin.x, origin.y
+        dx, dy = direction.x, direction.y
+
+        # odcinek promienia wewnątrz obszaru przeszkód (slab test)
+        t_enter, t_exit = 0.0, max_dist
+        for o, d, lo, hi in ((ox, dx, self.min_x, self.max_x), (oy, dy, self.min_y, self.max_y)):
+            if d == 0:
+                if o < lo or o > hi:
+                    return None, None
+                continue
+            t1 = (lo - o) / d
+            t2 = (hi - o) / d
+            if t1 > t2:
+                t1, t2 = t2, t1
+            t_enter = max(t_enter, t1)
+            t_exit = min(t_exit, t2)
+        if t_enter > t_exit:
+            return None, None
+
+        cs = self.cell_size
+        px = ox + dx * t_enter
+        py = oy + dy * t_enter
+        cx = self._cell(px)
+        cy = self._cell(py)
+
+        step_x = 1 if dx > 0 else -1
+        step_y = 1 if dy > 0 else -1
+        if dx != 0:
+            next_x = (cx + (1 if dx > 0 else 0)) * cs
+            t_max_x = t_enter + (next_x - px) / dx
+            t_delta_x = cs / abs(dx)
+        else:
+            t_max_x = t_delta_x = math.inf
+        if dy != 0:
+            next_y = (cy + (1 if dy > 0 else 0)) * cs
+            t_max_y = t_enter + (next_y - py) / dy
+            t_delta_y = cs / abs(dy)
+        else:
+            t_max_y = t_delta_y = math.inf
+
+        best_obs = None
+        best_t = None
+        tested = set()
+        cells = self.cells
+        while True:
+            bucket = cells.get((cx, cy))
+            if bucket:
+                for obs in bucket:
+                    if id(obs) in tested:
+                        continue
+                    tested.add(id(obs))
+                    t = ray_circle_intersection(ox, oy, dx, dy, obs.pos.x, obs.pos.y, obs.radius)
+                    if t is not None and t <= max_dist and (best_t is None or t < best_t):
+                        best_t = t
+                        best_obs = obs
+
+            t_next = min(t_max_x, t_max_y)
+            # trafienie leży w już sprawdzonych komórkach - nic bliższego nie będzie
+            if best_t is not None and best_t <= t_next:
+                break
+            if t_next > t_exit:
+                break
+            if t_max_x < t_max_y:
+                cx += step_x
+                t_max_x += t_delta_x
+            else:
+                cy += step_y
+                t_max_y += t_delta_y
+
+        return best_obs, best_t
@@ -0,0 +1,97 @@
+import math
+import random
+
+
+class MapDensityWarning(UserWarning):
+    """Generator nie zmieścił żądanej liczby przeszkód/wrogów na mapie."""
+
+
+def poisson_disc(bounds, spacing, radius_range=(0, 0), accept=None, k=30, rng=random, extra_seeds=30):
+    """
+    Próbkowanie Bridsona ze zmiennym promieniem: zwraca listę (x, y, r) kół leżących
+    w całości w bounds = (x0, y0, x1, y1), odległych od siebie (brzeg-brzeg) o co najmniej spacing.
+    Siatka tła ma komórki tak małe, że w każdej jest najwyżej jeden środek,
+    więc sprawdzenie kandydata to stała liczba komórek - czas liniowy w liczbie punktów.
+
+    radius_range - (min, max) promienia; dwa inty losują randint, inaczej uniform
+    accept(x, y, r) - dodatkowy warunek (strefa startowa, przeszkody)
+    extra_seeds - ile razy próbować nowego punktu startowego, gdy aktywna lista się skończy
+                  (obszary odcięte przez strefy wykluczone)
+    """
+    x0, y0, x1, y1 = bounds
+    min_r, max_r = radius_range
+    if isinstance(min_r, int) and isinstance(max_r, int):
+        random_radius = lambda: rng.randint(min_r, max_r)
+    else:
+        random_radius = lambda: rng.uniform(min_r, max_r)
+
+    min_dist = 2 * min_r + spacing
+    if min_dist <= 0:
+        raise ValueError("poisson_disc: spacing + 2 * min promień musi być > 0")
+    cell = min_dist / math.sqrt(2)
+    cols = max(1, int(math.ceil((x1 - x0) / cell)))
+    rows = max(1, int(math.ceil((y1 - y0) / cell)))
+    grid = [-1] * (cols * rows)
+    points = []
+    active = []
+
+    def fits(x, y, r):
+        if x - r < x0 or x + r > x1 or y - r < y0 or y + r > y1:
+            return False
+        cx = int((x - x0) / cell)
+        cy = int((y - y0) / cell)
+        span = int(math.ceil((r + max_r + spacing) / cell))
+        gx0 = cx - span if cx > span else 0
+        gx1 = cx + span + 1 if cx + span + 1 < cols else cols
+        for gy in range(cy - span if cy > span else 0, cy + span + 1 if cy + span + 1 < rows else rows):
+            row = gy * cols
+            for i in grid[row + gx0:row + gx1]:
+                if i >= 0:
+                    px, py, pr = points[i]
+                    need = r + pr + spacing
+                    dx = px - x
+                    dy = py - y
+                    if dx * dx + dy * dy < need * need:
+                        return False
+        return accept is None or accept(x, y, r)
+
+    def add(x, y, r):
+        cx = min(int((x - x0) / cell), cols - 1)
+        cy = min(int((y - y0) / cell), rows - 1)
+        grid[cy * cols + cx] = len(points)
+        active.append(len(points))
+        points.append((x, y, r))
+
+    seeds_left = extra_seeds + 1
+    while seeds_left > 0:
+        if not active:
+            # nowy punkt startowy - losowy, bo odcięty fragment mapy może być gdziekolwiek
+            seeds_left -= 1
+            r = random_radius()
+            if x1 - x0 < 2 * r or y1 - y0 < 2 * r:
+                continue
+            x = rng.uniform(x0 + r, x1 - r)
+            y = rng.uniform(y0 + r, y1 - r)
+            if fits(x, y, r):
+                add(x, y, r)
+            continue
+
+        slot = rng.randrange(len(active))
+        ax, ay, ar = points[active[slot]]
+        for _ in range(k):
+            r = random_radius()
+            # pierścień [d, 2d] wokół aktywnego punktu, d - minimalna odległość środków
+            d = ar + r + spacing
+            angle = rng.uniform(0.0, 2 * math.pi)
+            dist = rng.uniform(d, 2 * d)
+            x = ax + math.cos(angle) * dist
+            y = ay + math.sin(angle) * dist
+            if fits(x, y, r):
+                add(x, y, r)
+                break
+        else:
+            # k nieudanych prób - punkt nie ma już miejsca wokół siebie
+            active[slot] = active[-1]
+            active.pop()
+
+    return points
@@ -1,6 +1,8 @@
 import pygame
 
 class Wall:
+    __slots__ = ("start", "end", "normal")
+
     def __init__(self, start: pygame.Vector2, end: pygame.Vector2):
         self.start = start
         self.end = end
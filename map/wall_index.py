@@ -0,0 +1,220 @@
+import math
+from utils.geometry import segment_intersection, closest_point_on_segment
+from .wall import Wall
+
+
+class WallIndex:
+    """
+    Niezmienny indeks odcinków ścian (kubełki siatki) budowany raz razem z mapą.
+    Odcinek trafia tylko do komórek, przez które faktycznie przechodzi, więc feeler
+    albo promień sprawdza ściany z komórek na swojej drodze zamiast całej listy game_map.walls.
+    """
+
+    def __init__(self, walls: list[Wall], cell_size: float = 96.0):
+        self.walls = tuple(walls)
+        self.cell_size = float(cell_size)
+        # (x, y, dx, dy) - początek i wektor odcinka, bez sięgania do Vector2 w pętlach
+        self.segments = [(w.start.x, w.start.y, w.end.x - w.start.x, w.end.y - w.start.y) for w in self.walls]
+        self.cells: dict[tuple[int, int], list[int]] = {}
+        # znacznik ostatniego zapytania, które sprawdzało odcinek (zamiast zbioru `seen` na zapytanie)
+        self._stamp = [0] * len(self.walls)
+        self._query_id = 0
+
+        self.min_x = self.min_y = math.inf
+        self.max_x = self.max_y = -math.inf
+        for i, (x, y, dx, dy) in enumerate(self.segments):
+            self.min_x = min(self.min_x, x, x + dx)
+            self.min_y = min(self.min_y, y, y + dy)
+            self.max_x = max(self.max_x, x, x + dx)
+            self.max_y = max(self.max_y, y, y + dy)
+            for key in self._segment_cells(x, y, dx, dy):
+                self.cells.setdefault(key, []).append(i)
+
+    def __len__(self):
+        return len(self.walls)
+
+    def __iter__(self):
+        return iter(self.walls)
+
+    def _cell(self, v: float) -> int:
+        return int(math.floor(v / self.cell_size))
+
+    def _segment_cells(self, x, y, dx, dy):
+        """Komórki przecinane przez odcinek - wiersz po wierszu, zakres kolumn z fragmentu w wierszu."""
+        cs = self.cell_size
+        for cy in range(self._cell(min(y, y + dy)), self._cell(max(y, y + dy)) + 1):
+            if dy == 0:
+                t0, t1 = 0.0, 1.0
+            else:
+                t0 = min(max((cy * cs - y) / dy, 0.0), 1.0)
+                t1 = min(max(((cy + 1) * cs - y) / dy, 0.0), 1.0)
+            xa = x + dx * t0
+            xb = x + dx * t1
+            for cx in range(self._cell(min(xa, xb)), self._cell(max(xa, xb)) + 1):
+                yield cx, cy
+
+    def _next_query(self):
+        self._query_id += 1
+        return self._query_id
+
+    def query_radius(self, pos, radius: float) -> list[Wall]:
+        """Ściany, których odcinek przecina koło (pos, radius)."""
+        if not self.cells:
+            return []
+        px, py = pos.x, pos.y
+        query = self._next_query()
+        stamp = self._stamp
+        segments = self.segments
+        cells = self.cells
+        result = []
+        for cx in range(self._cell(px - radius), self._cell(px + radius) + 1):
+            for cy in range(self._cell(py - radius), self._cell(py + radius) + 1):
+                bucket = cells.get((cx, cy))
+                if not bucket:
+                    continue
+                for i in bucket:
+                    if stamp[i] == query:
+                        continue
+                    stamp[i] = query
+                    x, y, dx, dy = segments[i]
+                    nx, ny = closest_point_on_segment(px, py, x, y, x + dx, y + dy)
+                    if (nx - px) ** 2 + (ny - py) ** 2 < radius * radius:
+                        result.append(self.walls[i])
+        return result
+
+    def query_rect(self, min_x, min_y, max_x, max_y) -> list[Wall]:
+        """Ściany, których prostokąt otaczający przecina prostokąt (np. widok kamery)."""
+        if not self.cells:
+            return []
+        min_x = max(min_x, self.min_x)
+        min_y = max(min_y, self.min_y)
+        max_x = min(max_x, self.max_x)
+        max_y = min(max_y, self.max_y)
+        if min_x > max_x or min_y > max_y:
+            return []
+        query = self._next_query()
+        stamp = self._stamp
+        segments = self.segments
+        cells = self.cells
+        result = []
+        for cx in range(self._cell(min_x), self._cell(max_x) + 1):
+            for cy in range(self._cell(min_y), self._cell(max_y) + 1):
+                bucket = cells.get((cx, cy))
+                if not bucket:
+                    continue
+                for i in bucket:
+                    if stamp[i] == query:
+                        continue
+                    stamp[i] = query
+                    x, y, dx, dy = segments[i]
+                    if (min(x, x + dx) <= max_x and max(x, x + dx) >= min_x and
+                            min(y, y + dy) <= max_y and max(y, y + dy) >= min_y):
+                        result.append(self.walls[i])
+        return result
+
+    def _cast(self, ox, oy, dx, dy, max_t):
+        """
+        Pierwszy odcinek na drodze origin + d * t, t w [0, max_t] (DDA po komórkach).
+        Zwraca (indeks odcinka, t) albo (None, None).
+        """
+        # fragment promienia wewnątrz obszaru ścian (slab test)
+        t_enter, t_exit = 0.0, max_t
+        for o, d, lo, hi in ((ox, dx, self.min_x, self.max_x), (oy, dy, self.min_y, self.max_y)):
+            if d == 0:
+                if o < lo or o > hi:
+                    return None, None
+                continue
+            t1 = (lo - o) / d
+            t2 = (hi - o) / d
+            if t1 > t2:
+                t1, t2 = t2, t1
+            t_enter = max(t_enter, t1)
+            t_exit = min(t_exit, t2)
+        if t_enter > t_exit:
+            return None, None
+
+        cs = self.cell_size
+        px = ox + dx * t_enter
+        py = oy + dy * t_enter
+        cx = self._cell(px)
+        cy = self._cell(py)
+
+        step_x = 1 if dx > 0 else -1
+        step_y = 1 if dy > 0 else -1
+        if dx != 0:
+            t_max_x = t_enter + ((cx + (1 if dx > 0 else 0)) * cs - px) / dx
+            t_delta_x = cs / abs(dx)
+        else:
+            t_max_x = t_delta_x = math.inf
+        if dy != 0:
+            t_max_y = t_enter + ((cy + (1 if dy > 0 else 0)) * cs - py) / dy
+            t_delta_y = cs / abs(dy)
+        else:
+            t_max_y = t_delta_y = math.inf
+
+        query = self._next_query()
+        stamp = self._stamp
+        segments = self.segments
+        cells = self.cells
+        best_i = None
+        best_t = None
+        while True:
+            bucket = cells.get((cx, cy))
+            if bucket:
+                for i in bucket:
+                    if stamp[i] == query:
+                        continue
+                    stamp[i] = query
+                    x, y, sx, sy = segments[i]
+                    t = segment_intersection(ox, oy, dx, dy, x, y, sx, sy, max_t)
+                    if t is not None and (best_t is None or t < best_t):
+                        best_t = t
+                        best_i = i
+
+            t_next = t_max_x if t_max_x < t_max_y else t_max_y
+            # trafienie leży w już sprawdzonych komórkach - nic bliższego nie będzie
+            if best_t is not None and best_t <= t_next:
+                break
+            if t_next > t_exit:
+                break
+            if t_max_x < t_max_y:
+                cx += step_x
+                t_max_x += t_delta_x
+            else:
+                cy += step_y
+                t_max_y += t_delta_y
+
+        return best_i, best_t
+
+    def raycast(self, origin, direction, max_dist: float = math.inf):
+        """
+        Pierwsza ściana na drodze promienia origin + direction * t, t w [0, max_dist].
+        Zwraca (ściana, t) albo (None, None).
+        """
+        if not self.cells or (direction.x == 0 and direction.y == 0):
+            return None, None
+        i, t = self._cast(origin.x, origin.y, direction.x, direction.y, max_dist)
+        return (None, None) if i is None else (self.walls[i], t)
+
+    def feeler_hit(self, origin, feelers):
+        """
+        Najbliższe agentowi trafienie w ścianę spośród wszystkich feelerów (odcinków origin -> feeler).
+        Kolejny feeler jest śledzony tylko do odległości najlepszego dotąd trafienia.
+        Zwraca (ściana, indeks feelera, t na feelerze) albo (None, None, None).
+        """
+        if not self.cells:
+            return None, None, None
+        ox, oy = origin.x, origin.y
+        best_wall = best_feeler = best_t = None
+        best_dist = math.inf
+        for k, feeler in enumerate(feelers):
+            dx = feeler.x - ox
+            dy = feeler.y - oy
+            length = math.sqrt(dx * dx + dy * dy)
+            if length == 0:
+                continue
+            i, t = self._cast(ox, oy, dx, dy, min(1.0, best_dist / length))
+            if i is not None and t * length < best_dist:
+                best_dist = t * length
+                best_wall, best_feeler, best_t = self.walls[i], k, t
+        return best_wall, best_feeler, best_t
@@ -0,0 +1,78 @@
+"""
+Układy ścian: krawędzie mapy, siatka pokoi z przejściami i łamane wczytywane z pliku JSON:
+
+    {"polylines": [{"points": [[100, 100], [400, 100], [400, 300]], "closed": false}, ...],
+     "borders": true}
+"""
+import json
+import pygame
+from .wall import Wall
+
+
+def walls_from_polyline(points, closed=False) -> list[Wall]:
+    """Ściany wzdłuż łamanej (closed - z odcinkiem z ostatniego punktu do pierwszego)."""
+    points = [pygame.Vector2(p) for p in points]
+    pairs = list(zip(points, points[1:]))
+    if closed and len(points) > 2:
+        pairs.append((points[-1], points[0]))
+    # odcinki zerowej długości nie mają normalnej
+    return [Wall(a, b) for a, b in pairs if a != b]
+
+
+def border_walls(width, height) -> list[Wall]:
+    """Cztery ściany przy krawędziach mapy, normalne do wnętrza."""
+    return walls_from_polyline([(0, 0), (width, 0), (width, height), (0, height)], closed=True)
+
+
+def room_grid_walls(width, height, rows, cols, door_width=120.0, borders=True) -> list[Wall]:
+    """
+    Siatka rows x cols pokoi: ściany wewnętrzne z przejściem (door_width) na środku każdego boku pokoju.
+    Daje 4 * (rows * (cols - 1) + cols * (rows - 1)) odcinków (+ 4 krawędzie).
+    """
+    walls = border_walls(width, height) if borders else []
+    room_w = width / cols
+    room_h = height / rows
+    half_door = door_width / 2
+
+    # ściany pionowe między kolumnami pokoi
+    for col in range(1, cols):
+        x = col * room_w
+        for row in range(rows):
+            top, bottom = row * room_h, (row + 1) * room_h
+            middle = (top + bottom) / 2
+            walls += walls_from_polyline([(x, top), (x, max(middle - half_door, top))])
+            walls += walls_from_polyline([(x, min(middle + half_door, bottom)), (x, bottom)])
+    # ściany poziome między rzędami pokoi
+    for row in range(1, rows):
+        y = row * room_h
+        for col in range(cols):
+            left, right = col * room_w, (col + 1) * room_w
+            middle = (left + right) / 2
+            walls += walls_from_polyline([(left, y), (max(middle - half_door, left), y)])
+            walls += walls_from_polyline([(min(middle + half_door, right), y), (right, y)])
+    return walls
+
+
+def load_wall_layout(path, width, height) -> list[Wall]:
+    """Ściany z pliku JSON (łamane i opcjonalnie krawędzie mapy)."""
+    with open(path) as f:
+        data = json.load(f)
+    walls = border_walls(width, height) if data.get("borders", False) else []
+    for polyline in data.get("polylines", []):
+        walls += walls_from_polyline(polyline["points"], polyline.get("closed", False))
+    return walls
+
+
+def build_walls(spec, width, height, room_grid=(3, 3), door_width=120.0) -> list[Wall]:
+    """
+    Ściany według specyfikacji z config.MAP_WALLS:
+    None - bez ścian, "borders" - krawędzie mapy, "rooms" - siatka pokoi, inaczej ścieżka do pliku JSON.
+    """
+    if spec is None:
+        return []
+    if spec == "borders":
+        return border_walls(width, height)
+    if spec == "rooms":
+        rows, cols = room_grid
+        return room_grid_walls(width, height, rows, cols, door_width)
+    return load_wall_layout(spec, width, height)
@@ -1,12 +1,13 @@
 import pygame
-import math
-from utils.geometry import ray_circle_intersection
-from utils.collision import circle_collision, resolve_circle_overlap, collision_with_walls
+from utils.collision import circle_collision, resolve_circle_overlap, collision_with_walls, resolve_circle_wall
 from config import *
+from utils.profiler import profiled
+from utils.sprite_atlas import sprite_atlas
 
 class Player:
     def __init__(self, x, y, speed=130, radius=15):
         self.pos = pygame.Vector2(x, y)
+        self.prev_pos = self.pos.copy()  # pozycja z poprzedniego ticka - do interpolacji rysowania
         self.velocity = pygame.Vector2(0, 0)
         self.speed = speed
         self.radius = radius  # collider
@@ -14,7 +15,8 @@ class Player:
         self.side = pygame.Vector2(-1, 0)
         self.shoot_cooldown = 0.5  # w sekundach
         self.time_since_last_shot = 0
-        self.want_to_shoot = False
+        self.shot_ray = None  # (początek, koniec) ostatniego strzału - do rysowania
+        self.shot_tick = None  # tick, w którym padł ostatni strzał (ustawia World.step)
 
         self.hp = PLAYER_HP
         self.invulnerable = False
@@ -25,22 +27,26 @@ class Player:
         self.blink_interval = 0.1  # jak szybko miga
         self.visible = True
 
-    def handle_shoot_event(self, event):
-        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-            self.want_to_shoot = True
+    def reset(self, x, y):
+        """Stan jak po konstruktorze w punkcie (x, y) - restart gry bez nowego obiektu."""
+        self.pos.update(x, y)
+        self.prev_pos.update(x, y)
+        self.velocity.update(0, 0)
+        self.heading.update(1, 0)
+        self.side.update(-1, 0)
+        self.time_since_last_shot = 0
+        self.shot_ray = None
+        self.shot_tick = None
+
+        self.hp = PLAYER_HP
+        self.invulnerable = False
+        self.inv_timer = 0.0
 
-    def handle_input(self, dt):
-        keys = pygame.key.get_pressed()
-        move = pygame.Vector2(0, 0)
+        self.blink_timer = 0.0
+        self.visible = True
 
-        if keys[pygame.K_w] or keys[pygame.K_UP]:
-            move.y -= 1
-        if keys[pygame.K_s] or keys[pygame.K_DOWN]:
-            move.y += 1
-        if keys[pygame.K_a] or keys[pygame.K_LEFT]:
-            move.x -= 1
-        if keys[pygame.K_d] or keys[pygame.K_RIGHT]:
-            move.x += 1
+    def handle_input(self, dt, player_input):
+        move = pygame.Vector2(player_input.move)
 
         # normalizacja ruchu
         if move.length_squared() > 0:
@@ -49,34 +55,28 @@ class Player:
         self.velocity = move * self.speed
         self.pos += self.velocity * dt
 
-    def update_angle(self):
-        mouse_pos = pygame.Vector2(pygame.mouse.get_pos())
-        direction = mouse_pos - self.pos
+    def update_angle(self, aim_pos):
+        if aim_pos is None:
+            return
+        direction = pygame.Vector2(aim_pos) - self.pos
         if direction.length_squared() > 0:
             self.heading = direction.normalize()
             self.side = pygame.Vector2(-self.heading.y, self.heading.x)
 
-    def update(self, dt, game_map, screen):
-        self.handle_input(dt)
+    def update(self, dt, game_map, player_input):
+        self.handle_input(dt, player_input)
         self.collides_with_walls(game_map.width, game_map.height)
-        self.collides_with_obstacles(game_map.obstacles)
-        self.update_angle()
+        self.collides_with_obstacles(game_map.obstacle_index.query_radius(self.pos, self.radius))
+        if game_map.wall_index:
+            self.collides_with_wall_segments(game_map.wall_index.query_radius(self.pos, self.radius))
+        self.update_angle(player_input.aim)
         self.time_since_last_shot += dt
 
-        # sprawdzamy przytrzymanie LPM
-        mouse_pressed = pygame.mouse.get_pressed()[0]
-        if mouse_pressed:
-            self.want_to_shoot = True
-
-        # jeśli gracz kliknął i cooldown minął to strzel
-        if self.want_to_shoot and self.time_since_last_shot >= self.shoot_cooldown:
-            self.shoot(game_map.obstacles, screen, game_map.enemies)
+        # jeśli gracz chce strzelić i cooldown minął to strzel
+        if player_input.shoot and self.time_since_last_shot >= self.shoot_cooldown:
+            self.shoot(game_map, self.pos + self.heading)
             self.time_since_last_shot = 0
 
-        # reset kliknięcia
-        if not mouse_pressed:
-            self.want_to_shoot = False
-
         if self.invulnerable:
             self.inv_timer -= dt
             self.blink_timer += dt
@@ -94,50 +94,26 @@ class Player:
     def collides_with_walls(self, map_width, map_height):
         collision_with_walls(self.pos, self.radius, map_width, map_height)
 
+    def collides_with_wall_segments(self, walls):
+        for wall in walls:
+            resolve_circle_wall(self.pos, self.radius, wall)
+
     def collides_with_obstacles(self, obstacles):
         for obs in obstacles:
             if circle_collision(self.pos, self.radius, obs.pos, obs.radius):
                 resolve_circle_overlap(self.pos, self.radius, obs.pos, obs.radius)
 
-    def shoot(self, obstacles, screen, enemies=None):
-        mouse_pos = pygame.Vector2(pygame.mouse.get_pos())
-
+    @profiled("Player.shoot")
+    def shoot(self, game_map, target_pos):
         # direction (normalize)
-        direction = (mouse_pos - self.pos).normalize()
+        direction = (pygame.Vector2(target_pos) - self.pos).normalize()
 
-        closest_t = None
-        closest_hit = None  # przeszkoda, która zatrzyma promień
+        # pierwsze trafienie - przeszkoda zatrzymuje promień, wrogowie sprawdzani wsadowo
+        closest_hit, closest_t, enemy_index = game_map.cast_ray(self.pos, direction)
 
-        # kolizje z obstacles
-        for obs in obstacles:
-            t = ray_circle_intersection(
-                self.pos.x, self.pos.y,
-                direction.x, direction.y,
-                obs.pos.x, obs.pos.y, obs.radius
-            )
-            if t is not None:
-                if closest_t is None or t < closest_t:
-                    closest_t = t
-                    closest_hit = obs
-
-        # kolizje z enemy
-        if enemies is not None:
-            for enemy in enemies[:]:  # kopiujemy listę, żeby można usuwać
-                t_enemy = ray_circle_intersection(
-                    self.pos.x, self.pos.y,
-                    direction.x, direction.y,
-                    enemy.pos.x, enemy.pos.y, enemy.radius)
-                if t_enemy is not None:
-                    # jeśli enemy jest bliżej niż przeszkoda lub brak przeszkody
-                    if closest_t is None or t_enemy < closest_t:
-                        closest_t = t_enemy
-                        closest_hit = enemy
-
-        # jeśli trafiono w enemy - usuwamy
-        if isinstance(closest_hit, type(enemies[0])):
-            closest_hit.state = "dead"
-            closest_hit.is_group_leader = False
-            enemies.remove(closest_hit)
+        # jeśli trafiono w enemy - usuwamy (po indeksie, bez szukania na liście)
+        if enemy_index is not None:
+            game_map.remove_enemy(enemy_index)
 
         # koniec promienia do rysowania
         if closest_t is not None:
@@ -146,31 +122,27 @@ class Player:
             far = 5000
             end_pos = self.pos + direction * far
 
-        # draw ray
-        pygame.draw.line(screen, (255, 0, 0), self.pos, end_pos, 2)
+        # promień rysuje renderer
+        self.shot_ray = (self.pos.copy(), end_pos)
+        return closest_hit
+
+    def interpolated_pos(self, alpha):
+        """Pozycja między poprzednim a ostatnim tickiem (alpha 0..1) - tylko do rysowania."""
+        return self.prev_pos.lerp(self.pos, alpha)
 
-    def draw(self, screen):
+    def draw(self, screen, alpha=1.0, offset=None):
+        """offset - lewy górny róg widoku kamery w świecie (rysujemy w układzie ekranu)."""
         if not self.visible:
             return
 
-        # 3 wierzchołki trójkąta
-        tip = self.pos + self.heading * self.radius
-
-        left = self.pos + pygame.Vector2(
-            math.cos(math.atan2(self.heading.y, self.heading.x) + 2.5),
-            math.sin(math.atan2(self.heading.y, self.heading.x) + 2.5)
-        ) * self.radius
-
-        right = self.pos + pygame.Vector2(
-            math.cos(math.atan2(self.heading.y, self.heading.x) - 2.5),
-            math.sin(math.atan2(self.heading.y, self.heading.x) - 2.5)
-        ) * self.radius
+        pos = self.interpolated_pos(alpha)
+        if offset is not None:
+            pos -= offset
 
-        pygame.draw.polygon(
-            screen,
-            (40, 138, 250),
-            [tip, left, right]
-        )
+        # trójkąt obrócony do heading z atlasu - bez atan2 i wielokąta co klatkę
+        atlas = sprite_atlas("player", self.radius)
+        sprite = atlas.sprite((40, 138, 250), atlas.index(self.heading.x, self.heading.y))
+        screen.blit(sprite, (pos.x - atlas.half, pos.y - atlas.half))
 
         # pygame.draw.circle(screen, (255, 0, 0), (int(self.pos.x), int(self.pos.y)), self.radius, 1)
 
@@ -0,0 +1,82 @@
+import random
+import pygame
+
+
+class PlayerInput:
+    """Stan wejścia gracza na jedną klatkę/tick - niezależny od źródła (klawiatura, skrypt, replay)."""
+    def __init__(self, move=None, aim=None, shoot=False):
+        self.move = move if move is not None else pygame.Vector2(0, 0)  # kierunek ruchu (nieznormalizowany)
+        self.aim = aim  # punkt w świecie, w który celuje gracz (None - bez zmiany)
+        self.shoot = shoot
+
+
+class KeyboardMouseInput:
+    """
+    Wejście z klawiatury i myszy - to, co wcześniej Player czytał bezpośrednio z pygame.
+    camera (ui.camera.Camera) - mysz jest w układzie ekranu, a aim w układzie świata.
+    """
+    def __init__(self, camera=None):
+        self.clicked = False
+        self.camera = camera
+
+    def handle_event(self, event):
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            self.clicked = True
+
+    def poll(self, player, game_map):
+        keys = pygame.key.get_pressed()
+        move = pygame.Vector2(0, 0)
+
+        if keys[pygame.K_w] or keys[pygame.K_UP]:
+            move.y -= 1
+        if keys[pygame.K_s] or keys[pygame.K_DOWN]:
+            move.y += 1
+        if keys[pygame.K_a] or keys[pygame.K_LEFT]:
+            move.x -= 1
+        if keys[pygame.K_d] or keys[pygame.K_RIGHT]:
+            move.x += 1
+
+        # kliknięcie lub przytrzymanie LPM
+        shoot = self.clicked or pygame.mouse.get_pressed()[0]
+        self.clicked = False
+
+        mouse = pygame.mouse.get_pos()
+        aim = self.camera.screen_to_world(mouse) if self.camera is not None else pygame.Vector2(mouse)
+        return PlayerInput(move, aim, shoot)
+
+
+class IdleInput:
+    """Gracz stoi w miejscu i nie strzela."""
+    def handle_event(self, event):
+        pass
+
+    def poll(self, player, game_map):
+        return PlayerInput()
+
+
+class RandomInput:
+    """
+    Prosty bot do testów bez okna: co jakiś czas zmienia kierunek ruchu
+    i strzela w najbliższego wroga.
+    """
+    def __init__(self, seed=None, change_interval=60, shoot_chance=0.05):
+        self.rng = random.Random(seed)
+        self.change_interval = change_interval
+        self.shoot_chance = shoot_chance
+        self.move = pygame.Vector2(0, 0)
+        self.ticks = 0
+
+    def handle_event(self, event):
+        pass
+
+    def poll(self, player, game_map):
+        if self.ticks % self.change_interval == 0:
+            self.move = pygame.Vector2(self.rng.uniform(-1, 1), self.rng.uniform(-1, 1))
+        self.ticks += 1
+
+        aim = None
+        target = game_map.closest_enemy(player.pos)
+        if target is not None:
+            aim = target.pos.copy()
+
+        return PlayerInput(self.move.copy(), aim, self.rng.random() < self.shoot_chance)
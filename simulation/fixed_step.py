@@ -0,0 +1,42 @@
+from config import TICK_RATE, MAX_TICKS_PER_FRAME
+
+
+class FixedStepScheduler:
+    """
+    Akumulator czasu klatki: symulacja idzie zawsze krokiem dt = 1 / tick_rate,
+    a rysowanie tak często, jak pozwala ekran. Resztę czasu (alpha) renderer
+    wykorzystuje do interpolacji pozycji między ostatnimi dwoma tickami.
+    """
+
+    def __init__(self, tick_rate=TICK_RATE, max_ticks_per_frame=MAX_TICKS_PER_FRAME):
+        self.tick_rate = tick_rate
+        self.dt = 1.0 / tick_rate
+        # limit nadrabiania - wolna klatka nie może wywołać spirali śmierci
+        self.max_ticks_per_frame = max_ticks_per_frame
+        self.accumulator = 0.0
+        # czas symulacji porzucony przez limit (symulacja zwalnia zamiast się zacinać)
+        self.dropped_time = 0.0
+
+    def reset(self):
+        self.accumulator = 0.0
+        self.dropped_time = 0.0
+
+    def advance(self, frame_time):
+        """Dodaje czas klatki i zwraca liczbę ticków do wykonania w tej klatce."""
+        self.accumulator += frame_time
+        ticks = int(self.accumulator // self.dt)
+        if ticks > self.max_ticks_per_frame:
+            ticks = self.max_ticks_per_frame
+        self.accumulator -= ticks * self.dt
+
+        if self.accumulator >= self.dt:
+            # nie nadrobimy - zostawiamy tylko ułamek ticka na interpolację
+            leftover = self.accumulator % self.dt
+            self.dropped_time += self.accumulator - leftover
+            self.accumulator = leftover
+        return ticks
+
+    @property
+    def alpha(self):
+        """Jak daleko (0..1) jesteśmy między ostatnim a następnym tickiem."""
+        return min(max(self.accumulator / self.dt, 0.0), 1.0)
@@ -0,0 +1,82 @@
+import argparse
+import time
+from config import *
+from player.player_input import IdleInput, RandomInput
+from .world import World
+from .replay import Replay, ReplayRecorder
+from map.map_layout import MapLayout
+
+
+def run(ticks, dt=1.0 / TICK_RATE, seed=None, input_source=None, observers=(), world=None):
+    """
+    Symuluje `ticks` kroków o stałym dt bez okna i bez ogranicznika klatek.
+    Zwraca World po symulacji.
+    """
+    if world is None:
+        world = World(seed=seed)
+    if input_source is None:
+        input_source = IdleInput()
+    for observer in observers:
+        world.add_observer(observer)
+
+    for _ in range(ticks):
+        world.step(dt, input_source.poll(world.player, world.game_map))
+        if world.player_dead:
+            break
+    return world
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Symulacja bez okna ze stałym krokiem czasu.")
+    parser.add_argument("--ticks", type=int, default=TICK_RATE * 60)
+    parser.add_argument("--dt", type=float, default=1.0 / TICK_RATE)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--input", choices=("idle", "random"), default="random")
+    parser.add_argument("--record", metavar="PATH", default=None, help="zapisz replay do pliku")
+    parser.add_argument("--verify", action="store_true",
+                        help="po nagraniu sprawdź, czy restore() odtwarza zapisane ticki bit w bit")
+    parser.add_argument("--generator", choices=("rejection", "poisson"), default=MAP_GENERATOR)
+    parser.add_argument("--walls", default=MAP_WALLS,
+                        help='układ ścian: "borders", "rooms" albo plik .json z łamanymi')
+    parser.add_argument("--layout", metavar="PATH", default=None, help="wczytaj układ mapy (MapLayout)")
+    parser.add_argument("--save-layout", metavar="PATH", default=None, help="zapisz układ wygenerowanej mapy")
+    args = parser.parse_args()
+
+    input_source = RandomInput(args.seed) if args.input == "random" else IdleInput()
+    layout = MapLayout.load(args.layout) if args.layout else None
+    world = World(seed=args.seed, layout=layout, generator=args.generator, walls=args.walls)
+    if args.save_layout:
+        world.layout().save(args.save_layout)
+    recorder = None
+    if args.record:
+        recorder = ReplayRecorder(args.record, world, dt=args.dt)
+        world.add_observer(recorder)
+
+    start = time.perf_counter()
+    world = run(args.ticks, args.dt, input_source=input_source, world=world)
+    elapsed = time.perf_counter() - start
+    if recorder is not None:
+        recorder.close()
+
+    print(f"seed={world.seed} ticks={world.tick} sim_time={world.time:.1f}s "
+          f"wall_time={elapsed:.2f}s ({world.tick / max(elapsed, 1e-9):.0f} ticks/s)")
+    world.game_map.sync_enemy_objects()
+    print(f"enemies={len(world.game_map.enemies)} "
+          f"attacking={sum(e.state == 'attack' for e in world.game_map.enemies)} "
+          f"player_hp={world.player.hp} player_dead={world.player_dead}")
+
+    if recorder is not None and args.verify:
+        replay = Replay(args.record)
+        # po jednym ticku ze środka każdego odcinka między keyframe'ami i ostatni tick
+        ticks = sorted({min(t + replay.keyframe_interval // 2, replay.last_tick) for t in replay.keyframes}
+                       | {replay.last_tick})
+        failed = {t: fields for t in ticks if (fields := replay.verify(t))}
+        for t, fields in failed.items():
+            print(f"verify: tick {t} różni się od zapisu ({', '.join(fields)})")
+        print(f"verify: {len(ticks) - len(failed)}/{len(ticks)} ticków zgodnych")
+        if failed:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
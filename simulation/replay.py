@@ -0,0 +1,312 @@
+import json
+import math
+import pickle
+import random
+import struct
+import warnings
+from itertools import chain
+import pygame
+from config import REPLAY_KEYFRAME_INTERVAL
+from player.player_input import PlayerInput
+
+try:
+    import numpy as np
+except ImportError:  # replay jest opcjonalny - bez numpy gra działa bez nagrywania
+    np = None
+
+MAGIC = b"WDFTREPL"
+VERSION = 2
+_HEADER_PREFIX = struct.Struct("<8sII")  # magic, wersja, długość nagłówka JSON
+_KEYFRAME_PREFIX = struct.Struct("<QQ")  # tick, długość danych
+
+# kody stanu wroga w rekordzie (+ flagi)
+STATE_CODES = {"explore": 0, "attack": 1, "dead": 2}
+STATE_NAMES = {code: name for name, code in STATE_CODES.items()}
+STATE_EXPLORE = STATE_CODES["explore"]
+STATE_ATTACK = STATE_CODES["attack"]
+STATE_DEAD = STATE_CODES["dead"]
+FLAG_LEADER = 0x10
+FLAG_PEEKING = 0x20
+
+
+def record_dtype(capacity):
+    """Rekord jednego ticka o stałym rozmiarze - plik to ciąg takich rekordów (memmap)."""
+    id_type = "<u2" if capacity < 0xFFFF else "<u4"
+    return np.dtype([
+        ("tick", "<u4"),
+        ("time", "<f8"),
+        # wejście w pełnej precyzji - restore() symuluje dokładnie z tych wartości
+        ("move", "<f8", (2,)),
+        ("aim", "<f8", (2,)),  # NaN - gracz nie zmienił celu
+        ("shoot", "u1"),
+        ("player_pos", "<f4", (2,)),
+        ("player_hp", "<i2"),
+        ("player_dead", "u1"),
+        ("enemy_count", "<u4"),
+        ("enemy_uid", id_type, (capacity,)),
+        ("enemy_pos", "<f4", (capacity, 2)),
+        ("enemy_heading", "u1", (capacity,)),  # kąt skwantowany do 256 kroków
+        ("enemy_state", "u1", (capacity,)),
+    ])
+
+
+def quantize_heading(hx, hy):
+    angle = np.arctan2(hy, hx)
+    return (np.rint(angle * (256 / (2 * math.pi))).astype(np.int64) % 256).astype(np.uint8)
+
+
+def dequantize_heading(codes):
+    return codes.astype(np.float64) * (2 * math.pi / 256)
+
+
+class ReplayRecorder:
+    """
+    Obserwator World zapisujący replay:
+    - plik `path` - nagłówek JSON i rekord o stałym rozmiarze na każdy tick
+      (wejście, gracz, pozycje/kierunki/stany wrogów), do odczytu przez np.memmap,
+    - plik `path + ".keys"` - co `keyframe_interval` ticków pełny stan świata (pickle)
+      razem ze stanem `random`, żeby wznowić symulację z dowolnego miejsca.
+    """
+
+    def __init__(self, path, world, keyframe_interval=REPLAY_KEYFRAME_INTERVAL, capacity=None, dt=None):
+        if np is None:
+            raise ImportError("ReplayRecorder wymaga pakietu numpy")
+        if getattr(world.game_map.swarm_engine, "workers", 0):
+            raise ValueError("keyframe'y replaya nie obsługują ParallelSwarmEngine (SWARM_WORKERS > 0)")
+        self.path = path
+        self.keyframe_interval = keyframe_interval
+        self.capacity = max(capacity or 0, len(world.game_map.enemies), 1)
+        self.dtype = record_dtype(self.capacity)
+        self._record = np.zeros(1, dtype=self.dtype)
+        self._truncated = False
+
+        header = {
+            "version": VERSION,
+            "seed": world.seed,
+            "width": world.width,
+            "height": world.height,
+            "dt": dt,
+            "capacity": self.capacity,
+            "keyframe_interval": keyframe_interval,
+            "start_tick": world.tick,
+        }
+        header_bytes = json.dumps(header).encode("utf-8")
+        # rekordy zaczynają się od wyrównanego offsetu
+        header_len = -(-(_HEADER_PREFIX.size + len(header_bytes)) // 64) * 64 - _HEADER_PREFIX.size
+
+        self.file = open(path, "wb")
+        self.file.write(_HEADER_PREFIX.pack(MAGIC, VERSION, header_len))
+        self.file.write(header_bytes.ljust(header_len, b" "))
+        self.keys_file = open(path + ".keys", "wb")
+
+        # tick startowy: stan przed pierwszym krokiem
+        self.write_keyframe(world)
+        self.write_record(world)
+
+    def __call__(self, world):
+        self.write_record(world)
+        if world.tick % self.keyframe_interval == 0:
+            self.write_keyframe(world)
+
+    def write_record(self, world):
+        rec = self._record[0]
+        rec["tick"] = world.tick
+        rec["time"] = world.time
+
+        player_input = world.last_input if world.tick > 0 else None
+        if player_input is not None:
+            rec["move"] = (player_input.move.x, player_input.move.y)
+            aim = player_input.aim
+            rec["aim"] = (aim.x, aim.y) if aim is not None else (math.nan, math.nan)
+            rec["shoot"] = bool(player_input.shoot)
+        else:
+            rec["move"] = (0.0, 0.0)
+            rec["aim"] = (math.nan, math.nan)
+            rec["shoot"] = 0
+
+        player = world.player
+        rec["player_pos"] = (player.pos.x, player.pos.y)
+        rec["player_hp"] = player.hp
+        rec["player_dead"] = world.player_dead
+
+        enemies = world.game_map.enemies
+        n = len(enemies)
+        if n > self.capacity:
+            if not self._truncated:
+                warnings.warn(f"replay: {n} wrogów > pojemność {self.capacity}, nadmiar nie jest zapisywany")
+                self._truncated = True
+            enemies = enemies[:self.capacity]
+            n = self.capacity
+        rec["enemy_count"] = n
+        engine = world.game_map.synced_engine()
+        if n and engine is not None:
+            # stan prosto z kolumn silnika roju - obiekty Enemy są aktualizowane tylko na żądanie
+            rec["enemy_pos"][:n] = engine.pos[:n]
+            heading = engine.smoothed_heading[:n]
+            rec["enemy_heading"][:n] = quantize_heading(heading[:, 0], heading[:, 1])
+            rec["enemy_state"][:n] = (np.where(engine.attacking[:n], STATE_ATTACK, STATE_EXPLORE)
+                                      | np.where(engine.is_leader[:n], FLAG_LEADER, 0)
+                                      | np.where(engine.peeking[:n], FLAG_PEEKING, 0))
+            rec["enemy_uid"][:n] = engine.uid[:n]
+        elif n:
+            # jeden przebieg po obiektach prosto do bufora numpy (bez listy krotek)
+            data = np.fromiter(chain.from_iterable(
+                (e.pos.x, e.pos.y, e.smoothed_heading.x, e.smoothed_heading.y,
+                 (STATE_EXPLORE if e.state == "explore" else STATE_ATTACK if e.state == "attack" else STATE_DEAD)
+                 | (FLAG_LEADER if e.is_group_leader else 0)
+                 | (FLAG_PEEKING if e.is_peeking else 0),
+                 e.uid if e.uid is not None else i)
+                for i, e in enumerate(enemies)), dtype=np.float64, count=6 * n).reshape(n, 6)
+            rec["enemy_pos"][:n] = data[:, 0:2]
+            rec["enemy_heading"][:n] = quantize_heading(data[:, 2], data[:, 3])
+            rec["enemy_state"][:n] = data[:, 4]
+            rec["enemy_uid"][:n] = data[:, 5]
+
+        self.file.write(self._record.tobytes())
+
+    def write_keyframe(self, world):
+        blob = pickle.dumps((world, random.getstate()), protocol=pickle.HIGHEST_PROTOCOL)
+        self.keys_file.write(_KEYFRAME_PREFIX.pack(world.tick, len(blob)))
+        self.keys_file.write(blob)
+
+    def flush(self):
+        self.file.flush()
+        self.keys_file.flush()
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+            self.keys_file.close()
+
+
+class Replay:
+    """
+    Odczyt replaya. Rekordy są mapowane z pliku (np.memmap), więc skok do dowolnego
+    ticka to zwykłe indeksowanie - bez symulowania od początku.
+    restore(tick) odtwarza pełny World: najbliższy keyframe + krótka symulacja z zapisanym wejściem.
+    """
+
+    def __init__(self, path):
+        if np is None:
+            raise ImportError("Replay wymaga pakietu numpy")
+        self.path = path
+        with open(path, "rb") as f:
+            magic, version, header_len = _HEADER_PREFIX.unpack(f.read(_HEADER_PREFIX.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path}: to nie jest plik replaya")
+            if version != VERSION:
+                raise ValueError(f"{path}: nieobsługiwana wersja replaya {version}")
+            self.header = json.loads(f.read(header_len).decode("utf-8"))
+
+        self.capacity = self.header["capacity"]
+        self.dt = self.header["dt"]
+        self.seed = self.header["seed"]
+        self.start_tick = self.header["start_tick"]
+        self.keyframe_interval = self.header["keyframe_interval"]
+        self.dtype = record_dtype(self.capacity)
+        self.records = np.memmap(path, dtype=self.dtype, mode="r", offset=_HEADER_PREFIX.size + header_len)
+        self.keyframes = self._index_keyframes(path + ".keys")
+
+    @staticmethod
+    def _index_keyframes(keys_path):
+        """tick -> (offset, długość) danych keyframe'u w pliku .keys"""
+        index = {}
+        with open(keys_path, "rb") as f:
+            while True:
+                prefix = f.read(_KEYFRAME_PREFIX.size)
+                if len(prefix) < _KEYFRAME_PREFIX.size:
+                    break
+                tick, length = _KEYFRAME_PREFIX.unpack(prefix)
+                offset = f.tell()
+                f.seek(length, 1)
+                if f.tell() - offset < length:
+                    break  # niedokończony zapis
+                index[tick] = (offset, length)
+        return index
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def first_tick(self):
+        return self.start_tick
+
+    @property
+    def last_tick(self):
+        return self.start_tick + len(self.records) - 1
+
+    def frame(self, tick):
+        """Rekord dla ticka (widok na memmap)."""
+        return self.records[tick - self.start_tick]
+
+    def enemy_positions(self, tick):
+        rec = self.frame(tick)
+        return rec["enemy_pos"][:rec["enemy_count"]]
+
+    def enemy_headings(self, tick):
+        rec = self.frame(tick)
+        return dequantize_heading(rec["enemy_heading"][:rec["enemy_count"]])
+
+    def player_input(self, tick):
+        """Wejście gracza użyte w kroku, który zakończył się tickiem `tick`."""
+        rec = self.frame(tick)
+        aim = None
+        if not np.isnan(rec["aim"][0]):
+            aim = pygame.Vector2(float(rec["aim"][0]), float(rec["aim"][1]))
+        return PlayerInput(pygame.Vector2(float(rec["move"][0]), float(rec["move"][1])), aim, bool(rec["shoot"]))
+
+    def nearest_keyframe(self, tick):
+        candidates = [t for t in self.keyframes if t <= tick]
+        if not candidates:
+            raise ValueError(f"brak keyframe'u przed tickiem {tick}")
+        return max(candidates)
+
+    def load_keyframe(self, tick):
+        offset, length = self.keyframes[tick]
+        with open(self.path + ".keys", "rb") as f:
+            f.seek(offset)
+            world, random_state = pickle.loads(f.read(length))
+        random.setstate(random_state)
+        return world
+
+    def restore(self, tick, dt=None):
+        """
+        Zwraca World w stanie po ticku `tick`: wczytuje najbliższy wcześniejszy keyframe
+        i dosymulowuje brakujące ticki z zapisanym wejściem (najwyżej keyframe_interval kroków).
+        Ustawia też globalny stan `random`, więc symulację można dalej kontynuować.
+        """
+        dt = dt or self.dt
+        if dt is None:
+            raise ValueError("replay nie zawiera dt - podaj dt")
+        world = self.load_keyframe(self.nearest_keyframe(tick))
+        while world.tick < tick:
+            world.step(dt, self.player_input(world.tick + 1))
+        return world
+
+    def verify(self, tick, dt=None):
+        """
+        Porównuje restore(tick) z rekordem ticka bit w bit (pozycje w precyzji zapisu).
+        Zwraca listę pól, które się różnią - pusta lista oznacza zgodność.
+        """
+        world = self.restore(tick, dt)
+        rec = self.frame(tick)
+        mismatches = []
+        player = world.player
+        if not np.array_equal(np.array((player.pos.x, player.pos.y), dtype="<f4"), rec["player_pos"]):
+            mismatches.append("player_pos")
+        if player.hp != rec["player_hp"]:
+            mismatches.append("player_hp")
+        world.game_map.sync_enemy_objects()
+        enemies = world.game_map.enemies[:self.capacity]
+        n = int(rec["enemy_count"])
+        if len(enemies) != n:
+            return mismatches + ["enemy_count"]
+        uids = np.fromiter((e.uid if e.uid is not None else i for i, e in enumerate(enemies)),
+                           dtype=np.int64, count=n)
+        if not np.array_equal(uids, rec["enemy_uid"][:n]):
+            mismatches.append("enemy_uid")
+        pos = np.fromiter(chain.from_iterable((e.pos.x, e.pos.y) for e in enemies),
+                          dtype=np.float64, count=2 * n).reshape(n, 2).astype("<f4")
+        if not np.array_equal(pos, rec["enemy_pos"][:n]):
+            mismatches.append("enemy_pos")
+        return mismatches
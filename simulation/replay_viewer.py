@@ -0,0 +1,192 @@
+"""
+Przeglądarka replaya: rysuje zapisane rekordy bez symulowania.
+
+    python -m simulation.replay_viewer replay.wdft
+
+spacja - pauza, strzałki lewo/prawo - tick wstecz/naprzód (z Shift: o sekundę),
+góra/dół - szybkość odtwarzania, Home/End - początek/koniec,
+klik/przeciąganie po pasku na dole - skok do ticka.
+"""
+import argparse
+import os
+import pygame
+from config import *
+from ui.camera import Camera
+from utils.sprite_atlas import sprite_atlas
+from .replay import Replay, STATE_CODES, FLAG_LEADER, FLAG_PEEKING, dequantize_heading
+
+SPEEDS = (0.25, 0.5, 1, 2, 4, 8, 16)
+TIMELINE_HEIGHT = 24
+
+ENEMY_COLOR = (196, 39, 113)
+LEADER_COLOR = (237, 63, 19)
+ATTACK_COLOR = (245, 124, 17)
+PEEKING_COLOR = (242, 167, 202)
+
+
+class ReplayViewer:
+    def __init__(self, replay, screen):
+        self.replay = replay
+        self.screen = screen
+        self.font = pygame.font.SysFont("Arial", 16)
+        self.tick = replay.first_tick
+        self.position = float(self.tick)  # ułamkowy tick przy odtwarzaniu wolniej/szybciej niż 1x
+        self.paused = False
+        self.speed_index = SPEEDS.index(1)
+        self.dragging = False
+
+        # przeszkody i ściany są stałe - bierzemy je z pierwszego keyframe'u
+        world = replay.load_keyframe(replay.nearest_keyframe(replay.first_tick))
+        self.obstacles = [(obs.pos.copy(), obs.radius) for obs in world.game_map.obstacles]
+        self.walls = [(wall.from_pos(), wall.to_pos()) for wall in world.game_map.walls]
+        self.player_radius = world.player.radius
+        self.enemy_radius = world.game_map.enemies[0].radius if world.game_map.enemies else 15
+        # mapa większa od okna - widok jedzie za graczem
+        width, height = screen.get_size()
+        self.camera = Camera(width, height - TIMELINE_HEIGHT, world.width, world.height)
+
+    @property
+    def speed(self):
+        return SPEEDS[self.speed_index]
+
+    def seek(self, tick):
+        self.tick = min(max(int(tick), self.replay.first_tick), self.replay.last_tick)
+        self.position = float(self.tick)
+
+    def timeline_rect(self):
+        width, height = self.screen.get_size()
+        return pygame.Rect(0, height - TIMELINE_HEIGHT, width, TIMELINE_HEIGHT)
+
+    def tick_at(self, x):
+        rect = self.timeline_rect()
+        span = self.replay.last_tick - self.replay.first_tick
+        return self.replay.first_tick + round(span * min(max(x / max(rect.width - 1, 1), 0.0), 1.0))
+
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN:
+            step = TICK_RATE if event.mod & pygame.KMOD_SHIFT else 1
+            if event.key == pygame.K_SPACE:
+                self.paused = not self.paused
+            elif event.key == pygame.K_RIGHT:
+                self.seek(self.tick + step)
+            elif event.key == pygame.K_LEFT:
+                self.seek(self.tick - step)
+            elif event.key == pygame.K_UP:
+                self.speed_index = min(self.speed_index + 1, len(SPEEDS) - 1)
+            elif event.key == pygame.K_DOWN:
+                self.speed_index = max(self.speed_index - 1, 0)
+            elif event.key == pygame.K_HOME:
+                self.seek(self.replay.first_tick)
+            elif event.key == pygame.K_END:
+                self.seek(self.replay.last_tick)
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            if self.timeline_rect().collidepoint(event.pos):
+                self.dragging = True
+                self.seek(self.tick_at(event.pos[0]))
+        elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+            self.dragging = False
+        elif event.type == pygame.MOUSEMOTION and self.dragging:
+            self.seek(self.tick_at(event.pos[0]))
+
+    def advance(self, frame_time):
+        if self.paused or self.dragging:
+            return
+        self.position += frame_time * TICK_RATE * self.speed
+        if self.position >= self.replay.last_tick:
+            self.position = float(self.replay.last_tick)
+            self.paused = True
+        self.tick = int(self.position)
+
+    def draw(self):
+        screen = self.screen
+        screen.fill((30, 30, 30))
+        record = self.replay.frame(self.tick)
+        camera = self.camera
+        camera.follow(pygame.Vector2(record["player_pos"].tolist()))
+        offset = camera.offset
+
+        for pos, radius in self.obstacles:
+            pygame.draw.circle(screen, (120, 120, 120), pos - offset, radius)
+        for start, end in self.walls:
+            pygame.draw.line(screen, (200, 200, 200), start - offset, end - offset, 3)
+
+        if not record["player_dead"]:
+            pygame.draw.circle(screen, (255, 255, 255), camera.world_to_screen(record["player_pos"].tolist()),
+                               self.player_radius, 2)
+
+        n = int(record["enemy_count"])
+        positions = record["enemy_pos"][:n].tolist()
+        angles = dequantize_heading(record["enemy_heading"][:n]).tolist()
+        states = record["enemy_state"][:n].tolist()
+        atlas = sprite_atlas("enemy", self.enemy_radius)
+        half = atlas.half
+        min_x, min_y, max_x, max_y = camera.view_rect(self.enemy_radius)
+        blits = []
+        for (x, y), angle, state in zip(positions, angles, states):
+            if not (min_x <= x <= max_x and min_y <= y <= max_y):
+                continue
+            if state & 0x0F == STATE_CODES["attack"]:
+                color = LEADER_COLOR if state & FLAG_LEADER else ATTACK_COLOR
+            elif state & FLAG_PEEKING:
+                color = PEEKING_COLOR
+            else:
+                color = ENEMY_COLOR
+            blits.append((atlas.sprite(color, atlas.index_for_angle(angle)),
+                          (x - offset.x - half, y - offset.y - half)))
+        screen.blits(blits, doreturn=False)
+
+        self.draw_timeline(record)
+
+    def draw_timeline(self, record):
+        rect = self.timeline_rect()
+        pygame.draw.rect(self.screen, (20, 20, 20), rect)
+        span = max(self.replay.last_tick - self.replay.first_tick, 1)
+        for key_tick in self.replay.keyframes:
+            x = rect.x + (key_tick - self.replay.first_tick) * (rect.width - 1) / span
+            pygame.draw.line(self.screen, (70, 70, 70), (x, rect.top), (x, rect.bottom))
+        x = rect.x + (self.tick - self.replay.first_tick) * (rect.width - 1) / span
+        pygame.draw.rect(self.screen, (50, 125, 217), (rect.x, rect.y + 8, x - rect.x, rect.height - 16))
+
+        status = "||" if self.paused else f"x{self.speed:g}"
+        text = (f"tick {self.tick}/{self.replay.last_tick}  t={record['time']:.2f}s  {status}  "
+                f"hp={record['player_hp']}  enemies={record['enemy_count']}  seed={self.replay.seed}")
+        label = self.font.render(text, True, (218, 222, 227))
+        self.screen.blit(label, (8, rect.top - label.get_height() - 4))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Odtwarzanie replaya zapisanego przez ReplayRecorder.")
+    parser.add_argument("path", nargs="?", default=REPLAY_PATH)
+    parser.add_argument("--tick", type=int, default=None, help="tick startowy")
+    args = parser.parse_args()
+
+    replay = Replay(args.path)
+    pygame.init()
+    # okno nie większe niż w grze - większą mapę pokazuje kamera
+    width = min(replay.header.get("width") or WINDOW_WIDTH, WINDOW_WIDTH)
+    height = min(replay.header.get("height") or WINDOW_HEIGHT, WINDOW_HEIGHT)
+    screen = pygame.display.set_mode((width, height + TIMELINE_HEIGHT))
+    pygame.display.set_caption(f"Replay - {os.path.basename(args.path)}")
+    clock = pygame.time.Clock()
+
+    viewer = ReplayViewer(replay, screen)
+    if args.tick is not None:
+        viewer.seek(args.tick)
+        viewer.paused = True
+
+    running = True
+    while running:
+        frame_time = clock.tick(FPS) / 1000
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            viewer.handle_event(event)
+        viewer.advance(frame_time)
+        viewer.draw()
+        pygame.display.flip()
+
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
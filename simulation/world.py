@@ -0,0 +1,139 @@
+import random
+from config import *
+from map.game_map import GameMap
+from map.map_layout import MapLayout
+from map.wall_layout import build_walls
+from player.player import Player
+from utils.profiler import profiler
+
+
+class World:
+    """
+    Stan gry bez okna: mapa, gracz i wrogowie zbudowani z config.py.
+    step() przesuwa symulację o jeden krok dt - nie zależy od pygame.display,
+    zegara ani myszy, więc działa tak samo w oknie, w CI i na serwerze.
+    """
+    def __init__(self, width=WORLD_WIDTH, height=WORLD_HEIGHT, seed=None,
+                 enemy_count=ENEMY_COUNT, obstacle_count=OBSTACLE_COUNT, layout=None, generator=MAP_GENERATOR,
+                 walls=MAP_WALLS):
+        self.width = width
+        self.height = height
+        self.enemy_count = enemy_count
+        self.obstacle_count = obstacle_count
+        self.generator = generator  # "rejection" | "poisson" (GameMap.generate_obstacles)
+        self.wall_spec = walls  # układ ścian dla build_walls (None - bez ścian)
+        # obserwatorzy wywoływani po każdym kroku: observer(world)
+        self.observers = []
+
+        self.player = Player(*PLAYER_SPAWN)
+        self.game_map = GameMap(width, height)
+        self.reset(seed, layout)
+
+        if SWARM_ENGINE:
+            self.game_map.enable_swarm_engine(self.seed, SWARM_WORKERS)
+
+    def reset(self, seed=None, layout=None):
+        """
+        Nowa gra na istniejących obiektach: gracz, mapa i wrogowie z puli są resetowane
+        w miejscu, silnik roju (i jego procesy) zostaje.
+        layout (MapLayout) - wczytuje gotowy układ zamiast losować przeszkody i wrogów;
+        bez seed symulacja startuje z seedem układu.
+        """
+        if seed is None:
+            seed = layout.seed if layout is not None else random.randrange(2 ** 32)
+        self.seed = seed
+        random.seed(self.seed)
+
+        self.tick = 0
+        self.time = 0.0
+        self.player_dead = False
+        # wejście użyte w ostatnim kroku (np. dla nagrywania replaya)
+        self.last_input = None
+
+        if layout is not None:
+            self.width = layout.width
+            self.height = layout.height
+            self.player_spawn = layout.player_spawn
+            self.player.reset(*self.player_spawn)
+            self.game_map.apply_layout(layout)
+        else:
+            self.player_spawn = PLAYER_SPAWN
+            self.player.reset(*self.player_spawn)
+            self.generate_map()
+        # losowanie mapy zużywa random, wczytanie układu nie - wrogowie (ich losowy stan)
+        # są rozstawiani od nowa z tego samego stanu, więc seed i jego układ dają tę samą grę
+        random.seed(self.seed)
+        self.game_map.spawn_enemies(self.game_map.enemy_spawns, self.game_map.enemy_radius)
+        self.game_map.reset_state()
+
+    def generate_map(self):
+        """Ustawia ściany i losuje przeszkody oraz wrogów (zależnie od bieżącego stanu random)."""
+        game_map = self.game_map
+        game_map.width = self.width
+        game_map.height = self.height
+        game_map.clear()
+        # ściany najpierw - przeszkody i wrogowie są losowani poza nimi
+        game_map.set_walls(build_walls(self.wall_spec, self.width, self.height, ROOM_GRID, ROOM_DOOR_WIDTH))
+        game_map.generate_obstacles(
+            count=self.obstacle_count,
+            min_radius=OBSTACLE_MIN_R,
+            max_radius=OBSTACLE_MAX_R,
+            max_attempts=max(2000, self.obstacle_count * 200),
+            safe_zone_center=self.player.pos,
+            safe_zone_size=200,
+            method=self.generator
+        )
+
+        game_map.generate_enemies(
+            count=self.enemy_count,
+            enemy_radius=self.player.radius,
+            safe_zone_center=self.player.pos,
+            safe_zone_size=500,
+            max_attempts=max(2000, self.enemy_count * 20),
+            method=self.generator
+        )
+
+    def layout(self):
+        """Układ bieżącej mapy do zapisania (MapLayout.save)."""
+        return MapLayout.from_map(self.game_map, self.seed, self.player_spawn)
+
+    def store_previous_positions(self):
+        """Zapamiętuje pozycje sprzed ticka - renderer interpoluje między nimi a bieżącymi."""
+        self.player.prev_pos.update(self.player.pos)
+        self.game_map.store_previous_positions()
+
+    def __getstate__(self):
+        # obserwatorzy (np. nagrywarka z otwartym plikiem) nie są częścią stanu świata;
+        # stan wrogów z silnika roju trafia do obiektów, żeby kopia była kompletna
+        self.game_map.sync_enemy_objects()
+        state = self.__dict__.copy()
+        state["observers"] = []
+        return state
+
+    def add_observer(self, observer):
+        self.observers.append(observer)
+
+    def step(self, dt, player_input):
+        """Jeden krok symulacji o stałym dt."""
+        self.last_input = player_input
+        self.store_previous_positions()
+
+        if not self.player_dead:
+            shot_ray = self.player.shot_ray
+            with profiler.section("player"):
+                self.player.update(dt, self.game_map, player_input)
+            if self.player.shot_ray is not shot_ray:
+                # znacznik strzału - renderer rysuje go, nawet jeśli klatka objęła kilka ticków
+                self.player.shot_tick = self.tick + 1
+            if self.player.hp <= 0:
+                self.player_dead = True
+
+        if not self.player_dead:
+            with profiler.section("enemies"):
+                self.game_map.update_enemies(dt, self.player)
+
+        self.tick += 1
+        self.time += dt
+
+        for observer in self.observers:
+            observer(self)
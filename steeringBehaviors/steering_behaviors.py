@@ -1,6 +1,7 @@
 import math
 import random
 import pygame
+from utils.geometry import segment_intersection
 
 def world_to_local(point, agent_pos, heading, side):
     # Transformacja punktu do lokalnej przestrzeni agenta
@@ -16,7 +17,22 @@ def local_to_world(local_vec, heading, side):
     world_y = local_vec.x * heading.y + local_vec.y * side.y
     return pygame.Vector2(world_x, world_y)
 
+# mnożnik hamowania dla arrive
+DECELERATION = {'fast': 1, 'normal': 2, 'slow': 3}
+
+
 class SteeringBehaviors:
+    """
+    Zachowania sterujące agenta.
+    Każde zachowanie przyjmuje opcjonalny bufor `out` (pygame.Vector2) i zapisuje w nim wynik -
+    w gorących pętlach (EnemySteering) nie powstają wtedy tymczasowe wektory.
+    Bez `out` zwracany jest nowy wektor, jak wcześniej.
+    """
+    __slots__ = ("agent", "wander_radius", "wander_distance", "wander_jitter", "wander_target",
+                 "min_detection_box_length", "braking_weight", "feeler_length", "feelers",
+                 "distance_from_boundary", "path", "current_waypoint_index",
+                 "waypoint_seek_radius", "waypoint_seek_radius_sq")
+
     def __init__(self, agent):
         self.agent = agent
 
@@ -45,209 +61,300 @@ class SteeringBehaviors:
         self.waypoint_seek_radius = 50  # promień w pikselach
         self.waypoint_seek_radius_sq = self.waypoint_seek_radius ** 2
 
-    def seek(self, target_pos):
+    def reset(self):
+        """Stan początkowy (wander na okręgu, bez ścieżki) - przy ponownym użyciu agenta."""
+        self.wander_target.update(self.wander_radius, 0)
+        self.path = None
+        self.current_waypoint_index = 0
+
+    def seek(self, target_pos, out=None):
         """Seek target position"""
+        if out is None:
+            out = pygame.Vector2()
         if target_pos is None:
-            return pygame.Vector2(0, 0)
-
-        desired_velocity = target_pos - self.agent.pos
-        if desired_velocity.length_squared() > 0:
-            desired_velocity = desired_velocity.normalize() * self.agent.max_speed
+            out.update(0, 0)
+            return out
+        return self._seek_xy(target_pos.x, target_pos.y, out)
+
+    def _seek_xy(self, target_x, target_y, out):
+        agent = self.agent
+        dx = target_x - agent.pos.x
+        dy = target_y - agent.pos.y
+        length_sq = dx * dx + dy * dy
+        if length_sq > 0:
+            length = math.sqrt(length_sq)
+            dx = dx / length * agent.max_speed
+            dy = dy / length * agent.max_speed
         else:
-            desired_velocity = pygame.Vector2(0, 0)
+            dx = dy = 0.0
 
-        steering_force = desired_velocity - self.agent.velocity
-        return steering_force
+        out.update(dx - agent.velocity.x, dy - agent.velocity.y)
+        return out
 
-    def flee(self, target_pos, panic_distance=None):
+    def flee(self, target_pos, panic_distance=None, out=None):
         """Flee from target position. Optional panic distance."""
-        to_target = self.agent.pos - target_pos
+        if out is None:
+            out = pygame.Vector2()
+        return self._flee_xy(target_pos.x, target_pos.y, panic_distance, out)
 
-        # jeśli jest panic_distance i cel jest dalej niż dystans paniki, nic nie rób
-        if panic_distance is not None and to_target.length_squared() > panic_distance**2:
-            return pygame.Vector2(0, 0)
-        desired_velocity = to_target.normalize() * self.agent.max_speed
-        return desired_velocity - self.agent.velocity
+    def _flee_xy(self, target_x, target_y, panic_distance, out):
+        agent = self.agent
+        dx = agent.pos.x - target_x
+        dy = agent.pos.y - target_y
+        length_sq = dx * dx + dy * dy
 
-    def arrive(self, target_pos: pygame.Vector2, deceleration: str = 'normal') -> pygame.Vector2:
+        # jeśli jest panic_distance i cel jest dalej niż dystans paniki, nic nie rób
+        if (panic_distance is not None and length_sq > panic_distance ** 2) or length_sq == 0:
+            out.update(0, 0)
+            return out
+        length = math.sqrt(length_sq)
+        out.update(dx / length * agent.max_speed - agent.velocity.x,
+                   dy / length * agent.max_speed - agent.velocity.y)
+        return out
+
+    def arrive(self, target_pos: pygame.Vector2, deceleration: str = 'normal', out=None) -> pygame.Vector2:
         # deceleration: 'slow', 'normal', 'fast'
-        deceleration_mapping = {'fast': 1, 'normal': 2, 'slow': 3}
-        decel = deceleration_mapping.get(deceleration, 2)
+        if out is None:
+            out = pygame.Vector2()
+        return self._arrive_xy(target_pos.x, target_pos.y, DECELERATION.get(deceleration, 2), out)
 
-        to_target = target_pos - self.agent.pos
-        dist = to_target.length()
+    def _arrive_xy(self, target_x, target_y, decel, out):
+        agent = self.agent
+        dx = target_x - agent.pos.x
+        dy = target_y - agent.pos.y
+        dist = math.sqrt(dx * dx + dy * dy)
 
         if dist > 0:
             deceleration_tweaker = 0.3
             # prędkość wymagana, aby dojść do celu
             speed = dist / (decel * deceleration_tweaker)
-            speed = min(speed, self.agent.max_speed)
+            speed = min(speed, agent.max_speed)
 
-            desired_velocity = to_target * speed / dist
-            return desired_velocity - self.agent.velocity
+            inv_dist = 1.0 / dist
+            out.update(dx * speed * inv_dist - agent.velocity.x, dy * speed * inv_dist - agent.velocity.y)
+            return out
 
-        return pygame.Vector2(0, 0)
+        out.update(0, 0)
+        return out
 
-    def pursuit(self, evader):
-        to_evader = evader.pos - self.agent.pos
+    def pursuit(self, evader, out=None):
+        if out is None:
+            out = pygame.Vector2()
+        agent = self.agent
+        heading = agent.heading
+        to_x = evader.pos.x - agent.pos.x
+        to_y = evader.pos.y - agent.pos.y
 
         # Dot product: czy evader jest przed agentem?
-        relative_heading = self.agent.heading.dot(evader.heading)
+        relative_heading = heading.x * evader.heading.x + heading.y * evader.heading.y
 
         # Czy evader jest "przed nami" i niemal się nie obraca względem nas?
-        if to_evader.dot(self.agent.heading) > 0 and relative_heading < -0.95:
+        if to_x * heading.x + to_y * heading.y > 0 and relative_heading < -0.95:
             # seek do aktualnej pozycji
-            return self.seek(evader.pos)
+            return self._seek_xy(evader.pos.x, evader.pos.y, out)
 
         # przewidujemy przyszłą pozycję:
-        distance = to_evader.length()
-        speed_sum = self.agent.max_speed + evader.velocity.length()
+        distance = math.sqrt(to_x * to_x + to_y * to_y)
+        speed_sum = agent.max_speed + evader.velocity.length()
 
         if speed_sum != 0:
             look_ahead_time = distance / speed_sum
         else:
             look_ahead_time = 0
 
-        future_pos = evader.pos + evader.velocity * look_ahead_time
-
-        return self.seek(future_pos)
+        return self._seek_xy(evader.pos.x + evader.velocity.x * look_ahead_time,
+                             evader.pos.y + evader.velocity.y * look_ahead_time, out)
 
-    def evade(self, pursuer):
-        to_pursuer = pursuer.pos - self.agent.pos
+    def evade(self, pursuer, out=None):
+        if out is None:
+            out = pygame.Vector2()
+        agent = self.agent
+        to_x = pursuer.pos.x - agent.pos.x
+        to_y = pursuer.pos.y - agent.pos.y
 
         # przewidujemy przyszłą pozycję
-        look_ahead_time = to_pursuer.length() / (self.agent.max_speed + pursuer.velocity.length())
-
-        future_pos = pursuer.pos + pursuer.velocity * look_ahead_time
+        look_ahead_time = math.sqrt(to_x * to_x + to_y * to_y) / (agent.max_speed + pursuer.velocity.length())
 
         # flee
-        return self.flee(future_pos)
+        return self._flee_xy(pursuer.pos.x + pursuer.velocity.x * look_ahead_time,
+                             pursuer.pos.y + pursuer.velocity.y * look_ahead_time, None, out)
+
+    def wander(self, dt: float, out=None):
+        if out is None:
+            out = pygame.Vector2()
+        agent = self.agent
+        target = self.wander_target
 
-    def wander(self, dt: float):
         # losowy jitter dodany do celu na okręgu
         jitter = self.wander_jitter * dt
-        self.wander_target += pygame.Vector2(
-            random.uniform(-1, 1) * jitter,
-            random.uniform(-1, 1) * jitter
-        )
+        jitter_x = random.uniform(-1, 1) * jitter
+        jitter_y = random.uniform(-1, 1) * jitter
+        target.update(target.x + jitter_x, target.y + jitter_y)
 
         # normalizacja + rzut z powrotem na okrąg
-        if self.wander_target.length_squared() > 0:
-            self.wander_target = self.wander_target.normalize() * self.wander_radius
+        if target.length_squared() > 0:
+            target.normalize_ip()
+            target *= self.wander_radius
 
         # przesunięcie okręgu przed agenta
-        target_local = self.wander_target + pygame.Vector2(self.wander_distance, 0)
+        local_x = target.x + self.wander_distance
+        local_y = target.y + 0.0
 
         # transformacja do świata
-        heading = self.agent.velocity.normalize() if self.agent.velocity.length() > 0 else pygame.Vector2(1, 0)
-        side = pygame.Vector2(-heading.y, heading.x)
+        velocity = agent.velocity
+        speed = velocity.length()
+        if speed > 0:
+            heading_x = velocity.x / speed
+            heading_y = velocity.y / speed
+        else:
+            heading_x, heading_y = 1.0, 0.0
+        side_x, side_y = -heading_y, heading_x
 
-        target_world = (
-                self.agent.pos +
-                heading * target_local.x +
-                side * target_local.y
-        )
+        world_x = agent.pos.x + heading_x * local_x + side_x * local_y
+        world_y = agent.pos.y + heading_y * local_x + side_y * local_y
 
         # 5) Siła sterująca — SEEK do target_world
-        return (target_world - self.agent.pos).normalize() * self.agent.max_speed
-
-    def obstacle_avoidance(self, obstacles):
-        if not obstacles:
-            return pygame.Vector2(0, 0)
+        dx = world_x - agent.pos.x
+        dy = world_y - agent.pos.y
+        length = math.sqrt(dx * dx + dy * dy)
+        out.update(dx / length * agent.max_speed, dy / length * agent.max_speed)
+        return out
 
+    def detection_box_length(self):
         # dynamiczna długość boxa zależna od prędkości
         speed_ratio = self.agent.velocity.length() / self.agent.max_speed
-        detection_box_length = self.min_detection_box_length + speed_ratio * self.min_detection_box_length
+        return self.min_detection_box_length + speed_ratio * self.min_detection_box_length
+
+    def obstacle_avoidance(self, obstacles, obstacle_index=None, out=None):
+        if out is None:
+            out = pygame.Vector2()
+        agent = self.agent
+        detection_box_length = self.detection_box_length()
+
+        # z indeksem sprawdzamy tylko przeszkody, które przecinają detection box
+        if obstacle_index is not None:
+            obstacles = obstacle_index.query_box(agent.pos, agent.heading, agent.side,
+                                                 detection_box_length, agent.radius)
+
+        if not obstacles:
+            out.update(0, 0)
+            return out
 
         closest_intersection = None
         dist_to_closest = float('inf')
-        local_pos_of_closest = None
+        closest_x = closest_y = 0.0
 
+        pos_x, pos_y = agent.pos.x, agent.pos.y
+        heading_x, heading_y = agent.heading.x, agent.heading.y
+        side_x, side_y = agent.side.x, agent.side.y
         for obs in obstacles:
-            # transformacja przeszkody do lokalnej przestrzeni agenta
-            local_pos = world_to_local(obs.pos, self.agent.pos, self.agent.heading, self.agent.side)
-
-            if local_pos.x >= 0:  # tylko przeszkody przed agentem
-                expanded_radius = obs.radius + self.agent.radius
-                if abs(local_pos.y) < expanded_radius:
+            # transformacja przeszkody do lokalnej przestrzeni agenta (world_to_local na skalarach)
+            dx = obs.pos.x - pos_x
+            dy = obs.pos.y - pos_y
+            local_x = dx * heading_x + dy * heading_y
+            local_y = dx * side_x + dy * side_y
+
+            if local_x >= 0:  # tylko przeszkody przed agentem
+                expanded_radius = obs.radius + agent.radius
+                if abs(local_y) < expanded_radius:
                     # prosta linia x=0, przecięcie z okręgiem przeszkody
-                    cX = local_pos.x
-                    cY = local_pos.y
-                    sqrt_part = math.sqrt(expanded_radius ** 2 - cY ** 2)
-                    ip = cX - sqrt_part
+                    sqrt_part = math.sqrt(expanded_radius ** 2 - local_y ** 2)
+                    ip = local_x - sqrt_part
                     if ip <= 0:
-                        ip = cX + sqrt_part
+                        ip = local_x + sqrt_part
 
                     if ip < dist_to_closest:
                         dist_to_closest = ip
                         closest_intersection = obs
-                        local_pos_of_closest = local_pos
+                        closest_x, closest_y = local_x, local_y
 
         # jeśli nic nie znaleziono
         if closest_intersection is None:
-            return pygame.Vector2(0, 0)
+            out.update(0, 0)
+            return out
 
         # obliczamy lateral i braking force
-        multiplier = 1.0 + (detection_box_length - local_pos_of_closest.x) / detection_box_length
-        lateral_force = (closest_intersection.radius - local_pos_of_closest.y) * multiplier
-        braking_force = (closest_intersection.radius - local_pos_of_closest.x) * self.braking_weight
+        multiplier = 1.0 + (detection_box_length - closest_x) / detection_box_length
+        lateral_force = (closest_intersection.radius - closest_y) * multiplier
+        braking_force = (closest_intersection.radius - closest_x) * self.braking_weight
 
-        steering_local = pygame.Vector2(braking_force, lateral_force)
-        steering_world = local_to_world(steering_local, self.agent.heading, self.agent.side)
-        return steering_world
+        # local_to_world
+        out.update(braking_force * heading_x + lateral_force * side_x,
+                   braking_force * heading_y + lateral_force * side_y)
+        return out
 
     def create_feelers(self):
-        """Tworzy 3 feelery: środkowy, lewy i prawy"""
+        """Ustawia 3 feelery (w miejscu): środkowy, lewy i prawy"""
         length = self.feeler_length
+        pos = self.agent.pos
+        center, left, right = self.feelers
 
-        heading = self.agent.heading
-        if heading.length_squared() == 0:
-            heading = pygame.Vector2(1, 0)
+        center.update(self.agent.heading)
+        if center.length_squared() == 0:
+            center.update(1, 0)
         else:
-            heading = heading.normalize()
+            center.normalize_ip()
 
-        left_dir = heading.rotate(30).normalize()
-        right_dir = heading.rotate(-30).normalize()
+        # lewy i prawy - heading obrócony o ±30°
+        for feeler, angle in ((left, 30), (right, -30)):
+            feeler.update(center)
+            feeler.rotate_ip(angle)
+            feeler.normalize_ip()
+            feeler *= length
+            feeler *= 0.8
+            feeler += pos
 
         # centralny feeler
-        self.feelers[0] = self.agent.pos + heading * length
-        # lewy
-        self.feelers[1] = self.agent.pos + left_dir * length * 0.8
-        # prawy
-        self.feelers[2] = self.agent.pos + right_dir * length * 0.8
+        center *= length
+        center += pos
 
-    def wall_avoidance(self, walls):
+    def wall_avoidance(self, walls, out=None, wall_index=None):
         """
         walls: lista obiektów Wall, które mają:
-            - from_pos (pygame.Vector2) początek
-            - to_pos (pygame.Vector2) koniec
+            - start (pygame.Vector2) początek
+            - end (pygame.Vector2) koniec
             - normal (pygame.Vector2) normalna
-        Zwraca wektor siły sterującej
+        wall_index (WallIndex) - jeśli podany, feelery sprawdzają tylko ściany z komórek na swojej drodze
+        Zwraca wektor siły sterującej: normalna ściany (po stronie agenta) razy głębokość wejścia feelera
         """
+        if out is None:
+            out = pygame.Vector2()
+        out.update(0, 0)
         self.create_feelers()
-        steering_force = pygame.Vector2(0, 0)
-        closest_dist = float('inf')
-        closest_wall = None
-        closest_point = None
-        feeler_index = 0
-
-        for i, feeler in enumerate(self.feelers):
-            for wall in walls:
-                # prosta funkcja przecięcia linii
-                intersect, point = self.line_intersection(self.agent.pos, feeler, wall.from_pos, wall.to_pos)
-                if intersect:
-                    dist = (point - self.agent.pos).length()
-                    if dist < closest_dist:
-                        closest_dist = dist
-                        closest_wall = wall
-                        closest_point = point
-                        feeler_index = i
-
-        if closest_wall:
-            overshoot = self.feelers[feeler_index] - closest_point
-            steering_force = closest_wall.normal * overshoot.length()
-
-        return steering_force
+        if not walls:
+            return out
+        pos = self.agent.pos
+
+        if wall_index is not None:
+            closest_wall, feeler_index, t = wall_index.feeler_hit(pos, self.feelers)
+        else:
+            closest_wall = feeler_index = t = None
+            closest_dist = float('inf')
+            for i, feeler in enumerate(self.feelers):
+                rx = feeler.x - pos.x
+                ry = feeler.y - pos.y
+                length = math.sqrt(rx * rx + ry * ry)
+                for wall in walls:
+                    hit = segment_intersection(pos.x, pos.y, rx, ry, wall.start.x, wall.start.y,
+                                               wall.end.x - wall.start.x, wall.end.y - wall.start.y)
+                    if hit is not None and hit * length < closest_dist:
+                        closest_dist = hit * length
+                        closest_wall, feeler_index, t = wall, i, hit
+
+        if closest_wall is not None:
+            feeler = self.feelers[feeler_index]
+            rx = feeler.x - pos.x
+            ry = feeler.y - pos.y
+            # część feelera za ścianą
+            overshoot = (1.0 - t) * math.sqrt(rx * rx + ry * ry)
+            normal = closest_wall.normal
+            # ściany wewnętrzne są dwustronne - odpychamy na stronę, po której stoi agent
+            side = (pos.x - closest_wall.start.x) * normal.x + (pos.y - closest_wall.start.y) * normal.y
+            if side < 0:
+                overshoot = -overshoot
+            out.update(normal.x * overshoot, normal.y * overshoot)
+
+        return out
 
     def interpose(self, agent_a, agent_b):
         """
@@ -283,151 +390,216 @@ class SteeringBehaviors:
         hiding_spot = obstacle_pos + to_obstacle * dist_away
         return hiding_spot
 
-    def hide(self, target, obstacles: list):
+    def hide(self, target, obstacles: list, hiding_spots=None, out=None, navigation=None):
         """
         Oblicza siłę sterującą, by ukryć się przed celem.
+        Jeśli podano hiding_spots (HidingSpotTable), punkty są wspólne dla wszystkich agentów
+        i wybór najbliższego nie przegląda wszystkich przeszkód.
+        Z navigation (map.navigation.Navigator) agent idzie do punktu ścieżką A* zamiast wprost.
         """
         best_hiding_spot = None
         dist_to_closest = float('inf')
 
-        for obs in obstacles:
-            hiding_spot = self.get_hiding_position(obs.pos, obs.radius, target.pos)
-            dist_sq = (hiding_spot - self.agent.pos).length_squared()
-            if dist_sq < dist_to_closest:
-                dist_to_closest = dist_sq
-                best_hiding_spot = hiding_spot
-
+        if hiding_spots is not None:
+            best_hiding_spot = hiding_spots.nearest(self.agent.pos)
+        else:
+            for obs in obstacles:
+                hiding_spot = self.get_hiding_position(obs.pos, obs.radius, target.pos)
+                dist_sq = (hiding_spot - self.agent.pos).length_squared()
+                if dist_sq < dist_to_closest:
+                    dist_to_closest = dist_sq
+                    best_hiding_spot = hiding_spot
+
+        if out is None:
+            out = pygame.Vector2()
         if best_hiding_spot is None:
             # brak przeszkód – uciekaj od celu
-            return self.evade(target)
+            return self.evade(target, out)
+
+        if navigation is not None:
+            # trasa omijająca przeszkody - przeliczana dopiero, gdy punkt ukrycia się przesunie
+            return self._hide_along_path(best_hiding_spot, navigation, out)
 
         # idź do najlepszego punktu ukrycia
-        return self.arrive(best_hiding_spot, deceleration='fast')
+        return self._arrive_xy(best_hiding_spot.x, best_hiding_spot.y, DECELERATION['fast'], out)
+
+    def _hide_along_path(self, spot, navigation, out):
+        path = self.path
+        if path is None or getattr(path, "goal", None) != spot:
+            new_path = navigation.replan(path, self.agent.pos, spot) if path is not None else \
+                navigation.find_path(self.agent.pos, spot)
+            if new_path is None:
+                # punkt nieosiągalny - jak bez nawigacji
+                self.path = None
+                return self._arrive_xy(spot.x, spot.y, DECELERATION['fast'], out)
+            if path is not None and new_path[:-1] == path[:len(new_path) - 1]:
+                # naprawiona końcówka - agent nie wraca do już minionych waypointów
+                self.path = new_path
+                self.current_waypoint_index = min(self.current_waypoint_index, len(new_path) - 1)
+            else:
+                self.set_path(new_path)
+        return self.follow_path(out, 'fast')
+
+    def set_path(self, path):
+        """Nowa trasa dla follow_path (np. NavPath z map.navigation) - od pierwszego waypointu."""
+        self.path = path
+        self.current_waypoint_index = 0
 
-    def follow_path(self):
-        if not self.path or len(self.path) == 0:
-            return pygame.Vector2(0, 0)
+    def follow_path(self, out=None, deceleration: str = 'normal'):
+        if out is None:
+            out = pygame.Vector2()
+        path = self.path
+        if not path:
+            out.update(0, 0)
+            return out
 
         # aktualny waypoint
-        target = self.path[self.current_waypoint_index]
+        target = path[self.current_waypoint_index]
+        closed = getattr(path, "closed", False)
 
         # distance squared do waypointu
-        dist_sq = (target - self.agent.pos).length_squared()
+        dx = target.x - self.agent.pos.x
+        dy = target.y - self.agent.pos.y
 
         # jeśli blisko waypointu, do następnego
-        if dist_sq < self.waypoint_seek_radius_sq:
+        if dx * dx + dy * dy < self.waypoint_seek_radius_sq:
             self.current_waypoint_index += 1
-            if self.current_waypoint_index >= len(self.path):
+            if self.current_waypoint_index >= len(path):
                 # jeśli trasa jest zamknięta, wróć do początku
-                if getattr(self.path, "closed", False):
+                if closed:
                     self.current_waypoint_index = 0
                 else:
-                    self.current_waypoint_index = len(self.path) - 1  # ostatni punkt
+                    self.current_waypoint_index = len(path) - 1  # ostatni punkt
 
-            target = self.path[self.current_waypoint_index]
+            target = path[self.current_waypoint_index]
 
         # jeśli jesteśmy w ostatnim punkcie trasy otwartej - arrive
-        if self.current_waypoint_index == len(self.path) - 1 and not getattr(self.path, "closed", False):
-            return self.arrive(target, deceleration='normal')
+        if self.current_waypoint_index == len(path) - 1 and not closed:
+            return self._arrive_xy(target.x, target.y, DECELERATION.get(deceleration, 2), out)
         else:
             # w przeciwnym razie - seek
-            return self.seek(target)
-
-    def offset_pursuit(self, leader, offset: pygame.Vector2):
+            return self._seek_xy(target.x, target.y, out)
+
+    def flow_field(self, field, out=None):
+        """Seek do następnego punktu wspólnego pola przepływu (map.flow_field) - omija przeszkody po drodze do celu."""
+        if out is None:
+            out = pygame.Vector2()
+        point = field.next_point(self.agent.pos.x, self.agent.pos.y)
+        if point is None:
+            out.update(0, 0)
+            return out
+        return self._seek_xy(point[0], point[1], out)
+
+    def offset_pursuit(self, leader, offset: pygame.Vector2, out=None):
         """
             Utrzymuje agenta w określonym przesunięciu względem lidera.
             :param leader: agent do podążania
             :param offset: Pozycja przesunięcia w przestrzeni lokalnej lidera (pygame.Vector2)
+            :param out: opcjonalny bufor na wynik
             :return: Steering force (pygame.Vector2)
         """
+        if out is None:
+            out = pygame.Vector2()
+        agent = self.agent
+
         # offset w przestrzeni świata
-        world_offset_pos = leader.pos + leader.heading * offset.x + leader.side * offset.y
+        offset_x = leader.pos.x + leader.heading.x * offset.x + leader.side.x * offset.y
+        offset_y = leader.pos.y + leader.heading.y * offset.x + leader.side.y * offset.y
 
         # wektor do offsetu
-        to_offset = world_offset_pos - self.agent.pos
+        to_x = offset_x - agent.pos.x
+        to_y = offset_y - agent.pos.y
 
         # przewidywanie pozycji
-        look_ahead_time = to_offset.length() / (self.agent.max_speed + leader.velocity.length())
-
-        # przewidywana przyszła pozycja offsetu
-        future_pos = world_offset_pos + leader.velocity * look_ahead_time
+        look_ahead_time = math.sqrt(to_x * to_x + to_y * to_y) / (agent.max_speed + leader.velocity.length())
 
-        # arrive do przewidywanej pozycji
-        return self.arrive(future_pos, deceleration='fast')
+        # arrive do przewidywanej przyszłej pozycji offsetu
+        return self._arrive_xy(offset_x + leader.velocity.x * look_ahead_time,
+                               offset_y + leader.velocity.y * look_ahead_time, DECELERATION['fast'], out)
 
-    def separation(self, neighbors):
+    def separation(self, neighbors, out=None):
         """
-        Oblicza siłę separacji względem sąsiadów.c
+        Oblicza siłę separacji względem sąsiadów.
         """
-        if not neighbors:
-            return pygame.Vector2()
-
-        steering_force = pygame.Vector2(0, 0)
+        if out is None:
+            out = pygame.Vector2()
 
+        force_x = force_y = 0.0
+        pos_x, pos_y = self.agent.pos.x, self.agent.pos.y
         for other in neighbors:
-            to = self.agent.pos - other.pos
-            dist = to.length()
+            to_x = pos_x - other.pos.x
+            to_y = pos_y - other.pos.y
+            dist = math.sqrt(to_x * to_x + to_y * to_y)
 
             if dist > 0:
-                steering_force += to.normalize() / dist  # im bliżej, tym silniejsze odpychanie
+                # im bliżej, tym silniejsze odpychanie (kierunek / dist)
+                inv_dist = 1.0 / dist
+                force_x += to_x / dist * inv_dist
+                force_y += to_y / dist * inv_dist
 
-        return steering_force
+        out.update(force_x, force_y)
+        return out
 
-    def alignment(self):
+    def alignment(self, out=None):
         """
         Steering: ALIGNMENT
         Zwraca wektor kierujący agenta tak, aby wyrównał kierunek
         do średniego kierunku swoich sąsiadów.
         """
-        neighbors = self.agent.neighbors
-
-        if not neighbors:
-            return pygame.Vector2(0, 0)
+        if out is None:
+            out = pygame.Vector2()
+        agent = self.agent
 
         # sredni heading sąsiadów
-        avg_heading = pygame.Vector2(0, 0)
+        sum_x = sum_y = 0.0
         count = 0
-
-        for other in neighbors:
-            if other is self.agent:
+        for other in agent.neighbors:
+            if other is agent:
                 continue
-            avg_heading += other.heading
+            sum_x += other.heading.x
+            sum_y += other.heading.y
             count += 1
 
         if count == 0:
-            return pygame.Vector2(0, 0)
-
-        avg_heading /= count
-
-        steering = avg_heading - self.agent.heading
+            out.update(0, 0)
+            return out
 
-        return steering
+        inv_count = 1.0 / count
+        out.update(sum_x * inv_count - agent.heading.x, sum_y * inv_count - agent.heading.y)
+        return out
 
-    def cohesion(self, neighbors):
+    def cohesion(self, neighbors, out=None):
         """
         Zwraca siłę steering przyciągającą agenta do środka masy jego sąsiadów.
         """
+        if out is None:
+            out = pygame.Vector2()
         if not neighbors:
-            return pygame.Vector2(0, 0)
+            out.update(0, 0)
+            return out
+        agent = self.agent
 
         # środek masy sąsiadów
-        center_of_mass = pygame.Vector2(0, 0)
+        sum_x = sum_y = 0.0
         for neighbor in neighbors:
-            center_of_mass += neighbor.pos
-        center_of_mass /= len(neighbors)
-
-
+            sum_x += neighbor.pos.x
+            sum_y += neighbor.pos.y
+        count = len(neighbors)
 
         # Wektor kierunku do środka masy
-        to_center = center_of_mass - self.agent.pos
-        if to_center.length_squared() > 1e-6:  # zabezpieczenie przed zerowym wektorem
-            desired_velocity = to_center.normalize() * self.agent.max_speed
-            steering_force = desired_velocity - self.agent.velocity
-            if steering_force.length() > self.agent.max_force:
-                steering_force.scale_to_length(self.agent.max_force)
-            return steering_force
+        inv_count = 1.0 / count
+        to_x = sum_x * inv_count - agent.pos.x
+        to_y = sum_y * inv_count - agent.pos.y
+        length_sq = to_x * to_x + to_y * to_y
+        if length_sq > 1e-6:  # zabezpieczenie przed zerowym wektorem
+            length = math.sqrt(length_sq)
+            out.update(to_x / length * agent.max_speed - agent.velocity.x,
+                       to_y / length * agent.max_speed - agent.velocity.y)
+            if out.length() > agent.max_force:
+                out.scale_to_length(agent.max_force)
         else:
-            return pygame.Vector2(0, 0)
+            out.update(0, 0)
+        return out
 
 
     @staticmethod
@@ -0,0 +1,38 @@
+import pygame
+
+
+class Camera:
+    """
+    Widok (viewport) na świat większy niż ekran.
+    offset to lewy górny róg widoku w świecie: ekran = świat - offset.
+    Kamera jedzie za celem (graczem), ale nie wychodzi poza mapę; mapa mniejsza
+    od ekranu zostaje w lewym górnym rogu (offset 0, jak bez kamery).
+    """
+
+    def __init__(self, view_width, view_height, world_width=None, world_height=None):
+        self.view_width = view_width
+        self.view_height = view_height
+        self.world_width = world_width if world_width is not None else view_width
+        self.world_height = world_height if world_height is not None else view_height
+        self.offset = pygame.Vector2(0, 0)
+
+    def set_world_size(self, world_width, world_height):
+        self.world_width = world_width
+        self.world_height = world_height
+
+    def follow(self, target):
+        """Centruje widok na target (przycięte do mapy). Offset w pełnych pikselach - statyczne elementy nie drgają."""
+        x = min(max(target.x - self.view_width / 2, 0), max(self.world_width - self.view_width, 0))
+        y = min(max(target.y - self.view_height / 2, 0), max(self.world_height - self.view_height, 0))
+        self.offset.update(round(x), round(y))
+
+    def world_to_screen(self, pos) -> pygame.Vector2:
+        return pygame.Vector2(pos[0] - self.offset.x, pos[1] - self.offset.y)
+
+    def screen_to_world(self, pos) -> pygame.Vector2:
+        return pygame.Vector2(pos[0] + self.offset.x, pos[1] + self.offset.y)
+
+    def view_rect(self, margin=0.0):
+        """Widoczny obszar świata (min_x, min_y, max_x, max_y), poszerzony o margin."""
+        return (self.offset.x - margin, self.offset.y - margin,
+                self.offset.x + self.view_width + margin, self.offset.y + self.view_height + margin)
@@ -0,0 +1,62 @@
+import pygame
+
+
+class ProfilerUI:
+    """Nakładka z rozbiciem czasu klatki na podsystemy i wykresem czasu klatek."""
+    def __init__(self, profiler, budget_ms=1000 / 60):
+        self.profiler = profiler
+        self.budget_ms = budget_ms
+        self.font = pygame.font.SysFont("Consolas", 14)
+
+        self.width = 340
+        self.line_height = 16
+        self.graph_height = 50
+        self.padding = 8
+
+    def draw(self, screen):
+        if not self.profiler.enabled:
+            return
+
+        rows = self.profiler.averages()
+        height = (self.padding * 3 + self.line_height * (len(rows) + 1) + self.graph_height)
+
+        overlay = pygame.Surface((self.width, height), pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 170))
+
+        frame_ms = self.profiler.mean_frame_time()
+        fps = 1000.0 / frame_ms if frame_ms > 0 else 0.0
+        y = self.padding
+        self._text(overlay, f"frame {frame_ms:6.2f} ms  ({fps:5.0f} fps)", self.padding, y, (218, 222, 227))
+        y += self.line_height
+
+        for name, ms, calls in rows:
+            color = (237, 63, 19) if ms > self.budget_ms * 0.5 else (200, 200, 200)
+            self._text(overlay, f"{name[:24]:24s}{ms:7.2f} ms {calls:6.0f}x", self.padding, y, color)
+            y += self.line_height
+
+        y += self.padding
+        self._draw_graph(overlay, self.padding, y, self.width - 2 * self.padding, self.graph_height)
+
+        # lewy dolny róg - gracz startuje w lewym górnym
+        screen.blit(overlay, (10, screen.get_height() - height - 10))
+
+    def _text(self, surface, text, x, y, color):
+        surface.blit(self.font.render(text, True, color), (x, y))
+
+    def _draw_graph(self, surface, x, y, width, height):
+        times = self.profiler.frame_times
+        pygame.draw.rect(surface, (60, 60, 60), (x, y, width, height), 1)
+        if not times:
+            return
+
+        # skala: 2x budżet klatki na pełną wysokość
+        scale = height / (self.budget_ms * 2)
+        bar_width = max(1, width // self.profiler.history)
+        for i, ms in enumerate(times):
+            bar = min(height, int(ms * scale))
+            color = (50, 125, 217) if ms <= self.budget_ms else (222, 55, 92)
+            pygame.draw.rect(surface, color, (x + i * bar_width, y + height - bar, bar_width, bar))
+
+        # linia budżetu (60 FPS)
+        budget_y = y + height - int(self.budget_ms * scale)
+        pygame.draw.line(surface, (120, 200, 120), (x, budget_y), (x + width, budget_y))
@@ -0,0 +1,35 @@
+import pygame
+from .camera import Camera
+
+
+class WorldRenderer:
+    """
+    Rysuje stan World na ekranie - opcjonalny obserwator, symulacja go nie potrzebuje.
+    Kamera jedzie za graczem, więc mapa może być wielokrotnie większa od ekranu.
+    """
+    def __init__(self, screen, camera=None):
+        self.screen = screen
+        self.camera = camera if camera is not None else Camera(*screen.get_size())
+        # Player.shot_tick ostatnio narysowanego strzału
+        self.drawn_shot_tick = None
+
+    def draw(self, world, alpha=1.0):
+        """alpha - ułamek ticka od ostatniego kroku symulacji (FixedStepScheduler.alpha)"""
+        self.screen.fill((30, 30, 30))  # background
+
+        player = world.player
+        camera = self.camera
+        camera.set_world_size(world.width, world.height)
+        camera.follow(player.interpolated_pos(alpha))
+        offset = camera.offset
+
+        if not world.player_dead:
+            # promień strzału z ostatniego ticka albo z wcześniejszego ticka tej klatki (jeszcze nie narysowany)
+            shot_tick = player.shot_tick
+            if shot_tick is not None and (shot_tick == world.tick or shot_tick != self.drawn_shot_tick):
+                start, end = player.shot_ray
+                pygame.draw.line(self.screen, (255, 0, 0), start - offset, end - offset, 2)
+                self.drawn_shot_tick = shot_tick
+            player.draw(self.screen, alpha, offset)
+
+        world.game_map.draw(self.screen, alpha, camera)
@@ -1,27 +1,34 @@
+import math
+import random
 import pygame
+from utils.geometry import closest_point_on_segment
 
 def circle_collision(pos1: pygame.Vector2, radius1: float,
                      pos2: pygame.Vector2, radius2: float) -> bool:
     """Sprawdza, czy dwa okręgi kolidują"""
-    return (pos1 - pos2).length_squared() < (radius1 + radius2) ** 2
+    dx = pos1.x - pos2.x
+    dy = pos1.y - pos2.y
+    return dx * dx + dy * dy < (radius1 + radius2) ** 2
 
 
 def resolve_circle_overlap(pos1: pygame.Vector2, radius1: float,
                            pos2: pygame.Vector2, radius2: float):
     """Przesuwa pos1, aby nie nachodziło na pos2"""
-    delta = pos1 - pos2
-    dist_sq = delta.length_squared()
+    dx = pos1.x - pos2.x
+    dy = pos1.y - pos2.y
+    dist_sq = dx * dx + dy * dy
     min_dist = radius1 + radius2
 
     if dist_sq == 0:
         # edge case: nakładające się środki
-        delta = pygame.Vector2(1, 0)
+        dx, dy = 1.0, 0.0
         dist_sq = 1
 
     if dist_sq < min_dist * min_dist:
         dist = dist_sq ** 0.5
         overlap = min_dist - dist
-        pos1 += (delta / dist) * overlap
+        inv_dist = 1.0 / dist
+        pos1.update(pos1.x + dx * inv_dist * overlap, pos1.y + dy * inv_dist * overlap)
 
 def collision_with_walls(pos: pygame.Vector2, radius: float, map_width: int, map_height: int):
     """Zapobiega wychodzeniu okręgu poza granice mapy"""
@@ -33,4 +40,66 @@ def collision_with_walls(pos: pygame.Vector2, radius: float, map_width: int, map
     if pos.y - radius < 0:
         pos.y = radius
     elif pos.y + radius > map_height:
-        pos.y = map_height - radius
\ No newline at end of file
+        pos.y = map_height - radius
+
+def resolve_circle_wall(pos: pygame.Vector2, radius: float, wall) -> bool:
+    """Wypycha okrąg z odcinka ściany (na stronę, po której jest środek). Zwraca, czy była kolizja."""
+    cx, cy = closest_point_on_segment(pos.x, pos.y, wall.start.x, wall.start.y, wall.end.x, wall.end.y)
+    dx = pos.x - cx
+    dy = pos.y - cy
+    dist_sq = dx * dx + dy * dy
+    if dist_sq >= radius * radius:
+        return False
+
+    if dist_sq == 0:
+        # środek dokładnie na ścianie - wypychamy wzdłuż normalnej
+        dx, dy = wall.normal.x, wall.normal.y
+        dist = 0.0
+    else:
+        dist = math.sqrt(dist_sq)
+        dx /= dist
+        dy /= dist
+    overlap = radius - dist
+    pos.update(pos.x + dx * overlap, pos.y + dy * overlap)
+    return True
+
+def separate_agents(a, b):
+    """
+    Rozsuwa dwóch nachodzących na siebie agentów (Non-Penetration Constraint).
+    Lider grupy jest nieruchomy - przesuwamy wtedy tylko drugiego agenta.
+    """
+    a_pos = a.pos
+    b_pos = b.pos
+    dx = a_pos.x - b_pos.x
+    dy = a_pos.y - b_pos.y
+    dist_sq = dx * dx + dy * dy
+    min_dist = a.radius + b.radius
+
+    if dist_sq >= min_dist * min_dist:
+        return False
+
+    if dist_sq == 0:
+        # losowy kierunek, by uniknąć podziału przez zero
+        direction = pygame.Vector2(1, 0).rotate(random.uniform(0, 360))
+        nx, ny = direction.x, direction.y
+        dist = 1.0
+    else:
+        dist = math.sqrt(dist_sq)
+        inv_dist = 1.0 / dist
+        nx = dx * inv_dist  # od b do a
+        ny = dy * inv_dist
+
+    overlap = min_dist - dist
+    a_leader = getattr(a, "is_group_leader", False)
+    b_leader = getattr(b, "is_group_leader", False)
+    if a_leader and not b_leader:
+        # przesuwamy b na zewnątrz (od a)
+        b_pos.update(b_pos.x - nx * overlap, b_pos.y - ny * overlap)
+    elif b_leader and not a_leader:
+        # przesuwamy a na zewnątrz (od b)
+        a_pos.update(a_pos.x + nx * overlap, a_pos.y + ny * overlap)
+    else:
+        half = overlap * 0.5
+        a_pos.update(a_pos.x + nx * half, a_pos.y + ny * half)
+        b_pos.update(b_pos.x - nx * half, b_pos.y - ny * half)
+    return True
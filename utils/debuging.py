@@ -1,3 +1,4 @@
+import math
 import pygame
 import colorsys
 
@@ -10,22 +11,74 @@ def draw_neighbors_area(screen, pos, radius, color=(80, 80, 200), alpha=20):
     :param color: RGB kółka
     :param alpha: przezroczystość 0-255
     """
-    surf = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
-    pygame.draw.circle(surf, (*color, alpha), (radius, radius), radius)
+    surf = circle_sprite(radius, color, alpha)
     screen.blit(surf, (pos[0] - radius, pos[1] - radius))
 
-def draw_neighbors_outline(screen, neighbors, outline_color=(0, 255, 0)):
+
+_circle_sprites = {}
+
+
+def circle_sprite(radius, color, alpha):
+    """
+    Zwraca półprzezroczyste kółko wyrenderowane raz dla (radius, color, alpha).
+    """
+    key = (radius, tuple(color), alpha)
+    surf = _circle_sprites.get(key)
+    if surf is None:
+        size = int(math.ceil(radius * 2))
+        surf = pygame.Surface((size, size), pygame.SRCALPHA)
+        pygame.draw.circle(surf, (*color, alpha), (radius, radius), radius)
+        _circle_sprites[key] = surf
+    return surf
+
+def draw_neighbors_outline(screen, neighbors, outline_color=(0, 255, 0), offset=None):
     """
     Rysuje obwódki wokół sąsiadów.
     :param screen: Surface
     :param neighbors: lista agentów (muszą mieć .pos i .radius)
     :param outline_color: kolor obwódki
+    :param offset: lewy górny róg widoku kamery w świecie
     """
+    ox, oy = (offset.x, offset.y) if offset is not None else (0, 0)
     for other in neighbors:
         pygame.draw.circle(
             screen,
             outline_color,
-            (int(other.pos.x), int(other.pos.y)),
+            (int(other.pos.x - ox), int(other.pos.y - oy)),
             other.radius + 3,
             2
-        )
\ No newline at end of file
+        )
+
+
+class DebugOverlay:
+    """
+    Warstwa debug rysowana raz na klatkę dla wszystkich wrogów:
+    strefy szukania sąsiadów (sprite z cache, jeden batch blits) i opcjonalnie obwódki sąsiadów.
+    Wyłączona nic nie kosztuje.
+    """
+    def __init__(self, enabled=True, color=(80, 80, 200), alpha=10, show_outlines=False):
+        self.enabled = enabled
+        self.color = color
+        self.alpha = alpha
+        self.show_outlines = show_outlines
+
+    def toggle(self):
+        self.enabled = not self.enabled
+
+    def draw(self, screen, enemies, alpha=1.0, offset=None):
+        """offset - lewy górny róg widoku kamery w świecie."""
+        if not self.enabled or not enemies:
+            return
+        ox, oy = (offset.x, offset.y) if offset is not None else (0, 0)
+
+        blits = []
+        for enemy in enemies:
+            radius = enemy.flocking_radius
+            sprite = circle_sprite(radius, self.color, self.alpha)
+            pos = enemy.interpolated_pos(alpha)
+            blits.append((sprite, (pos.x - radius - ox, pos.y - radius - oy)))
+        screen.blits(blits, doreturn=False)
+
+        if self.show_outlines:
+            for enemy in enemies:
+                draw_neighbors_outline(screen, enemy.neighbors, outline_color=(0, 255, 0), offset=offset)
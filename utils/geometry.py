@@ -31,4 +31,35 @@ def ray_circle_intersection(px, py, dx, dy, cx, cy, r):
     if not t_candidates:
         return None
 
-    return min(t_candidates)
\ No newline at end of file
+    return min(t_candidates)
+
+def segment_intersection(px, py, rx, ry, qx, qy, sx, sy, max_t=1.0):
+    """
+    Przecięcie odcinków P + R*t i Q + S*u (t w [0, max_t], u w [0, 1]).
+    Zwraca t (ułamek długości pierwszego odcinka) albo None - także dla równoległych.
+    max_t=math.inf - pierwszy "odcinek" jest promieniem.
+    """
+    denominator = rx * sy - ry * sx
+    if denominator == 0:
+        return None
+    qpx = qx - px
+    qpy = qy - py
+    t = (qpx * sy - qpy * sx) / denominator
+    if t < 0 or t > max_t:
+        return None
+    u = (qpx * ry - qpy * rx) / denominator
+    if u < 0 or u > 1:
+        return None
+    return t
+
+
+def closest_point_on_segment(px, py, x1, y1, x2, y2):
+    """Najbliższy punktowi P punkt odcinka (x1, y1)-(x2, y2)."""
+    sx = x2 - x1
+    sy = y2 - y1
+    length_sq = sx * sx + sy * sy
+    if length_sq == 0:
+        return x1, y1
+    t = ((px - x1) * sx + (py - y1) * sy) / length_sq
+    t = min(max(t, 0.0), 1.0)
+    return x1 + sx * t, y1 + sy * t
@@ -0,0 +1,134 @@
+import functools
+import time
+from collections import deque
+from config import PROFILER_ENABLED
+
+
+class _NullSection:
+    """Sekcja, która nic nie robi - zwracana, gdy profiler jest wyłączony."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SECTION = _NullSection()
+
+
+class _Section:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.profiler.add(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class FrameProfiler:
+    """
+    Zbiera czasy podsystemów w obrębie klatki i trzyma historię ostatnich klatek.
+    Gdy jest wyłączony, section() zwraca pusty context manager, a add() nic nie robi.
+    """
+    def __init__(self, history=120, enabled=False):
+        self.enabled = enabled
+        self.history = history
+        self.current = {}  # nazwa -> [sekundy, wywołania] w bieżącej klatce
+        self.frames = deque(maxlen=history)  # słowniki z poprzednich klatek
+        self.frame_times = deque(maxlen=history)  # ms
+        self.frame_start = None
+
+    def set_enabled(self, enabled):
+        self.enabled = enabled
+        self.reset()
+
+    def reset(self):
+        self.current = {}
+        self.frames.clear()
+        self.frame_times.clear()
+        self.frame_start = None
+
+    def section(self, name):
+        if not self.enabled:
+            return _NULL_SECTION
+        return _Section(self, name)
+
+    def add(self, name, seconds, calls=1):
+        if not self.enabled:
+            return
+        acc = self.current.get(name)
+        if acc is None:
+            self.current[name] = [seconds, calls]
+        else:
+            acc[0] += seconds
+            acc[1] += calls
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self.current = {}
+        self.frame_start = time.perf_counter()
+
+    def end_frame(self):
+        if not self.enabled or self.frame_start is None:
+            return
+        self.frame_times.append((time.perf_counter() - self.frame_start) * 1000.0)
+        self.frames.append(self.current)
+        self.current = {}
+        self.frame_start = None
+
+    def averages(self):
+        """Zwraca [(nazwa, średnie ms na klatkę, średnio wywołań na klatkę)] posortowane malejąco po czasie."""
+        if not self.frames:
+            return []
+        totals = {}
+        for frame in self.frames:
+            for name, (seconds, calls) in frame.items():
+                acc = totals.setdefault(name, [0.0, 0])
+                acc[0] += seconds
+                acc[1] += calls
+        n = len(self.frames)
+        rows = [(name, seconds * 1000.0 / n, calls / n) for name, (seconds, calls) in totals.items()]
+        rows.sort(key=lambda row: row[1], reverse=True)
+        return rows
+
+    def mean_frame_time(self):
+        if not self.frame_times:
+            return 0.0
+        return sum(self.frame_times) / len(self.frame_times)
+
+
+# wspólna instancja dla całej gry
+profiler = FrameProfiler()
+
+
+def profiled(name):
+    """
+    Dekorator mierzący czas wywołań funkcji w profilerze.
+    Przy PROFILER_ENABLED = False zwraca oryginalną funkcję - zero narzutu w gorących ścieżkach.
+    """
+    def decorator(func):
+        if not PROFILER_ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.add(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
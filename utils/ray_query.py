@@ -0,0 +1,218 @@
+import math
+from utils.geometry import ray_circle_intersection
+
+try:
+    import numpy as np
+except ImportError:  # numpy jest opcjonalne - wtedy liczymy w pętli
+    np = None
+
+# maksymalna liczba par (promień, okrąg) liczonych naraz - ogranicza pamięć dla dużych batchy
+_CHUNK_PAIRS = 1 << 18
+# widoczność ze wspólnym końcem: od tylu par punkt x okrąg opłaca się podział na kubełki kąta
+_ANGLE_MIN_PAIRS = 1 << 14
+_ANGLE_BINS = 1024
+
+
+def circle_arrays(circles):
+    """Środki (K, 2) i promienie (K,) obiektów z polami .pos i .radius."""
+    if np is None:
+        return [(c.pos.x, c.pos.y) for c in circles], [c.radius for c in circles]
+    centers = np.array([(c.pos.x, c.pos.y) for c in circles], dtype=float).reshape(-1, 2)
+    radii = np.array([c.radius for c in circles], dtype=float)
+    return centers, radii
+
+
+def _points(points):
+    if isinstance(points, np.ndarray):
+        return points.astype(float, copy=False).reshape(-1, 2)
+    return np.asarray([(p[0], p[1]) for p in points], dtype=float).reshape(-1, 2)
+
+
+def _chunks(rows, cols):
+    step = max(1, _CHUNK_PAIRS // max(cols, 1))
+    for start in range(0, rows, step):
+        yield start, min(rows, start + step)
+
+
+def _ray_hits(origins, directions, centers, radii, max_dist):
+    """Odległość t do pierwszego trafienia dla każdej pary (promień, okrąg), inf gdy brak: (R, K)."""
+    fx = origins[:, 0:1] - centers[None, :, 0]
+    fy = origins[:, 1:2] - centers[None, :, 1]
+    dx = directions[:, 0:1]
+    dy = directions[:, 1:2]
+
+    a = dx * dx + dy * dy
+    b = 2 * (fx * dx + fy * dy)
+    c = fx * fx + fy * fy - radii[None, :] ** 2
+    disc = b * b - 4 * a * c
+    sq = np.sqrt(np.maximum(disc, 0.0))
+    t1 = (-b - sq) / (2 * a)
+    t2 = (-b + sq) / (2 * a)
+
+    # pierwsze dodatnie przecięcie, jak w ray_circle_intersection
+    t = np.where(t1 > 0, t1, np.where(t2 > 0, t2, np.inf))
+    t = np.where(disc >= 0, t, np.inf)
+    return np.where(t <= max_dist, t, np.inf)
+
+
+def cast(origin, direction, centers, radii, max_dist=math.inf):
+    """
+    Jeden promień origin + direction * t przeciw wszystkim okręgom.
+    Zwraca (indeks okręgu, t) najbliższego trafienia albo (None, None).
+    """
+    if np is None:
+        best_i, best_t = None, None
+        for i, ((cx, cy), r) in enumerate(zip(centers, radii)):
+            t = ray_circle_intersection(origin[0], origin[1], direction[0], direction[1], cx, cy, r)
+            if t is not None and t <= max_dist and (best_t is None or t < best_t):
+                best_i, best_t = i, t
+        return best_i, best_t
+
+    if len(radii) == 0:
+        return None, None
+    t = _ray_hits(np.array([(origin[0], origin[1])], dtype=float),
+                  np.array([(direction[0], direction[1])], dtype=float),
+                  centers, radii, max_dist)[0]
+    i = int(np.argmin(t))
+    if not np.isfinite(t[i]):
+        return None, None
+    return i, float(t[i])
+
+
+def cast_many(origins, directions, centers, radii, max_dist=math.inf):
+    """
+    Wiele promieni naraz (np. śrut, strzały wrogów).
+    Zwraca (indeksy, t) dla każdego promienia: indeks -1 i t = inf, gdy promień nic nie trafił.
+    """
+    if np is None:
+        result = [cast(o, d, centers, radii, max_dist) for o, d in zip(origins, directions)]
+        return ([-1 if i is None else i for i, _ in result],
+                [math.inf if t is None else t for _, t in result])
+
+    origins = _points(origins)
+    directions = _points(directions)
+    if len(origins) == 1 and len(directions) > 1:
+        origins = np.broadcast_to(origins, directions.shape)
+    rays = len(directions)
+    index = np.full(rays, -1)
+    dist = np.full(rays, np.inf)
+    if len(radii) == 0 or rays == 0:
+        return index, dist
+
+    for start, end in _chunks(rays, len(radii)):
+        t = _ray_hits(origins[start:end], directions[start:end], centers, radii, max_dist)
+        best = np.argmin(t, axis=1)
+        best_t = t[np.arange(end - start), best]
+        hit = np.isfinite(best_t)
+        index[start:end] = np.where(hit, best, -1)
+        dist[start:end] = best_t
+    return index, dist
+
+
+def _segment_hits(sx, sy, ex, ey, cx, cy, radius):
+    """Czy odcinek s-e przecina okrąg (c, radius) - elementowo, z broadcastingiem numpy."""
+    abx = ex - sx
+    aby = ey - sy
+    length_sq = abx * abx + aby * aby
+    acx = cx - sx
+    acy = cy - sy
+
+    # najbliższy punkt odcinka do środka okręgu
+    with np.errstate(divide="ignore", invalid="ignore"):
+        u = np.where(length_sq > 0, (acx * abx + acy * aby) / length_sq, 0.0)
+    u = np.clip(u, 0.0, 1.0)
+    dx = acx - abx * u
+    dy = acy - aby * u
+    return dx * dx + dy * dy < radius ** 2
+
+
+def _segment_blocked(starts, ends, centers, radii):
+    """Czy odcinek start-end przecina któryś okrąg: (R,) bool."""
+    return np.any(_segment_hits(starts[:, 0:1], starts[:, 1:2], ends[:, 0:1], ends[:, 1:2],
+                                centers[None, :, 0], centers[None, :, 1], radii[None, :]), axis=1)
+
+
+def _blocked_toward(starts, end, centers, radii):
+    """
+    _segment_blocked dla wspólnego końca `end` (np. gracz). Okrąg może zasłonić tylko punkty,
+    których kierunek od `end` leży w jego kącie widzenia, więc dokładny test liczymy tylko
+    dla par (punkt, okrąg) z tego samego kubełka kąta zamiast dla wszystkich par.
+    """
+    scale = _ANGLE_BINS / (2.0 * math.pi)
+    rel = centers - end
+    dist = np.sqrt(np.einsum("ij,ij->i", rel, rel))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        half = np.where(dist > radii, np.arcsin(np.minimum(radii / dist, 1.0)), math.pi)
+    theta = np.arctan2(rel[:, 1], rel[:, 0]) + math.pi
+    # kubełek zapasu z każdej strony - granice kąta liczone w float
+    lo = np.floor((theta - half) * scale).astype(np.int64) - 1
+    cover = np.minimum(np.floor((theta + half) * scale).astype(np.int64) + 1 - lo + 1, _ANGLE_BINS)
+    ids = np.repeat(np.arange(len(radii)), cover)
+    offsets = np.arange(int(cover.sum())) - np.repeat(np.cumsum(cover) - cover, cover)
+    bins = (lo[ids] + offsets) % _ANGLE_BINS
+    order = np.argsort(bins, kind="stable")
+    bins, ids = bins[order], ids[order]
+
+    rel_start = starts - end
+    start_bins = np.minimum(((np.arctan2(rel_start[:, 1], rel_start[:, 0]) + math.pi) * scale).astype(np.int64),
+                            _ANGLE_BINS - 1)
+    first = np.searchsorted(bins, start_bins, side="left")
+    counts = np.searchsorted(bins, start_bins, side="right") - first
+    offsets = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+    I = np.repeat(np.arange(len(starts)), counts)
+    K = ids[np.repeat(first, counts) + offsets]
+
+    hit = _segment_hits(starts[I, 0], starts[I, 1], end[0], end[1], centers[K, 0], centers[K, 1], radii[K])
+    blocked = np.zeros(len(starts), dtype=bool)
+    blocked[I[hit]] = True
+    return blocked
+
+
+def line_of_sight(a, b, centers, radii):
+    """True, jeśli odcinek a-b nie przecina żadnego okręgu."""
+    if np is None:
+        ax, ay = a[0], a[1]
+        abx, aby = b[0] - ax, b[1] - ay
+        length_sq = abx * abx + aby * aby
+        for (cx, cy), r in zip(centers, radii):
+            u = ((cx - ax) * abx + (cy - ay) * aby) / length_sq if length_sq > 0 else 0.0
+            u = min(max(u, 0.0), 1.0)
+            dx = cx - ax - abx * u
+            dy = cy - ay - aby * u
+            if dx * dx + dy * dy < r * r:
+                return False
+        return True
+
+    if len(radii) == 0:
+        return True
+    return not _segment_blocked(np.array([(a[0], a[1])], dtype=float),
+                                np.array([(b[0], b[1])], dtype=float), centers, radii)[0]
+
+
+def line_of_sight_many(starts, ends, centers, radii):
+    """
+    Widoczność dla wielu par punktów naraz. `ends` może być jednym punktem
+    (np. pozycja gracza) - wtedy jest wspólny dla wszystkich startów.
+    Zwraca tablicę bool (R,), lista przy braku numpy.
+    """
+    if np is None:
+        if len(ends) == 2 and not hasattr(ends[0], "__len__"):
+            ends = [ends] * len(starts)
+        return [line_of_sight(a, b, centers, radii) for a, b in zip(starts, ends)]
+
+    starts = _points(starts)
+    shared_end = len(ends) == 2 and np.ndim(ends[0]) == 0
+    if shared_end:
+        ends = np.broadcast_to(np.array((ends[0], ends[1]), dtype=float), starts.shape)
+    else:
+        ends = _points(ends)
+
+    visible = np.ones(len(starts), dtype=bool)
+    if len(radii) == 0 or len(starts) == 0:
+        return visible
+    if shared_end and len(starts) * len(radii) > _ANGLE_MIN_PAIRS:
+        return ~_blocked_toward(starts, ends[0], centers, radii)
+
+    for start, end in _chunks(len(starts), len(radii)):
+        visible[start:end] = ~_segment_blocked(starts[start:end], ends[start:end], centers, radii)
+    return visible
@@ -1,21 +1,142 @@
 import pygame
-from collections import deque
+
+try:
+    import numpy as np
+except ImportError:  # BatchSmoother jest opcjonalny - Smoother działa bez numpy
+    np = None
 
 class Smoother:
-    """Przechowuje próbki wektorów i zwraca ich średnią."""
+    """
+    Przechowuje próbki wektorów i zwraca ich średnią.
+    Próbki są kopiowane do stałego bufora cyklicznego, więc wektor wejściowy
+    może być potem zmieniany w miejscu (Enemy.heading). Suma próbek jest utrzymywana
+    na bieżąco (dodajemy nową, odejmujemy wypadającą), więc update nie zależy od num_samples.
+    """
+    __slots__ = ("num_samples", "samples", "next_index", "count", "sum_x", "sum_y")
+
     def __init__(self, num_samples: int):
         self.num_samples = num_samples
-        self.samples = deque(maxlen=num_samples)
+        self.samples = [pygame.Vector2() for _ in range(num_samples)]
+        self.next_index = 0  # miejsce na następną próbkę (po zapełnieniu - najstarsza)
+        self.count = 0
+        self.sum_x = 0.0
+        self.sum_y = 0.0
+
+    def reset(self):
+        self.next_index = 0
+        self.count = 0
+        self.sum_x = 0.0
+        self.sum_y = 0.0
 
     def update(self, new_value: pygame.Vector2) -> pygame.Vector2:
         """Dodaje nową próbkę i zwraca średnią wszystkich próbek."""
-        self.samples.append(new_value)
-        if not self.samples:
-            return new_value
-        avg = pygame.Vector2(0, 0)
+        return self.update_into(pygame.Vector2(), new_value)
+
+    def update_into(self, out: pygame.Vector2, new_value: pygame.Vector2) -> pygame.Vector2:
+        """Jak update(), ale średnia trafia do `out` (bez nowego wektora)."""
+        n = self.num_samples
+        index = self.next_index
+        slot = self.samples[index]
+        if self.count == n:
+            # najstarsza próbka wypada z okna
+            self.sum_x -= slot.x
+            self.sum_y -= slot.y
+        else:
+            self.count += 1
+        slot.update(new_value)
+        self.sum_x += slot.x
+        self.sum_y += slot.y
+
+        index += 1
+        if index == n:
+            index = 0
+            # raz na pełny obieg liczymy sumę od nowa, żeby błędy odejmowania się nie kumulowały
+            self._resum()
+        self.next_index = index
+
+        inv_count = 1.0 / self.count
+        out.update(self.sum_x * inv_count, self.sum_y * inv_count)
+        if out.length_squared() > 1e-6:
+            out.normalize_ip()
+        return out
+
+    def _resum(self):
+        x = y = 0.0
         for v in self.samples:
-            avg += v
-        avg /= len(self.samples)
-        if avg.length_squared() > 1e-6:
-            avg = avg.normalize()
-        return avg
\ No newline at end of file
+            x += v.x
+            y += v.y
+        self.sum_x = x
+        self.sum_y = y
+
+
+class BatchSmoother:
+    """
+    Wektorowy odpowiednik Smoother dla wielu agentów naraz (numpy).
+    Próbki wszystkich agentów leżą w jednej tablicy (num_samples, capacity, 2),
+    agent to wiersz (np. Enemy.uid); każdy wiersz ma własny licznik i pozycję w buforze.
+    """
+
+    def __init__(self, num_samples: int, capacity: int = 64):
+        if np is None:
+            raise ImportError("BatchSmoother wymaga pakietu numpy")
+        self.num_samples = num_samples
+        self.capacity = 0
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        samples = np.zeros((self.num_samples, capacity, 2))
+        sums = np.zeros((capacity, 2))
+        counts = np.zeros(capacity, dtype=np.int64)
+        heads = np.zeros(capacity, dtype=np.int64)
+        if self.capacity:
+            # powiększenie - istniejące wiersze zostają
+            old = self.capacity
+            samples[:, :old] = self.samples
+            sums[:old] = self.sums
+            counts[:old] = self.counts
+            heads[:old] = self.heads
+        self.samples = samples
+        self.sums = sums
+        self.counts = counts
+        self.heads = heads
+        self.capacity = capacity
+
+    def reset(self, rows=None):
+        """Czyści wiersze (domyślnie wszystkie) - nieużywane próbki muszą być zerami."""
+        if rows is None:
+            rows = slice(None)
+        self.samples[:, rows] = 0.0
+        self.sums[rows] = 0.0
+        self.counts[rows] = 0
+        self.heads[rows] = 0
+
+    def update(self, rows, values):
+        """
+        Dodaje próbki `values` (len(rows), 2) do wierszy `rows` (bez powtórzeń)
+        i zwraca ich znormalizowane średnie w tej samej kolejności.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        if len(rows) and rows.max() >= self.capacity:
+            self._allocate(max(int(rows.max()) + 1, self.capacity * 2))
+
+        heads = self.heads[rows]
+        full = self.counts[rows] == self.num_samples
+        # próbki wypadające z okna (dla niepełnych wierszy to zera)
+        self.sums[rows] += values - self.samples[heads, rows]
+        self.samples[heads, rows] = values
+        self.counts[rows] += ~full
+
+        heads += 1
+        wrapped = heads == self.num_samples
+        heads[wrapped] = 0
+        self.heads[rows] = heads
+        if wrapped.any():
+            # jak w Smoother - pełny obieg bufora, sumy liczone od nowa
+            resum = rows[wrapped]
+            self.sums[resum] = self.samples[:, resum].sum(axis=0)
+
+        avg = self.sums[rows] / self.counts[rows, None]
+        length_sq = np.einsum("ij,ij->i", avg, avg)
+        long_enough = length_sq > 1e-6
+        avg[long_enough] /= np.sqrt(length_sq[long_enough])[:, None]
+        return avg
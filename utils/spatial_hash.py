@@ -0,0 +1,128 @@
+import math
+
+
+class SpatialHash:
+    """
+    Jednorodna siatka (spatial hash) dla obiektów z polami .pos i .radius.
+    Komórki mają rozmiar `cell_size` (zwykle flocking_radius), więc zapytanie
+    o sąsiadów przegląda tylko kilka komórek wokół agenta zamiast całej listy.
+    """
+
+    def __init__(self, cell_size: float):
+        self.cell_size = float(cell_size)
+        self.cells: dict[tuple[int, int], list] = {}
+        self.keys: dict = {}  # obiekt -> klucz komórki, w której jest zapisany
+        self.max_radius = 0.0
+
+    def cell_key(self, x: float, y: float) -> tuple[int, int]:
+        return int(math.floor(x / self.cell_size)), int(math.floor(y / self.cell_size))
+
+    def clear(self):
+        self.cells.clear()
+        self.keys.clear()
+        self.max_radius = 0.0
+
+    def insert(self, obj):
+        key = self.cell_key(obj.pos.x, obj.pos.y)
+        bucket = self.cells.get(key)
+        if bucket is None:
+            self.cells[key] = [obj]
+        else:
+            bucket.append(obj)
+        self.keys[obj] = key
+        if obj.radius > self.max_radius:
+            self.max_radius = obj.radius
+
+    def remove(self, obj):
+        key = self.keys.pop(obj, None)
+        if key is None:
+            return
+        bucket = self.cells[key]
+        bucket.remove(obj)
+        if not bucket:
+            del self.cells[key]
+
+    def update(self, obj):
+        """Przenosi obiekt do nowej komórki, jeśli zmienił pozycję na tyle, że ją opuścił."""
+        key = self.cell_key(obj.pos.x, obj.pos.y)
+        old_key = self.keys.get(obj)
+        if old_key == key:
+            return
+        if old_key is not None:
+            self.remove(obj)
+        self.insert(obj)
+
+    def rebuild(self, objects):
+        """Przebudowuje siatkę od zera - wywoływane raz na klatkę."""
+        self.clear()
+        for obj in objects:
+            self.insert(obj)
+
+    def query(self, pos, radius: float):
+        """
+        Zwraca kandydatów z komórek pokrywających kwadrat [pos - radius, pos + radius].
+        Wynik jest nadzbiorem - dokładny test odległości robi wywołujący.
+        """
+        cs = self.cell_size
+        min_cx = int(math.floor((pos.x - radius) / cs))
+        max_cx = int(math.floor((pos.x + radius) / cs))
+        min_cy = int(math.floor((pos.y - radius) / cs))
+        max_cy = int(math.floor((pos.y + radius) / cs))
+
+        cells = self.cells
+        result = []
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    result.extend(bucket)
+        return result
+
+    def query_rect(self, min_x, min_y, max_x, max_y):
+        """Kandydaci z komórek pokrywających prostokąt (np. widok kamery) - nadzbiór, jak query."""
+        cs = self.cell_size
+        min_cx = int(math.floor(min_x / cs))
+        max_cx = int(math.floor(max_x / cs))
+        min_cy = int(math.floor(min_y / cs))
+        max_cy = int(math.floor(max_y / cs))
+
+        cells = self.cells
+        result = []
+        if (max_cx - min_cx + 1) * (max_cy - min_cy + 1) > len(cells):
+            # widok większy niż zajęta część siatki - taniej przejrzeć niepuste komórki
+            for (cx, cy), bucket in cells.items():
+                if min_cx <= cx <= max_cx and min_cy <= cy <= max_cy:
+                    result.extend(bucket)
+            return result
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    result.extend(bucket)
+        return result
+
+    def query_pairs(self, max_dist: float):
+        """
+        Broadphase: zwraca pary obiektów z tej samej lub pobliskich komórek,
+        które mogą być od siebie bliżej niż max_dist. Każda para pojawia się raz.
+        """
+        reach = max(1, int(math.ceil(max_dist / self.cell_size)))
+        # połowa sąsiedztwa - żeby nie zwracać par (a, b) i (b, a)
+        offsets = [(dx, dy) for dx in range(-reach, reach + 1) for dy in range(0, reach + 1)
+                   if dy > 0 or dx > 0]
+
+        cells = self.cells
+        pairs = []
+        for (cx, cy), bucket in cells.items():
+            n = len(bucket)
+            for i in range(n):
+                a = bucket[i]
+                for j in range(i + 1, n):
+                    pairs.append((a, bucket[j]))
+            for dx, dy in offsets:
+                other = cells.get((cx + dx, cy + dy))
+                if other:
+                    for a in bucket:
+                        for b in other:
+                            pairs.append((a, b))
+        return pairs
@@ -0,0 +1,78 @@
+import math
+import pygame
+from config import SPRITE_HEADING_STEPS
+
+TAU = 2.0 * math.pi
+# przezroczyste tło klatek (drugi klucz, gdyby kształt miał dokładnie ten kolor)
+COLORKEY = (255, 0, 255)
+COLORKEY_ALT = (0, 255, 0)
+
+# kształty w lokalnym układzie agenta (x - wzdłuż heading, y - wzdłuż side), w jednostkach promienia
+SHAPES = {
+    # Enemy: czubek na heading, boki 0.5 do tyłu i 0.6 na boki
+    "enemy": ((1.0, 0.0), (-0.5, 0.6), (-0.5, -0.6)),
+    # Player: czubek na heading, boki obrócone o +-2.5 rad
+    "player": ((1.0, 0.0), (math.cos(2.5), math.sin(2.5)), (math.cos(-2.5), math.sin(-2.5))),
+}
+
+
+class SpriteAtlas:
+    """
+    Kształt wyrenderowany raz dla każdego koloru i `steps` kwantowanych kierunków.
+    Rysowanie to wtedy wybór gotowej klatki i blit (albo jeden Surface.blits dla tłumu)
+    zamiast liczenia wierzchołków i pygame.draw.polygon dla każdego agenta.
+    Klatki są renderowane leniwie - przy pierwszym użyciu danego koloru i kierunku.
+    """
+
+    def __init__(self, shape, radius, steps=SPRITE_HEADING_STEPS):
+        self.shape = shape
+        self.radius = radius
+        self.steps = steps
+        # sprite ma środek w (half, half) - tyle odejmujemy od pozycji agenta przy blit
+        self.half = int(math.ceil(radius)) + 1
+        self.frames: dict[tuple, list] = {}
+
+    def index(self, heading_x, heading_y) -> int:
+        """Najbliższy kwantowany kierunek dla wektora heading."""
+        return round(math.atan2(heading_y, heading_x) * self.steps / TAU) % self.steps
+
+    def index_for_angle(self, angle) -> int:
+        return round(angle * self.steps / TAU) % self.steps
+
+    def sprite(self, color, index) -> pygame.Surface:
+        frames = self.frames.get(color)
+        if frames is None:
+            frames = self.frames[color] = [None] * self.steps
+        surface = frames[index]
+        if surface is None:
+            surface = frames[index] = self._render(color, index)
+        return surface
+
+    def _render(self, color, index):
+        angle = index * TAU / self.steps
+        hx, hy = math.cos(angle), math.sin(angle)
+        half = self.half
+        r = self.radius
+        points = [(half + (hx * lx - hy * ly) * r, half + (hy * lx + hx * ly) * r) for lx, ly in self.shape]
+        # colorkey z RLE zamiast kanału alfa - blit kopiuje tylko wiersze trójkąta, bez mieszania pikseli
+        key = COLORKEY if tuple(color[:3]) != COLORKEY else COLORKEY_ALT
+        surface = pygame.Surface((2 * half, 2 * half))
+        if pygame.display.get_surface() is not None:
+            # format ekranu - blit bez konwersji pikseli
+            surface = surface.convert()
+        surface.fill(key)
+        pygame.draw.polygon(surface, color, points)
+        surface.set_colorkey(key, pygame.RLEACCEL)
+        return surface
+
+
+_atlases = {}
+
+
+def sprite_atlas(shape_name, radius, steps=SPRITE_HEADING_STEPS) -> SpriteAtlas:
+    """Wspólny atlas dla (kształt, promień, kierunki) - jak circle_sprite w utils.debuging."""
+    key = (shape_name, radius, steps)
+    atlas = _atlases.get(key)
+    if atlas is None:
+        atlas = _atlases[key] = SpriteAtlas(SHAPES[shape_name], radius, steps)
+    return atlas